@@ -11,6 +11,8 @@ from typing import List
 import requests
 from bs4 import BeautifulSoup
 
+from services.upstream_governor import UpstreamUnavailable, get_governor
+
 class RelatedSymbol:
     """Represents a symbol related to a news item."""
 
@@ -84,6 +86,23 @@ REQUEST_HEADERS = {
 }
 
 
+def is_upstream_failure(error: Exception) -> bool:
+    """Decides whether a request error means the remote host is struggling.
+
+    Client errors such as a missing article say nothing about the host's
+    health, except for 429 which means we are being throttled.
+
+    Args:
+        error (Exception): The exception raised by the request.
+
+    Returns:
+        bool: True if the error should count towards opening the host's breaker.
+    """
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return True
+
+
 class TradingView:
     """A class to retrieve news from TradingView."""
 
@@ -109,10 +128,18 @@ class TradingView:
         Returns:
             List[Item]: A list of news items.
         """
-        try:
+        def fetch() -> requests.Response:
             response = self.session.get(self.url)
             response.raise_for_status()
+            return response
+
+        try:
+            governor = get_governor(urllib.parse.urlparse(self.url).netloc)
+            response = governor.call(fetch, is_failure=is_upstream_failure)
             return self.parse_json_to_objects(response.text, today=today, hours_ago=hours_ago, latest=latest)
+        except UpstreamUnavailable as e:
+            print(f"Skipping news fetch: {str(e)}")
+            return []
         except requests.RequestException as e:
             return []
 
@@ -184,11 +211,15 @@ class TradingView:
                 "Cookie": "; ".join([f"{c.name}={c.value}" for c in self.session.cookies])
             })
 
-            head_response = self.session.head(link, headers=headers, allow_redirects=True)
-            head_response.raise_for_status()
+            def fetch() -> requests.Response:
+                head_response = self.session.head(link, headers=headers, allow_redirects=True)
+                head_response.raise_for_status()
 
-            response = self.session.get(link, headers=headers, allow_redirects=True)
-            response.raise_for_status()
+                response = self.session.get(link, headers=headers, allow_redirects=True)
+                response.raise_for_status()
+                return response
+
+            response = get_governor(domain).call(fetch, is_failure=is_upstream_failure)
 
             if "set-cookie" in response.headers:
                 self.session.cookies.update(response.cookies)
@@ -218,6 +249,9 @@ class TradingView:
 
             return content if content else None
 
+        except UpstreamUnavailable as e:
+            print(f"Skipping content fetch: {str(e)}")
+            return None
         except requests.RequestException as e:
             return None
         except Exception as e:
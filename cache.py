@@ -1,22 +1,203 @@
+import fnmatch
+import gzip
 import hashlib
 import json
-import zlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from functools import wraps
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
 
-from flask import Response, jsonify, request
+import eventlet
+from flask import Response, copy_current_request_context, current_app, make_response, request
 from redis import Redis
 
+from config import COMPRESS_ENABLED, COMPRESS_LEVEL, COMPRESS_MIN_SIZE
+from utils.serialization import CacheCodec
+
+# msgpack and lz4 are optional. When the configured serializer or compressor is
+# not installed the codec falls back to orjson, then json, and to zstd, lz4,
+# then zlib. Install the same extras on every worker, as a value written with a
+# codec a worker lacks cannot be decoded there.
+CACHE_SERIALIZER    : str = os.getenv("CACHE_SERIALIZER", "orjson")
+CACHE_COMPRESSOR    : str = os.getenv("CACHE_COMPRESSOR", "zstd")
+CACHE_ZSTD_DICT     : Optional[str] = os.getenv("CACHE_ZSTD_DICT") or None
+L1_MAX_BYTES        : int = 32 * 1024 * 1024
+INVALIDATION_CHANNEL: str = "cache:invalidate"
+GENERATION_TTL      : int = 86400
+
+# Seconds a value may be served from a worker's local cache, per namespace. The
+# namespace is the view name for @cached and the part of the query key before
+# the first colon for cache_db_query. Namespaces not listed here always go to
+# Redis. Values served locally are shared between requests and must be treated
+# as read-only.
+L1_NAMESPACE_TTLS: Dict[str, int] = {
+    "get_stock_data": 5,
+    "get_news": 30,
+    "get_news_item": 300,
+    "stock_analysis": 5,
+    "symbol_suggestions": 300,
+}
+
 redis_client: Optional[Redis] = None
+codec = CacheCodec(CACHE_SERIALIZER, CACHE_COMPRESSOR, CACHE_ZSTD_DICT)
+
+_MISSING = object()
+_PROCESS_ID = uuid.uuid4().hex
+_invalidation_listener = None
+
+
+class LocalCache:
+    """Per-process LRU cache of decoded Redis values.
+
+    Entries expire after their namespace's L1 TTL and the least recently used
+    ones are evicted once the serialized size of all entries exceeds max_bytes.
+    Writes and invalidations are broadcast on INVALIDATION_CHANNEL so every
+    worker drops its copy. A value that expires in Redis without being
+    rewritten may still be served locally until its L1 TTL runs out.
+    """
+
+    def __init__(self, max_bytes: int = L1_MAX_BYTES):
+        """Initializes an empty local cache.
+
+        Args:
+            max_bytes (int): Maximum serialized size of all entries in bytes.
+        """
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, Tuple[float, int, Any]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "l1_hits": 0,
+            "l1_misses": 0,
+            "l2_hits": 0,
+            "l2_misses": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+    def get(self, key: str) -> Any:
+        """Looks up a fresh entry and marks it as recently used.
+
+        Args:
+            key (str): The Redis key.
+
+        Returns:
+            Any: The decoded value, or _MISSING if there is no fresh entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._stats["l1_hits"] += 1
+                return entry[2]
+
+            if entry is not None:
+                self._remove(key)
+            self._stats["l1_misses"] += 1
+            return _MISSING
+
+    def set(self, key: str, value: Any, size: int, ttl: int) -> None:
+        """Stores a decoded value, evicting the least recently used entries as needed.
+
+        Args:
+            key (str): The Redis key.
+            value (Any): The decoded value.
+            size (int): The serialized size of the value in bytes.
+            ttl (int): Seconds the entry may be served.
+        """
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, size, value)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def _remove(self, key: str) -> None:
+        """Removes an entry. The lock must be held.
+
+        Args:
+            key (str): The Redis key.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def invalidate(self, key: str) -> None:
+        """Drops an entry, or every entry matching a glob-style pattern.
+
+        Args:
+            key (str): The Redis key or pattern.
+        """
+        with self._lock:
+            if any(char in key for char in "*?["):
+                for matching_key in fnmatch.filter(list(self._entries), key):
+                    self._remove(matching_key)
+            else:
+                self._remove(key)
+            self._stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        """Drops every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def count_l2(self, hit: bool) -> None:
+        """Counts a lookup that went to Redis.
+
+        Args:
+            hit (bool): Whether Redis had the key.
+        """
+        self._stats["l2_hits" if hit else "l2_misses"] += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Reports hit ratios per tier since the worker started.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Hits, misses and hit ratio of the local cache
+            and of Redis, plus the local cache's size, evictions and invalidations.
+        """
+        stats = dict(self._stats)
+        tiers = {}
+        for tier in ("l1", "l2"):
+            hits, misses = stats[f"{tier}_hits"], stats[f"{tier}_misses"]
+            tiers[tier] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            }
+        tiers["l1"].update(
+            {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": stats["evictions"],
+                "invalidations": stats["invalidations"],
+            }
+        )
+        return tiers
+
+
+local_cache = LocalCache()
 
 
 def init_redis(app) -> None:
     """Initialize Redis connection.
 
+    Also starts the greenlet that applies other workers' invalidations to
+    this worker's local cache.
+
     Args:
         app: Flask application instance.
     """
-    global redis_client
+    global redis_client, _invalidation_listener
     redis_client = Redis(
         host=app.config.get("REDIS_HOST", "localhost"),
         port=app.config.get("REDIS_PORT", 6379),
@@ -25,14 +206,315 @@ def init_redis(app) -> None:
         socket_connect_timeout=5,
         health_check_interval=30,
     )
-    
 
-def cached(timeout: int = 300, include_query_params: bool = False) -> Callable:
+    if _invalidation_listener is None:
+        _invalidation_listener = eventlet.spawn(_listen_for_invalidations)
+
+
+def _listen_for_invalidations() -> None:
+    """Drops local cache entries invalidated by other workers.
+
+    If the subscription breaks, invalidations may have been missed, so the
+    whole local cache is dropped before subscribing again.
+    """
+    while True:
+        pubsub = None
+        try:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(INVALIDATION_CHANNEL)
+            while True:
+                message = pubsub.get_message(timeout=1.0)
+                if message is None:
+                    continue
+                sender, _, key = message["data"].decode().partition(" ")
+                if sender != _PROCESS_ID:
+                    local_cache.invalidate(key)
+        except Exception as e:
+            print(f"Cache invalidation listener error: {str(e)}")
+            local_cache.clear()
+            eventlet.sleep(1)
+        finally:
+            if pubsub is not None:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+
+
+def _l1_ttl(query_key: str) -> int:
+    """Returns how long values of a cache namespace may be served locally.
+
+    Args:
+        query_key (str): The view name or query key.
+
+    Returns:
+        int: The L1 TTL in seconds, 0 if the namespace is not cached locally.
+    """
+    return L1_NAMESPACE_TTLS.get(query_key.partition(":")[0], 0)
+
+
+def _invalidate(key: str) -> None:
+    """Drops a key from the local caches of all workers.
+
+    Args:
+        key (str): The Redis key or a glob-style pattern.
+    """
+    local_cache.invalidate(key)
+    try:
+        redis_client.publish(INVALIDATION_CHANNEL, f"{_PROCESS_ID} {key}")
+    except Exception as e:
+        print(f"Cache invalidation publish error: {str(e)}")
+
+
+def _set(key: str, data: Any, timeout: int, l1_ttl: int, encode: Callable[[Any], bytes] = codec.encode) -> None:
+    """Encodes a value into Redis and invalidates local copies.
+
+    Args:
+        key (str): The Redis key.
+        data (Any): The value.
+        timeout (int): Seconds until the entry expires in Redis.
+        l1_ttl (int): The key's L1 TTL.
+        encode (Callable[[Any], bytes]): Turns the value into the stored bytes.
+    """
+    redis_client.setex(key, timeout, encode(data))
+    if l1_ttl:
+        _invalidate(key)
+
+
+def _load(
+    key: str, cached_data: Optional[bytes], l1_ttl: int, decode: Callable[[bytes], Tuple[Any, int]] = codec.decode
+) -> Any:
+    """Decodes a value read from Redis and keeps it locally if its namespace allows.
+
+    Args:
+        key (str): The Redis key.
+        cached_data (Optional[bytes]): The value stored in Redis, None on a miss.
+        l1_ttl (int): The key's L1 TTL.
+        decode (Callable[[bytes], Tuple[Any, int]]): Turns the stored bytes into
+            the value and its size.
+
+    Returns:
+        Any: The decoded value, or None on a miss.
+    """
+    local_cache.count_l2(cached_data is not None)
+    if cached_data is None:
+        return None
+
+    data, size = decode(cached_data)
+    if l1_ttl:
+        local_cache.set(key, data, size, l1_ttl)
+    return data
+
+
+def _get(key: str, l1_ttl: int, decode: Callable[[bytes], Tuple[Any, int]] = codec.decode) -> Any:
+    """Reads a cached value from the local cache, falling back to Redis.
+
+    Args:
+        key (str): The Redis key.
+        l1_ttl (int): The key's L1 TTL.
+        decode (Callable[[bytes], Tuple[Any, int]]): Turns the stored bytes into
+            the value and its size.
+
+    Returns:
+        Any: The decoded value, or None on a miss.
+    """
+    if l1_ttl:
+        data = local_cache.get(key)
+        if data is not _MISSING:
+            return data
+    return _load(key, redis_client.get(key), l1_ttl, decode)
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Reports this worker's cache hit ratios per tier.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: The local cache and Redis statistics.
+    """
+    return local_cache.stats()
+
+
+def _schedule_refresh(key: str, refresh: Callable[[], Any]) -> None:
+    """Refreshes a stale cache entry in a background greenlet.
+
+    A short Redis lock makes sure only one greenlet across all workers
+    refreshes a given key at a time.
+
+    Args:
+        key (str): The Redis key of the stale entry.
+        refresh (Callable[[], Any]): Function that recomputes and re-caches the value.
+    """
+    lock_key = f"refresh:{key}"
+    try:
+        if not redis_client.set(lock_key, "1", nx=True, ex=30):
+            return
+    except Exception as e:
+        print(f"Cache refresh lock error: {str(e)}")
+        return
+
+    def run() -> None:
+        try:
+            refresh()
+        except Exception as e:
+            print(f"Cache refresh error: {str(e)}")
+        finally:
+            try:
+                redis_client.delete(lock_key)
+            except Exception:
+                pass
+
+    eventlet.spawn_n(run)
+
+
+def _wrap_stale(data: Any, soft_timeout: Optional[int]) -> Any:
+    """Wraps data with its freshness deadline when a soft timeout is used.
+
+    Args:
+        data (Any): Data to cache.
+        soft_timeout (Optional[int]): Seconds the data is considered fresh.
+
+    Returns:
+        Any: The data itself, or an envelope carrying the freshness deadline.
+    """
+    if soft_timeout is None:
+        return data
+    return {"__fresh_until__": time.time() + soft_timeout, "data": data}
+
+
+def _unwrap_stale(cached: Any) -> tuple[Any, bool]:
+    """Unwraps a cached value and reports whether it is past its soft timeout.
+
+    Args:
+        cached (Any): The decoded cached value.
+
+    Returns:
+        tuple[Any, bool]: The data and whether it is stale.
+    """
+    if isinstance(cached, dict) and "__fresh_until__" in cached:
+        return cached["data"], time.time() > cached["__fresh_until__"]
+    return cached, False
+
+
+class CachedResponse(NamedTuple):
+    """A view response as stored by @cached."""
+
+    status: int
+    mimetype: str
+    etag: str
+    fresh_until: Optional[float]
+    body: bytes
+    gzip_body: Optional[bytes]
+
+
+def _encode_response(entry: CachedResponse) -> bytes:
+    """Lays out a cached response as one line of JSON metadata, the body and its gzip form.
+
+    Args:
+        entry (CachedResponse): The response.
+
+    Returns:
+        bytes: The value to store in Redis.
+    """
+    meta = {
+        "status": entry.status,
+        "mimetype": entry.mimetype,
+        "etag": entry.etag,
+        "fresh_until": entry.fresh_until,
+        "body_length": len(entry.body),
+    }
+    return json.dumps(meta, separators=(",", ":")).encode() + b"\n" + entry.body + (entry.gzip_body or b"")
+
+
+def _decode_response(cached_data: bytes) -> Tuple[CachedResponse, int]:
+    """Reads a cached response written by _encode_response.
+
+    Args:
+        cached_data (bytes): The value stored in Redis.
+
+    Returns:
+        Tuple[CachedResponse, int]: The response and its stored size.
+    """
+    meta, _, payload = cached_data.partition(b"\n")
+    meta = json.loads(meta)
+    length = meta["body_length"]
+    entry = CachedResponse(
+        meta["status"], meta["mimetype"], meta["etag"], meta["fresh_until"], payload[:length], payload[length:] or None
+    )
+    return entry, len(cached_data)
+
+
+def _to_cached_response(result: Any, soft_timeout: Optional[int]) -> CachedResponse:
+    """Captures the encoded body of a view result.
+
+    Bodies of at least COMPRESS_MIN_SIZE bytes are also gzipped once here, so
+    hits do not have to be compressed again.
+
+    Args:
+        result (Any): The value returned by the view.
+        soft_timeout (Optional[int]): Seconds the response is considered fresh.
+
+    Returns:
+        CachedResponse: The response with its ETag.
+    """
+    response = current_app.make_response(result)
+    body = response.get_data()
+    gzip_body = None
+    if COMPRESS_ENABLED and len(body) >= COMPRESS_MIN_SIZE:
+        gzip_body = gzip.compress(body, COMPRESS_LEVEL)
+
+    return CachedResponse(
+        status=response.status_code,
+        mimetype=response.mimetype,
+        etag=hashlib.md5(body).hexdigest(),
+        fresh_until=time.time() + soft_timeout if soft_timeout is not None else None,
+        body=body,
+        gzip_body=gzip_body,
+    )
+
+
+def _serve(entry: CachedResponse) -> Response:
+    """Answers the current request from a cached response.
+
+    A successful response whose ETag matches If-None-Match becomes an empty
+    304. Otherwise the stored body is sent as is, gzipped if the client
+    accepts it. The ETag is weak because both encodings share it.
+
+    Args:
+        entry (CachedResponse): The cached response.
+
+    Returns:
+        Response: The response to send.
+    """
+    if entry.status == 200 and request.if_none_match.contains_weak(entry.etag):
+        response = make_response("", 304)
+    elif entry.gzip_body is not None and request.accept_encodings.quality("gzip") > 0:
+        response = Response(entry.gzip_body, status=entry.status, mimetype=entry.mimetype)
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        response = Response(entry.body, status=entry.status, mimetype=entry.mimetype)
+
+    if entry.gzip_body is not None:
+        response.vary.add("Accept-Encoding")
+    response.set_etag(entry.etag, weak=True)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def cached(timeout: int = 300, include_query_params: bool = False, soft_timeout: Optional[int] = None) -> Callable:
     """Decorator to cache function results in Redis.
 
+    The encoded response body is stored together with its gzip form and an
+    ETag, so hits are sent without decoding or compressing anything and
+    requests with a matching If-None-Match get a 304. Views listed in
+    L1_NAMESPACE_TTLS are also cached in each worker's local cache. With a
+    soft timeout, responses older than soft_timeout but younger than
+    timeout are served immediately while one background greenlet re-runs the
+    view to refresh the entry.
+
     Args:
         timeout (int): Cache timeout in seconds. Defaults to 300.
         include_query_params (bool): Whether to include query parameters in cache key.
+        soft_timeout (Optional[int]): Seconds a cached response is considered fresh.
 
     Returns:
         Callable: Decorated function.
@@ -53,65 +535,66 @@ def cached(timeout: int = 300, include_query_params: bool = False) -> Callable:
             if not redis_client:
                 return f(*args, **kwargs)
 
+            def store(result: Any) -> Optional[CachedResponse]:
+                """Stores a view result in Redis.
+
+                Server errors are transient and are not cached.
+
+                Args:
+                    result (Any): The response returned by the view.
+
+                Returns:
+                    Optional[CachedResponse]: The stored response, or None if it was not stored.
+                """
+                try:
+                    entry = _to_cached_response(result, soft_timeout)
+                    if entry.status >= 500:
+                        return None
+
+                    _set(key, entry, timeout, l1_ttl, _encode_response)
+                    return entry
+                except Exception as e:
+                    print(f"Caching error: {str(e)}")
+                    return None
+
             query_params = ""
             if include_query_params and request:
                 query_params = str(request.args)
 
             key_data = f"{f.__name__}:{str(args)}:{str(kwargs)}:{query_params}"
-            key = f"cache:{hashlib.md5(key_data.encode()).hexdigest()}"
+            key = f"response:{hashlib.md5(key_data.encode()).hexdigest()}"
+            l1_ttl = _l1_ttl(f.__name__)
 
             try:
-                cached_data = redis_client.get(key)
-                if cached_data is not None:
-                    if cached_data.startswith(b"COMPRESSED:"):
-                        compressed_data = cached_data[11:]
-                        decompressed_data = zlib.decompress(compressed_data)
-                        cached_result = json.loads(decompressed_data)
-                    else:
-                        cached_result = json.loads(cached_data)
-
-                    if isinstance(cached_result, dict) and "status_code" in cached_result:
-                        return jsonify(cached_result["data"]), cached_result["status_code"]
-                    return jsonify(cached_result)
+                entry = _get(key, l1_ttl, _decode_response)
+                if entry is not None:
+                    if entry.fresh_until is not None and time.time() > entry.fresh_until:
+                        _schedule_refresh(key, copy_current_request_context(lambda: store(f(*args, **kwargs))))
+                    return _serve(entry)
             except Exception as e:
                 print(f"Cache retrieval error: {str(e)}")
 
             result = f(*args, **kwargs)
+            entry = store(result)
 
-            try:
-                if isinstance(result, tuple):
-                    response_data = json.loads(result[0].get_data())
-                    status_code = result[1]
-                    cache_data = {"data": response_data, "status_code": status_code}
-                elif isinstance(result, Response):
-                    response_data = json.loads(result.get_data())
-                    cache_data = response_data
-                else:
-                    cache_data = result
-
-                json_data = json.dumps(cache_data)
-                if len(json_data) > 1024:
-                    compressed = zlib.compress(json_data.encode())
-                    redis_client.setex(key, timeout, b"COMPRESSED:" + compressed)
-                else:
-                    redis_client.setex(key, timeout, json_data)
-            except Exception as e:
-                print(f"Caching error: {str(e)}")
-
-            return result
+            return _serve(entry) if entry is not None else result
 
         return decorated
 
     return decorator
 
 
-def cache_db_query(query_key: str, data: Union[Dict, List], timeout: int = 300) -> bool:
+def cache_db_query(
+    query_key: str, data: Union[Dict, List], timeout: int = 300, soft_timeout: Optional[int] = None
+) -> bool:
     """Cache database query results in Redis.
 
     Args:
         query_key (str): Unique key for the query.
         data (Union[Dict, List]): Data to cache.
-        timeout (int): Cache timeout in seconds. Defaults to 300.
+        timeout (int): Cache timeout in seconds, after which the entry is gone. Defaults to 300.
+        soft_timeout (Optional[int]): Seconds the entry is considered fresh. Past it,
+            get_cached_query serves the stale value and triggers a refresh.
 
     Returns:
         bool: True if caching was successful, False otherwise.
@@ -121,24 +604,25 @@ def cache_db_query(query_key: str, data: Union[Dict, List], timeout: int = 300)
 
     try:
         key = f"db:{hashlib.md5(query_key.encode()).hexdigest()}"
-        json_data = json.dumps(data)
-
-        if len(json_data) > 1024:
-            compressed = zlib.compress(json_data.encode())
-            redis_client.setex(key, timeout, b"COMPRESSED:" + compressed)
-        else:
-            redis_client.setex(key, timeout, json_data)
+        _set(key, _wrap_stale(data, soft_timeout), timeout, _l1_ttl(query_key))
         return True
     except Exception as e:
         print(f"DB caching error: {str(e)}")
         return False
 
 
-def get_cached_query(query_key: str) -> Optional[Union[Dict, List]]:
+def get_cached_query(
+    query_key: str, revalidate: Optional[Callable[[], Any]] = None
+) -> Optional[Union[Dict, List]]:
     """Retrieve cached database query results from Redis.
 
+    Entries past their soft timeout are still returned. If revalidate is
+    given, it is run once in a background greenlet to refresh the entry.
+
     Args:
         query_key (str): Unique key for the query.
+        revalidate (Optional[Callable[[], Any]]): Function that recomputes and
+            re-caches the entry when it is stale.
 
     Returns:
         Optional[Union[Dict, List]]: Cached data or None if not found.
@@ -148,25 +632,177 @@ def get_cached_query(query_key: str) -> Optional[Union[Dict, List]]:
 
     try:
         key = f"db:{hashlib.md5(query_key.encode()).hexdigest()}"
-        cached_data = redis_client.get(key)
+        cached_data = _get(key, _l1_ttl(query_key))
 
         if cached_data is None:
             return None
 
-        if cached_data.startswith(b"COMPRESSED:"):
-            compressed_data = cached_data[11:]
-            decompressed_data = zlib.decompress(compressed_data)
-            return json.loads(decompressed_data)
+        data, is_stale = _unwrap_stale(cached_data)
+        if is_stale and revalidate is not None:
+            _schedule_refresh(key, revalidate)
 
-        return json.loads(cached_data)
+        return data
     except Exception as e:
         print(f"Cache retrieval error: {str(e)}")
         return None
 
 
+def get_cached_queries(
+    query_keys: List[str], revalidate: Optional[Callable[[List[str]], Any]] = None
+) -> Dict[str, Any]:
+    """Retrieve several cached database query results with a single MGET.
+
+    Entries found in the local cache are not requested from Redis. Entries
+    past their soft timeout are still returned. If revalidate is given, it is
+    run once in a background greenlet with the stale query keys.
+
+    Args:
+        query_keys (List[str]): Unique keys for the queries.
+        revalidate (Optional[Callable[[List[str]], Any]]): Function that recomputes
+            and re-caches the given stale entries.
+
+    Returns:
+        Dict[str, Any]: Cached data for every query key that was found.
+    """
+    if not redis_client or not query_keys:
+        return {}
+
+    keys = [f"db:{hashlib.md5(query_key.encode()).hexdigest()}" for query_key in query_keys]
+    l1_ttls = [_l1_ttl(query_key) for query_key in query_keys]
+    values = [local_cache.get(key) if l1_ttl else _MISSING for key, l1_ttl in zip(keys, l1_ttls)]
+    misses = [i for i, value in enumerate(values) if value is _MISSING]
+
+    try:
+        fetched = redis_client.mget([keys[i] for i in misses]) if misses else []
+    except Exception as e:
+        print(f"Cache retrieval error: {str(e)}")
+        fetched = [None] * len(misses)
+
+    for i, cached_data in zip(misses, fetched):
+        try:
+            values[i] = _load(keys[i], cached_data, l1_ttls[i])
+        except Exception as e:
+            print(f"Cache retrieval error: {str(e)}")
+            values[i] = None
+
+    results = {}
+    stale = []
+    for query_key, cached_data in zip(query_keys, values):
+        if cached_data is None:
+            continue
+        data, is_stale = _unwrap_stale(cached_data)
+        results[query_key] = data
+        if is_stale:
+            stale.append(query_key)
+
+    if stale and revalidate is not None:
+        batch_key = hashlib.md5(",".join(sorted(stale)).encode()).hexdigest()
+        _schedule_refresh(f"batch:{batch_key}", lambda: revalidate(stale))
+
+    return results
+
+
+def get_query_freshness(query_key: str) -> Optional[float]:
+    """Return how long a cached database query result stays fresh.
+
+    Args:
+        query_key (str): Unique key for the query.
+
+    Returns:
+        Optional[float]: Seconds until the entry goes stale (negative if it already
+        is), or None if the entry is missing.
+    """
+    if not redis_client:
+        return None
+
+    try:
+        key = f"db:{hashlib.md5(query_key.encode()).hexdigest()}"
+        cached_result = _get(key, _l1_ttl(query_key))
+
+        if cached_result is None:
+            return None
+
+        if isinstance(cached_result, dict) and "__fresh_until__" in cached_result:
+            return cached_result["__fresh_until__"] - time.time()
+
+        return float(redis_client.ttl(key))
+    except Exception as e:
+        print(f"Cache retrieval error: {str(e)}")
+        return None
+
+
+def _generation_counter(namespace: str, entity_id: Any) -> str:
+    """Returns the Redis key of an entity's cache generation counter.
+
+    Args:
+        namespace (str): The cache namespace, e.g. "user_chats".
+        entity_id (Any): The ID of the entity the cached data belongs to.
+
+    Returns:
+        str: The counter key.
+    """
+    return f"gen:{namespace}:{entity_id}"
+
+
+def generation_key(namespace: str, entity_id: Any, *parts: Any) -> str:
+    """Builds a query key that embeds an entity's current cache generation.
+
+    After bump_generation, keys built for the entity change, so entries cached
+    under the old keys are never read again and expire by their TTL.
+
+    Args:
+        namespace (str): The cache namespace, e.g. "user_chats".
+        entity_id (Any): The ID of the entity the cached data belongs to.
+        *parts (Any): Further parts of the query key, e.g. the page.
+
+    Returns:
+        str: The query key, for cache_db_query and get_cached_query.
+    """
+    generation = 0
+    if redis_client:
+        try:
+            generation = int(redis_client.get(_generation_counter(namespace, entity_id)) or 0)
+        except Exception as e:
+            print(f"Cache generation read error: {str(e)}")
+
+    return ":".join(str(part) for part in (namespace, entity_id, f"g{generation}", *parts))
+
+
+def bump_generation(namespace: str, entity_id: Any) -> int:
+    """Invalidates every entry cached for an entity with a single INCR.
+
+    The counter expires after GENERATION_TTL without bumps, which must be
+    longer than the TTL of any entry keyed by it.
+
+    Args:
+        namespace (str): The cache namespace, e.g. "user_chats".
+        entity_id (Any): The ID of the entity whose cached data changed.
+
+    Returns:
+        int: The new generation, 0 if Redis is unavailable.
+    """
+    if not redis_client:
+        return 0
+
+    counter = _generation_counter(namespace, entity_id)
+    try:
+        pipe = redis_client.pipeline()
+        pipe.incr(counter)
+        pipe.expire(counter, GENERATION_TTL)
+        return pipe.execute()[0]
+    except Exception as e:
+        print(f"Cache invalidation error: {str(e)}")
+        return 0
+
+
 def invalidate_cache_pattern(pattern: str) -> int:
     """Invalidate all cache keys matching a pattern.
 
+    Keys are found with SCAN, so Redis is not blocked, but every key is still
+    visited. Prefer generation_key and bump_generation for data that is
+    invalidated on every request. Matching local cache entries are dropped in
+    every worker.
+
     Args:
         pattern (str): Pattern to match keys against.
 
@@ -176,8 +812,10 @@ def invalidate_cache_pattern(pattern: str) -> int:
     if not redis_client:
         return 0
 
+    _invalidate(pattern)
+
     try:
-        keys = redis_client.keys(pattern)
+        keys = list(redis_client.scan_iter(match=pattern, count=1000))
         if keys:
             return redis_client.delete(*keys)
         return 0
@@ -9,14 +9,17 @@ from utils.utils import SQLiteConnectionPool
 
 dotenv.load_dotenv()
 
-limiter             : Limiter               | None = None
-csrf                : CSRFProtect           | None = None
-symbols_db_pool     : SQLiteConnectionPool  | None = None
+limiter               : Limiter               | None = None
+csrf                  : CSRFProtect           | None = None
+symbols_db_pool       : SQLiteConnectionPool  | None = None
+symbol_routes_db_pool : SQLiteConnectionPool  | None = None
 
 COMPRESS_ENABLED    : bool = True
 COMPRESS_LEVEL      : int  = 6
 COMPRESS_MIN_SIZE   : int  = 500
 
+SYMBOL_SUGGESTION_MODE: str = os.getenv("SYMBOL_SUGGESTION_MODE", "index")
+
 def init_protections(app) -> Limiter:
     """Initializes CSRF protection and rate limiter for the Flask app.
 
@@ -39,6 +42,7 @@ def init_protections(app) -> Limiter:
 
 
 symbols_db_pool = SQLiteConnectionPool("symbols_db/tradingview.db", max_connections=20)
+symbol_routes_db_pool = SQLiteConnectionPool("symbols_db/symbol_routes.db", max_connections=5)
 
 ALPHA_VANTAGE_API_KEY: str | None = os.getenv("ALPHA_VANTAGE_API_KEY")
 BASE_URL: str = "https://www.alphavantage.co/query"
@@ -1,7 +1,6 @@
 import eventlet
 eventlet.monkey_patch()
 
-import difflib
 import hashlib
 import io
 import json
@@ -18,7 +17,7 @@ import traceback
 import uuid
 import magic
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 from flask import (
     Flask,
@@ -28,28 +27,32 @@ from flask import (
     redirect,
     render_template,
     request,
+    Response,
     send_file,
     send_from_directory,
     url_for,
     session,
 )
 from flask_login import current_user, login_required
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room, leave_room
 from flask_wtf import FlaskForm
-from tradingview_ta import Interval, TA_Handler
+from tradingview_ta import Interval, TA_Handler, get_multiple_analysis
 from werkzeug.utils import secure_filename
 from wtforms import IntegerField, SelectField, StringField
 from wtforms.validators import DataRequired, Length, NumberRange
 
 from blueprints.auth import auth
 from cache import (
+    bump_generation,
     cache_db_query,
+    cache_stats,
     cached,
+    generation_key,
+    get_cached_queries,
     get_cached_query,
-    invalidate_cache_pattern,
     redis_client,
 )
-from config import csrf, limiter, COMMON_STOCKS, CRYPTO_SYMBOLS, ALPHA_VANTAGE_API_KEY, BASE_URL, symbols_db_pool
+from config import csrf, limiter, COMMON_STOCKS, CRYPTO_SYMBOLS, ALPHA_VANTAGE_API_KEY, BASE_URL, SYMBOL_SUGGESTION_MODE, symbols_db_pool
 from extensions import db
 from models import (
     AIOperation,
@@ -65,8 +68,22 @@ from models import (
 )
 from services.ai_service import AIService
 from services.news_service import NewsService
+from services.singleflight import SingleFlight
 from services.tools import format_stock_data, get_system_prompt, google_tools
 from services.stockrecommender import StockRecommender
+from services.exchange_prober import probe_symbol
+from services.indicators import local_analyses
+from services.negative_cache import negative_cache
+from services.prefetcher import prefetcher
+from services.quote_stream import quote_stream
+from services.snapshot_store import SNAPSHOT_DTYPE, snapshot_store
+from services.suggestion_index import suggestion_index
+from services import symbol_fts
+from services.fuzzy_matcher import fuzzy_matcher
+from services.symbol_index import normalize_symbol, symbol_index
+from services.symbol_popularity import RANK_CANDIDATE_FACTOR, symbol_popularity
+from services.symbol_resolver import symbol_resolver
+from services.upstream_governor import UpstreamUnavailable, is_tradingview_failure, scanner_governor
 from utils.analytics import send_ga_event
 from utils.ip import get_ip
 
@@ -149,12 +166,102 @@ LANGUAGES = {
 
 load_dotenv()
 
-def get_symbol_suggestions(query: str, max_suggestions: int = 5) -> list:
+SYMBOL_SUGGESTION_TTL: int = 3600
+MAX_SUGGESTION_BATCH: int = 50
+MAX_HISTORY_TIMESTAMP: float = datetime(9999, 12, 31, tzinfo=timezone.utc).timestamp()
+
+
+def symbol_suggestions_cache_key(query: str, max_suggestions: int, fuzzy: bool = False) -> str:
+    """Builds the cache key of a suggestion query.
+
+    Args:
+        query (str): The upper-cased query string.
+        max_suggestions (int): The maximum number of suggestions.
+        fuzzy (bool): Whether typo-tolerant matches are ranked first.
+
+    Returns:
+        str: The cache key.
+    """
+    return f"symbol_suggestions:{SYMBOL_SUGGESTION_MODE}:{query}:{max_suggestions}{':fuzzy' if fuzzy else ''}"
+
+
+def find_symbol_matches(query: str, max_suggestions: int = 5, fuzzy: bool = False) -> list:
+    """Finds the symbols table rows matching a query.
+
+    Typo-tolerant matches fill in when nothing else matches, and come first
+    for "did you mean" suggestions. Otherwise rows are ranked by match tier
+    and popularity, or by bm25 in FTS mode.
+
+    Args:
+        query (str): The upper-cased query string.
+        max_suggestions (int): The maximum number of rows to return.
+        fuzzy (bool): Whether to rank typo-tolerant matches first.
+
+    Returns:
+        list: (screener, exchange, symbol, desc) rows.
+    """
+    try:
+        matches = fuzzy_matcher.search(query, max_suggestions) if fuzzy else []
+
+        if len(matches) < max_suggestions:
+            found = None
+            if SYMBOL_SUGGESTION_MODE == "fts":
+                try:
+                    found = symbol_fts.search(query, max_suggestions)
+                except sqlite3.OperationalError as e:
+                    print(f"FTS suggestion error: {str(e)}")
+
+            if found is None:
+                found = symbol_popularity.rank(
+                    query, suggestion_index.search(query, max_suggestions * RANK_CANDIDATE_FACTOR), max_suggestions
+                )
+            seen = {(exchange, symbol) for _, exchange, symbol, _ in matches}
+            matches += [match for match in found if (match[1], match[2]) not in seen]
+
+        if not matches:
+            matches = fuzzy_matcher.search(query, max_suggestions)
+    except Exception as e:
+        print(f"Error querying symbols database: {str(e)}")
+        matches = fuzzy_matcher.search(query, max_suggestions)
+
+    return matches[:max_suggestions]
+
+
+def format_symbol_suggestions(matches: list) -> list:
+    """Formats symbols table rows as suggestion dictionaries.
+
+    Args:
+        matches (list): (screener, exchange, symbol, desc) rows.
+
+    Returns:
+        list: A list of dictionaries containing symbol suggestions.
+    """
+    suggestions = []
+    for screener, exchange, symbol, desc in matches:
+        is_crypto = screener == "crypto"
+
+        suggestions.append(
+            {
+                "symbol": symbol,
+                "name": desc,
+                "type": "crypto" if is_crypto else "stock",
+                "exchange": exchange,
+                "screener": screener,
+            }
+        )
+    return suggestions
+
+
+def get_symbol_suggestions(query: str, max_suggestions: int = 5, fuzzy: bool = False) -> list:
     """Suggests stock symbols based on a query string.
 
+    Queries of up to three characters are served from the precomputed prefix
+    table when it is available.
+
     Args:
         query (str): The query string to search for symbols.
         max_suggestions (int): The maximum number of suggestions to return.
+        fuzzy (bool): Whether to rank typo-tolerant matches first.
 
     Returns:
         list: A list of dictionaries containing symbol suggestions.
@@ -163,128 +270,86 @@ def get_symbol_suggestions(query: str, max_suggestions: int = 5) -> list:
 
     query = query.upper()
 
-    cache_key = f"symbol_suggestions:{query}:{max_suggestions}"
+    if not fuzzy:
+        top = symbol_popularity.top_for_prefix(query, max_suggestions)
+        if top is not None:
+            return top
+
+    cache_key = symbol_suggestions_cache_key(query, max_suggestions, fuzzy)
     cached_result = get_cached_query(cache_key)
     if cached_result:
         return cached_result
 
-    suggestions = []
-
-    try:
-        conn = symbols_db_pool.get_connection()
-        try:
-            cursor = conn.cursor()
+    suggestions = format_symbol_suggestions(find_symbol_matches(query, max_suggestions, fuzzy))
 
-            cursor.execute(
-                """
-                SELECT screener, exchange, symbol, desc, 1 as match_type FROM tv 
-                WHERE UPPER(symbol) = ? 
+    cache_db_query(cache_key, suggestions, SYMBOL_SUGGESTION_TTL)
 
-                UNION ALL
+    return suggestions
 
-                SELECT screener, exchange, symbol, desc, 2 as match_type FROM tv 
-                WHERE UPPER(symbol) LIKE ? AND UPPER(symbol) != ? 
 
-                UNION ALL
+def get_symbol_suggestions_batch(queries: list, max_suggestions: int = 5) -> dict:
+    """Suggests stock symbols for several query strings at once.
 
-                SELECT screener, exchange, symbol, desc, 3 as match_type FROM tv 
-                WHERE UPPER(symbol) LIKE ? AND UPPER(symbol) NOT LIKE ? AND UPPER(symbol) != ? 
+    Short queries are read from the precomputed prefix table with one HMGET
+    and the rest from the per-query cache entries with one MGET. Queries
+    still missing are resolved in a single pass over the suggestion index and
+    cached under the same keys get_symbol_suggestions uses.
 
-                UNION ALL
+    Args:
+        queries (list): The query strings.
+        max_suggestions (int): The maximum number of suggestions per query.
 
-                SELECT screener, exchange, symbol, desc, 4 as match_type FROM tv 
-                WHERE UPPER(desc) LIKE ? AND UPPER(symbol) NOT LIKE ? 
+    Returns:
+        dict: Each upper-cased query mapped to its list of suggestions.
+    """
+    from cache import get_cached_queries, cache_db_query
 
-                ORDER BY match_type
-                LIMIT ?
-            """,
-                (
-                    query,
-                    f"{query}%",
-                    query,
-                    f"%{query}%",
-                    f"{query}%",
-                    query,
-                    f"%{query}%",
-                    f"%{query}%",
-                    max_suggestions,
-                ),
-            )
+    queries = list(dict.fromkeys(query.upper() for query in queries))
+    results = symbol_popularity.top_for_prefixes(queries, max_suggestions)
 
-            all_matches = cursor.fetchall()
+    cache_keys = {
+        symbol_suggestions_cache_key(query, max_suggestions): query for query in queries if query not in results
+    }
+    for cache_key, cached_result in get_cached_queries(list(cache_keys)).items():
+        if cached_result:
+            results[cache_keys[cache_key]] = cached_result
 
-            for screener, exchange, symbol, desc, _ in all_matches:
-                is_crypto = screener == "crypto"
+    for cache_key, query in cache_keys.items():
+        if query not in results:
+            results[query] = format_symbol_suggestions(find_symbol_matches(query, max_suggestions))
+            cache_db_query(cache_key, results[query], SYMBOL_SUGGESTION_TTL)
 
-                suggestions.append(
-                    {
-                        "symbol": symbol,
-                        "name": desc,
-                        "type": "crypto" if is_crypto else "stock",
-                        "exchange": exchange,
-                        "screener": screener,
-                    }
-                )
-        finally:
-            symbols_db_pool.return_connection(conn)
-    except Exception as e:
-        print(f"Error querying symbols database: {str(e)}")
-        ALL_SYMBOLS = {**COMMON_STOCKS, **CRYPTO_SYMBOLS}
+    return results
 
-        symbol_matches = difflib.get_close_matches(
-            query, ALL_SYMBOLS.keys(), n=max_suggestions, cutoff=0.6
-        )
 
-        if len(symbol_matches) < max_suggestions:
-            remaining_slots = max_suggestions - len(symbol_matches)
-            for symbol in ALL_SYMBOLS.keys():
-                if query in symbol and symbol not in symbol_matches:
-                    symbol_matches.append(symbol)
-                    remaining_slots -= 1
-                    if remaining_slots <= 0:
-                        break
-
-        name_matches = []
-        for symbol, name in ALL_SYMBOLS.items():
-            if query in name.upper() and symbol not in symbol_matches:
-                name_matches.append(symbol)
-                if len(name_matches) >= max_suggestions:
-                    break
-
-        for symbol in (symbol_matches + name_matches)[:max_suggestions]:
-            is_crypto = symbol in CRYPTO_SYMBOLS
-
-            suggestions.append(
-                {
-                    "symbol": symbol,
-                    "name": ALL_SYMBOLS[symbol],
-                    "type": "crypto" if is_crypto else "stock",
-                    "exchange": "BINANCE"
-                    if is_crypto
-                    else (
-                        "NASDAQ"
-                        if symbol
-                        in [
-                            "AAPL",
-                            "MSFT",
-                            "GOOGL",
-                            "AMZN",
-                            "META",
-                            "NVDA",
-                            "TSLA",
-                            "NFLX",
-                            "INTC",
-                            "AMD",
-                        ]
-                        else "NYSE"
-                    ),
-                    "screener": "crypto" if is_crypto else "america",
-                }
-            )
+def find_unknown_symbols(symbols: list) -> dict:
+    """Finds the symbols that match no listed, suggested or remembered symbol.
 
-    cache_db_query(cache_key, suggestions, 3600)
+    Args:
+        symbols (list): Bare symbols or EXCHANGE:SYMBOL pairs.
 
-    return suggestions
+    Returns:
+        dict: Each unknown symbol mapped to suggestions for it.
+    """
+    candidates = {
+        symbol: normalize_symbol(symbol).rpartition(":")[2]
+        for symbol in symbols
+        if symbol_index.get(symbol) is None
+    }
+    if not candidates:
+        return {}
+
+    suggestions = get_symbol_suggestions_batch(list(candidates.values()))
+
+    unknown = {}
+    for symbol, bare in candidates.items():
+        matches = suggestions.get(bare, [])
+        if any(normalize_symbol(match["symbol"]) == bare for match in matches):
+            continue
+        if symbol_resolver.get(bare) is not None:
+            continue
+        unknown[symbol] = matches
+    return unknown
 
 
 def validate_operation_ownership(
@@ -343,6 +408,25 @@ def validate_chat_ownership(chat_id: int, user_id: int = None) -> tuple[Chat, bo
     return chat, chat.user_id == user_id
 
 
+def track_stock_request(response: Response) -> Response:
+    """Counts successful stock data requests towards symbol popularity and prefetching.
+
+    Runs after every request rather than inside get_stock_data, so requests
+    answered from the response cache, including 304s, are counted too.
+
+    Args:
+        response (Response): The response about to be sent.
+
+    Returns:
+        Response: The response, unchanged.
+    """
+    if request.endpoint == "get_stock_data" and response.status_code in (200, 304):
+        symbol = request.view_args["symbol"].upper()
+        prefetcher.record_request(symbol)
+        symbol_popularity.record_hit(symbol)
+    return response
+
+
 def init_routes(app: Flask) -> None:
     """Initializes the routes for the Flask application.
 
@@ -361,6 +445,7 @@ def init_routes(app: Flask) -> None:
         engineio_logger=False,
         ping_timeout=20,
         ping_interval=10,
+        message_queue=f"redis://{app.config['REDIS_HOST']}:{app.config['REDIS_PORT']}/{app.config['REDIS_DB']}",
     )
 
     logging.getLogger('socketio').setLevel(logging.ERROR)
@@ -382,11 +467,43 @@ def init_routes(app: Flask) -> None:
     def handle_disconnect():
         """Handle client disconnection."""
         try:
+            quote_stream.unsubscribe_all(request.sid)
             if 'socket_id' in session:
                 del session['socket_id']
         except Exception:
             pass
 
+    @socketio.on('subscribe_quote')
+    def handle_subscribe_quote(data):
+        """Subscribe the client to live quotes for a symbol.
+
+        Args:
+            data (dict): The event payload containing the symbol.
+        """
+        symbol = str((data or {}).get('symbol', '')).strip().upper()
+        if not re.match(r"^[A-Z0-9]{1,20}(:[A-Z0-9]{1,20})?$", symbol):
+            emit('quote_error', {'symbol': symbol, 'error': 'Invalid symbol'})
+            return
+
+        if not quote_stream.subscribe(request.sid, symbol):
+            emit('quote_error', {'symbol': symbol, 'error': 'Too many quote subscriptions'})
+            return
+
+        join_room(quote_stream.room(symbol))
+        emit('quote_subscribed', {'symbol': symbol})
+
+    @socketio.on('unsubscribe_quote')
+    def handle_unsubscribe_quote(data):
+        """Unsubscribe the client from live quotes for a symbol.
+
+        Args:
+            data (dict): The event payload containing the symbol.
+        """
+        symbol = str((data or {}).get('symbol', '')).strip().upper()
+        leave_room(quote_stream.room(symbol))
+        quote_stream.unsubscribe(request.sid, symbol)
+        emit('quote_unsubscribed', {'symbol': symbol})
+
     @socketio.on_error_default
     def default_error_handler(e):
         """Handle all SocketIO errors silently."""
@@ -402,6 +519,8 @@ def init_routes(app: Flask) -> None:
     from blueprints.payments import payments_bp
     app.register_blueprint(payments_bp)
 
+    app.after_request(track_stock_request)
+
     @app.before_request
     def update_session_activity():
         """Update the last active time for the current session."""
@@ -581,13 +700,66 @@ def init_routes(app: Flask) -> None:
         suggestions = get_symbol_suggestions(query)
         return jsonify(suggestions)
 
+    @app.route("/api/stock/suggest/batch", methods=["POST"])
+    @csrf.exempt
+    @limiter.limit("20 per minute")
+    def suggest_symbols_batch():
+        """API endpoint to suggest stock symbols for several queries in one request.
+
+        Expects a JSON body of the form {"queries": ["AAP", "BTC", ...]}.
+
+        Returns:
+            jsonify: A JSON response mapping each query to its symbol suggestions.
+        """
+        data = request.get_json(silent=True) or {}
+        queries = data.get("queries")
+
+        if not isinstance(queries, list) or not queries:
+            return jsonify({"error": "A non-empty list of queries is required"}), 400
+
+        if len(queries) > MAX_SUGGESTION_BATCH:
+            return jsonify({"error": f"A maximum of {MAX_SUGGESTION_BATCH} queries is allowed per request"}), 400
+
+        for query in queries:
+            if not isinstance(query, str) or not query.strip() or len(query.strip()) > 30:
+                return jsonify({"error": f"Invalid query: {query}"}), 400
+
+        results = get_symbol_suggestions_batch([query.strip() for query in queries])
+
+        return jsonify({"results": {query: results[query.strip().upper()] for query in queries}})
+
+    @app.route("/api/stock/suggest/select", methods=["POST"])
+    @csrf.exempt
+    @login_required
+    @limiter.limit("30 per minute")
+    def select_suggestion():
+        """API endpoint to record that a user picked a suggested symbol.
+
+        Only listed or curated symbols are counted.
+
+        Returns:
+            jsonify: A JSON response confirming the selection was recorded.
+        """
+        data = request.get_json(silent=True) or {}
+        symbol = str(data.get("symbol", "")).strip()
+        if not symbol or not re.match(r"^[A-Za-z0-9:./_-]{1,30}$", symbol):
+            return jsonify({"error": "Invalid symbol"}), 400
+        if symbol_index.get(symbol) is None:
+            return jsonify({"error": "Unknown symbol"}), 404
+
+        symbol_popularity.record_selection(symbol)
+        return jsonify({"success": True})
+
     @app.route("/api/stock/<symbol>")
     @csrf.exempt
     @limiter.limit("30 per minute")
-    @cached(timeout=300)
+    @cached(timeout=300, include_query_params=True, soft_timeout=60)
     def get_stock_data(symbol: str):
         """API endpoint to get stock data for a given symbol.
 
+        Accepts an optional `intervals` query parameter (e.g. `?intervals=1h,4h,1d,1W`)
+        to include the analysis for several timeframes under `timeframes`.
+
         Args:
             symbol (str): The stock symbol to retrieve data for.
 
@@ -595,6 +767,19 @@ def init_routes(app: Flask) -> None:
             jsonify: A JSON response containing the stock data or an error message.
         """
         try:
+            intervals = [i.strip() for i in request.args.get("intervals", "").split(",") if i.strip()]
+            invalid_intervals = [i for i in intervals if i not in ANALYSIS_INTERVALS]
+            if invalid_intervals:
+                return (
+                    jsonify(
+                        {
+                            "error": f"Invalid interval(s): {', '.join(invalid_intervals)}. "
+                            f"Use any of {', '.join(ANALYSIS_INTERVALS)}",
+                        }
+                    ),
+                    400,
+                )
+
             if ":" in symbol:
                 parts = symbol.split(":")
                 if len(parts) != 2:
@@ -634,20 +819,37 @@ def init_routes(app: Flask) -> None:
                     400,
                 )
 
-            analysis = get_stock_analysis(symbol)
+            missing = negative_cache.get(symbol)
+            if missing:
+                return jsonify(missing), 404
 
-            if analysis is None:
-                suggestions = get_symbol_suggestions(symbol)
+            if missing is not None:
+                timeframes = None
+                analysis = None
+            elif intervals:
+                timeframes = get_stock_analysis_timeframes(
+                    symbol, list(dict.fromkeys([Interval.INTERVAL_1_DAY] + [ANALYSIS_INTERVALS[i] for i in intervals]))
+                )
+                analysis = timeframes.pop(Interval.INTERVAL_1_DAY)
+            else:
+                timeframes = None
+                analysis = get_stock_analysis(symbol)
+
+            if analysis is None and missing is None and scanner_governor.is_open():
                 return (
-                    jsonify(
-                        {
-                            "error": f'Could not find stock "{symbol}". Please check the symbol and try again.',
-                            "suggestions": suggestions,
-                        }
-                    ),
-                    404,
+                    jsonify({"error": "Market data is temporarily unavailable. Please try again shortly."}),
+                    503,
                 )
 
+            if analysis is None:
+                suggestions = get_symbol_suggestions(symbol, fuzzy=True)
+                not_found = {
+                    "error": f'Could not find stock "{symbol}". Please check the symbol and try again.',
+                    "suggestions": suggestions,
+                }
+                negative_cache.attach_response(symbol, not_found)
+                return jsonify(not_found), 404
+
             user_id = str(current_user.id) if current_user.is_authenticated else None
             subscription_type = current_user.subscription.name if current_user.is_authenticated else "Anonymous"
             send_ga_event(
@@ -661,6 +863,15 @@ def init_routes(app: Flask) -> None:
                 },
             )
 
+            if timeframes is not None:
+                analysis = {
+                    **analysis,
+                    "timeframes": {
+                        label: timeframes.get(ANALYSIS_INTERVALS[label], analysis)
+                        for label in intervals
+                    },
+                }
+
             return jsonify(analysis)
 
         except Exception as e:
@@ -677,6 +888,170 @@ def init_routes(app: Flask) -> None:
                 500,
             )
 
+    @app.route("/api/stock/<symbol>/history")
+    @csrf.exempt
+    @limiter.limit("30 per minute")
+    def get_stock_history(symbol: str):
+        """API endpoint to get the recorded analysis history of a symbol.
+
+        Accepts `from` and `to` query parameters as UNIX timestamps or ISO
+        dates (defaulting to the last day), an `interval` (defaulting to 1d) and
+        `max_points` (defaulting to 2000) to thin out long ranges.
+
+        Args:
+            symbol (str): The stock symbol to retrieve history for.
+
+        Returns:
+            jsonify: A JSON response with one array per recorded column.
+        """
+        symbol = symbol.upper()
+        if not re.match(r"^[A-Z0-9]{1,20}(:[A-Z0-9]{1,20})?$", symbol):
+            return jsonify({"error": "Invalid symbol"}), 400
+
+        interval = request.args.get("interval", "1d")
+        if interval not in ANALYSIS_INTERVALS:
+            return jsonify({"error": f"Invalid interval. Use any of {', '.join(ANALYSIS_INTERVALS)}"}), 400
+
+        def parse_time(value: str | None, default: float) -> float:
+            if not value:
+                return default
+            try:
+                seconds = float(value)
+            except ValueError:
+                parsed = datetime.fromisoformat(value)
+                if parsed.tzinfo is None:
+                    parsed = parsed.replace(tzinfo=timezone.utc)
+                seconds = parsed.timestamp()
+            if not 0 <= seconds <= MAX_HISTORY_TIMESTAMP:
+                raise ValueError(f"Timestamp out of range: {value}")
+            return seconds
+
+        try:
+            end = parse_time(request.args.get("to"), time.time())
+            start = parse_time(request.args.get("from"), end - 86400)
+            max_points = min(max(int(request.args.get("max_points", 2000)), 1), 10000)
+        except ValueError:
+            return jsonify({"error": "Invalid 'from', 'to' or 'max_points' parameter"}), 400
+
+        if start > end:
+            return jsonify({"error": "'from' must be before 'to'"}), 400
+        if end - start > 366 * 86400:
+            return jsonify({"error": "A maximum range of one year is allowed"}), 400
+
+        chunks = snapshot_store.read(symbol, ANALYSIS_INTERVALS[interval], start, end)
+        total = sum(len(chunk) for chunk in chunks)
+        step = -(-total // max_points) if total else 1
+
+        columns = {}
+        for field in SNAPSHOT_DTYPE.names:
+            values = [chunk[field][::step] for chunk in chunks]
+            if not values:
+                columns[field] = []
+            elif SNAPSHOT_DTYPE[field].kind == "f":
+                columns[field] = [None if value != value else value for chunk in values for value in chunk.tolist()]
+            else:
+                columns[field] = [value for chunk in values for value in chunk.tolist()]
+
+        return jsonify(
+            {
+                "symbol": symbol,
+                "interval": interval,
+                "from": start,
+                "to": end,
+                "count": len(columns["ts"]),
+                "columns": columns,
+            }
+        )
+
+    @app.route("/api/stocks/batch", methods=["POST"])
+    @csrf.exempt
+    @limiter.limit("10 per minute")
+    def get_stocks_batch():
+        """API endpoint to get stock data for several symbols in one request.
+
+        Expects a JSON body of the form {"symbols": ["AAPL", "BINANCE:BTCUSDT", ...]}.
+
+        Returns:
+            jsonify: A JSON response mapping each symbol to its stock data, plus
+            the list of symbols that could not be found.
+        """
+        data = request.get_json(silent=True) or {}
+        symbols = data.get("symbols")
+
+        if not isinstance(symbols, list) or not symbols:
+            return jsonify({"error": "A non-empty list of symbols is required"}), 400
+
+        if len(symbols) > 20:
+            return jsonify({"error": "A maximum of 20 symbols is allowed per request"}), 400
+
+        normalized = []
+        for symbol in symbols:
+            if not isinstance(symbol, str) or not re.match(r"^[A-Za-z0-9]{1,20}(:[A-Za-z0-9]{1,20})?$", symbol.strip()):
+                return jsonify({"error": f"Invalid symbol: {symbol}"}), 400
+            normalized.append(symbol.strip().upper())
+
+        analyses = get_stock_analyses(normalized)
+
+        return jsonify(
+            {
+                "results": {symbol: analysis for symbol, analysis in analyses.items() if analysis},
+                "not_found": [symbol for symbol, analysis in analyses.items() if not analysis],
+            }
+        )
+
+    @app.route("/api/watchlist/dashboard")
+    @csrf.exempt
+    @login_required
+    @limiter.limit("30 per minute")
+    def watchlist_dashboard():
+        """API endpoint to get the user's watchlist with every symbol's analysis.
+
+        Cached analyses are read with a single MGET. Misses are fetched in one
+        batched upstream round, and stale entries are refreshed in the background.
+        The response carries an ETag and answers a matching If-None-Match with 304.
+
+        Returns:
+            Response: A compact JSON payload with one entry per watchlist symbol.
+        """
+        interval = Interval.INTERVAL_1_DAY
+        stocks = (
+            StockWatchlist.query.filter_by(user_id=current_user.id)
+            .order_by(StockWatchlist.added_at)
+            .all()
+        )
+        symbols = [stock.symbol.upper() for stock in stocks]
+        analyses = get_watchlist_analyses(symbols, interval)
+
+        items = []
+        for stock, symbol in zip(stocks, symbols):
+            analysis = analyses.get(symbol) or {}
+            summary = analysis.get("technical_analysis", {}).get("summary", {})
+            items.append(
+                {
+                    "symbol": stock.symbol,
+                    "added_at": stock.added_at.isoformat(),
+                    "notes": stock.notes,
+                    "name": analysis.get("name"),
+                    "price": analysis.get("price"),
+                    "change": analysis.get("change"),
+                    "volume": analysis.get("volume"),
+                    "recommendation": summary.get("RECOMMENDATION"),
+                    "rsi": analysis.get("indicators", {}).get("rsi"),
+                    "is_crypto": analysis.get("is_crypto"),
+                }
+            )
+
+        body = json.dumps({"items": items}, separators=(",", ":"))
+        etag = hashlib.md5(body.encode()).hexdigest()
+        if request.if_none_match.contains(etag):
+            response = make_response("", 304)
+        else:
+            response = make_response(body)
+            response.mimetype = "application/json"
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
+
     @app.route("/api/watchlist", methods=["GET", "POST", "DELETE"])
     @csrf.exempt
     @login_required
@@ -771,6 +1146,21 @@ def init_routes(app: Flask) -> None:
             if not message:
                 return jsonify({"error": "Message is required"}), 400
 
+            if len(symbols) > MAX_SUGGESTION_BATCH:
+                return jsonify({"error": f"A maximum of {MAX_SUGGESTION_BATCH} symbols is allowed per message"}), 400
+
+            unknown_symbols = find_unknown_symbols(symbols)
+            if unknown_symbols:
+                return (
+                    jsonify(
+                        {
+                            "error": f"Unknown symbol(s): {', '.join(unknown_symbols)}",
+                            "suggestions": unknown_symbols,
+                        }
+                    ),
+                    400,
+                )
+
             ai_service = AIService()
             token_count = ai_service.token_count(message)
             if token_count > 500:
@@ -853,8 +1243,8 @@ def init_routes(app: Flask) -> None:
             current_user.daily_message_count += 1
             db.session.commit()
 
-            invalidate_cache_pattern(f"db:*chat_messages:{chat.id}:*")
-            invalidate_cache_pattern(f"db:*user_chats:{current_user.id}:*")
+            bump_generation("chat_messages", chat.id)
+            bump_generation("user_chats", current_user.id)
 
             db.session.flush()
             db.session.commit()
@@ -940,7 +1330,7 @@ def init_routes(app: Flask) -> None:
         if per_page > 20:
             per_page = 20
 
-        cache_key: str = f"user_chats:{current_user.id}:{page}:{per_page}"
+        cache_key: str = generation_key("user_chats", current_user.id, page, per_page)
 
         if not bypass_cache:
             cached_result = get_cached_query(cache_key)
@@ -990,7 +1380,7 @@ def init_routes(app: Flask) -> None:
         Returns:
             jsonify: A JSON response containing the chat messages.
         """
-        cache_key: str = f"chat_messages:{chat_id}:{current_user.id}"
+        cache_key: str = generation_key("chat_messages", chat_id, current_user.id)
         cached_result = get_cached_query(cache_key)
 
         if cached_result:
@@ -1145,7 +1535,7 @@ def init_routes(app: Flask) -> None:
         db.session.add(chat)
         db.session.commit()
 
-        invalidate_cache_pattern(f"db:*user_chats:{current_user.id}:*")
+        bump_generation("user_chats", current_user.id)
 
         return jsonify({"chat_id": chat.id})
 
@@ -1172,9 +1562,9 @@ def init_routes(app: Flask) -> None:
             db.session.delete(chat)
             db.session.commit()
 
-            invalidate_cache_pattern(f"db:*chat_messages:{chat_id}:*")
+            bump_generation("chat_messages", chat_id)
 
-            invalidate_cache_pattern(f"db:*user_chats:{current_user.id}:*")
+            bump_generation("user_chats", current_user.id)
 
             return jsonify({"message": "Chat deleted successfully"})
         except Exception as e:
@@ -1188,11 +1578,15 @@ def init_routes(app: Flask) -> None:
         """API endpoint to cleanup empty chats."""
         try:
             empty_chats_subq = ~db.exists().where(ChatMessage.chat_id == Chat.id)
-            Chat.query.filter(Chat.user_id == current_user.id, empty_chats_subq).delete(
+            deleted = Chat.query.filter(Chat.user_id == current_user.id, empty_chats_subq).delete(
                 synchronize_session=False
             )
 
             db.session.commit()
+
+            if deleted:
+                bump_generation("user_chats", current_user.id)
+
             return jsonify({"message": "Empty chats cleaned up successfully"})
         except Exception as e:
             db.session.rollback()
@@ -1207,7 +1601,7 @@ def init_routes(app: Flask) -> None:
             Chat.query.filter_by(user_id=current_user.id).delete(synchronize_session=False)
             db.session.commit()
 
-            invalidate_cache_pattern(f"db:*user_chats:{current_user.id}:*")
+            bump_generation("user_chats", current_user.id)
 
             return jsonify({"message": "All chats cleared successfully"})
         except Exception as e:
@@ -1304,6 +1698,13 @@ def init_routes(app: Flask) -> None:
                     datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
                     + timedelta(days=1)
                 ).isoformat(),
+                "stock_analysis_fetches": analysis_flight.stats(),
+                "stock_analysis_prefetch": prefetcher.stats(),
+                "negative_symbol_cache": negative_cache.stats(),
+                "upstream_scanner": scanner_governor.stats(),
+                "symbols_db": symbols_db_pool.stats(),
+                "symbol_routes_db": symbol_resolver.pool.stats(),
+                "cache": cache_stats(),
             }
         )
 
@@ -1537,18 +1938,32 @@ def process_chat_operation(app, operation_id):
 
             if symbols and len(symbols) > 0:
                 stock_data = {}
-                for symbol in symbols:
-                    try:
-                        analysis = get_stock_analysis(symbol)
-                        if analysis:
-                            stock_data[symbol] = analysis
-                    except Exception as e:
-                        print(f"Error analyzing {symbol}: {e}")
+                timeframe_data = {}
+                try:
+                    requested = [symbol.upper() for symbol in symbols]
+                    if CHAT_TIMEFRAME_PATTERN.search(message_text or ""):
+                        pool = eventlet.GreenPool(len(CHAT_TIMEFRAMES) + 1)
+                        timeframe_batches = pool.imap(
+                            lambda interval: get_stock_analyses(requested, interval),
+                            [Interval.INTERVAL_1_DAY] + CHAT_TIMEFRAMES,
+                        )
+                        analyses = next(timeframe_batches)
+                        timeframe_batches = zip(CHAT_TIMEFRAMES, timeframe_batches)
+                    else:
+                        analyses = get_stock_analyses(requested, Interval.INTERVAL_1_DAY)
+                        timeframe_batches = get_cached_stock_analyses(requested, CHAT_TIMEFRAMES).items()
+                    stock_data = {symbol: analysis for symbol, analysis in analyses.items() if analysis}
+                    for interval, batch in timeframe_batches:
+                        for symbol, analysis in batch.items():
+                            if analysis:
+                                timeframe_data.setdefault(symbol, {})[interval] = analysis
+                except Exception as e:
+                    print(f"Error analyzing {', '.join(symbols)}: {e}")
 
                 if stock_data:
                     context += "Stock Analysis:\n\n"
                     for symbol, data in stock_data.items():
-                        formatted_data = format_stock_data(data)
+                        formatted_data = format_stock_data(data, timeframes=timeframe_data.get(symbol))
                         context += formatted_data + "\n\n"
 
             chat_history = None
@@ -1612,9 +2027,9 @@ def process_chat_operation(app, operation_id):
 
             db.session.commit()
 
-            invalidate_cache_pattern(f"db:*chat_messages:{operation.chat_id}:*")
+            bump_generation("chat_messages", operation.chat_id)
 
-            invalidate_cache_pattern(f"db:*user_chats:{operation.user_id}:*")
+            bump_generation("user_chats", operation.user_id)
 
             socketio.emit(
                 "chat_completed",
@@ -1640,9 +2055,322 @@ def process_chat_operation(app, operation_id):
                     "chat_error", {"operation_id": operation_id, "error": str(e)}, room=str(operation.user_id)
                 )
 
+
+ANALYSIS_INTERVALS: dict[str, str] = {
+    "1m": Interval.INTERVAL_1_MINUTE,
+    "5m": Interval.INTERVAL_5_MINUTES,
+    "15m": Interval.INTERVAL_15_MINUTES,
+    "30m": Interval.INTERVAL_30_MINUTES,
+    "1h": Interval.INTERVAL_1_HOUR,
+    "2h": Interval.INTERVAL_2_HOURS,
+    "4h": Interval.INTERVAL_4_HOURS,
+    "1d": Interval.INTERVAL_1_DAY,
+    "1W": Interval.INTERVAL_1_WEEK,
+    "1M": Interval.INTERVAL_1_MONTH,
+}
+
+ANALYSIS_SOFT_TTLS: dict[str, int] = {
+    Interval.INTERVAL_1_MINUTE: 30,
+    Interval.INTERVAL_5_MINUTES: 45,
+    Interval.INTERVAL_15_MINUTES: 60,
+    Interval.INTERVAL_30_MINUTES: 90,
+    Interval.INTERVAL_1_HOUR: 120,
+    Interval.INTERVAL_2_HOURS: 180,
+    Interval.INTERVAL_4_HOURS: 240,
+    Interval.INTERVAL_1_DAY: 300,
+    Interval.INTERVAL_1_WEEK: 3600,
+    Interval.INTERVAL_1_MONTH: 10800,
+}
+
+ANALYSIS_HARD_TTL_FACTOR: int = 6
+LOCAL_ANALYSIS_SOFT_TTL: int = 30
+
+CHAT_TIMEFRAMES: list[str] = [Interval.INTERVAL_1_HOUR, Interval.INTERVAL_4_HOURS, Interval.INTERVAL_1_WEEK]
+
+# Chat messages matching this are about other timeframes than the daily one, so
+# CHAT_TIMEFRAMES are fetched for them. Other messages only get the timeframe
+# analyses that are already cached.
+CHAT_TIMEFRAME_PATTERN = re.compile(
+    r"\b(time ?frames?|intraday|hourly|weekly|short[- ]term|long[- ]term|swing|scalp\w*|1h|4h|1w|h1|h4)\b",
+    re.IGNORECASE,
+)
+
+analysis_flight = SingleFlight("stock_analysis")
+
+
+def lookup_symbol_route(symbol: str) -> tuple | None:
+    """Resolves a symbol to its TradingView route without any upstream call.
+
+    Handles both 'EXCHANGE:SYMBOL' notation and bare symbols known to the
+    symbol classification index.
+
+    Args:
+        symbol (str): The requested symbol.
+
+    Returns:
+        tuple | None: A (screener, exchange, tv_symbol, name) tuple, or None if
+        the symbol has to be located by probing exchanges.
+    """
+    if symbol.count(":") > 1:
+        return None
+
+    info = symbol_index.classify(symbol)
+    if ":" not in symbol and not info.listed:
+        return None
+
+    return info.screener, info.exchange, info.symbol, info.name
+
+
+def resolve_symbol_route(symbol: str) -> tuple | None:
+    """Resolves a symbol to its TradingView route from the index or a remembered probe.
+
+    Args:
+        symbol (str): The requested symbol.
+
+    Returns:
+        tuple | None: A (screener, exchange, tv_symbol, name) tuple, or None if
+        the symbol has to be located by probing exchanges.
+    """
+    route = lookup_symbol_route(symbol)
+    if route is None and ":" not in symbol:
+        remembered = symbol_resolver.get(symbol)
+        if remembered:
+            route = (remembered["screener"], remembered["exchange"], remembered["display_symbol"], None)
+    return route
+
+
+def build_analysis_response(
+    symbol: str, display_symbol: str, exchange: str, screener: str, name: str | None, analysis
+) -> dict:
+    """Builds the API response dictionary for a TradingView analysis.
+
+    Args:
+        symbol (str): The symbol as requested by the caller.
+        display_symbol (str): The symbol as listed on the exchange.
+        exchange (str): The exchange the analysis was retrieved from.
+        screener (str): The TradingView screener used.
+        name (str | None): The instrument description, looked up if missing.
+        analysis: The tradingview_ta Analysis object.
+
+    Returns:
+        dict: A dictionary containing the stock analysis data.
+    """
+    indicators = analysis.indicators
+    info = symbol_index.classify(f"{exchange}:{display_symbol}")
+
+    if not name:
+        name = info.name or COMMON_STOCKS.get(display_symbol, f"{exchange}:{display_symbol}")
+
+    is_crypto = info.asset_class == "crypto" or screener == "crypto"
+
+    if is_crypto:
+        if info.quote:
+            name = f"{info.base} / {info.quote}"
+        else:
+            name = CRYPTO_SYMBOLS.get(symbol) or CRYPTO_SYMBOLS.get(display_symbol, name)
+
+    return {
+        "symbol": symbol,
+        "exchange": exchange,
+        "screener": screener,
+        "display_symbol": display_symbol,
+        "name": name,
+        "price": indicators.get("close", 0),
+        "change": indicators.get("change", 0) / 100,
+        "volume": int(indicators.get("volume", 0)),
+        "marketCap": 0,
+        "peRatio": None,
+        "dayHigh": indicators.get("high", 0),
+        "dayLow": indicators.get("low", 0),
+        "technical_analysis": {
+            "summary": analysis.summary,
+            "oscillators": analysis.oscillators,
+            "moving_averages": analysis.moving_averages,
+        },
+        "indicators": {
+            "rsi": indicators.get("RSI", None),
+            "macd": indicators.get("MACD.macd", None),
+            "stoch_k": indicators.get("Stoch.K", None),
+            "stoch_d": indicators.get("Stoch.D", None),
+            "bb_upper": indicators.get("BB.upper", None),
+            "bb_lower": indicators.get("BB.lower", None),
+        },
+        "is_crypto": is_crypto,
+    }
+
+
+def build_local_analysis_response(symbol: str, local: dict) -> dict:
+    """Builds the API response dictionary for a locally computed analysis.
+
+    The shape matches build_analysis_response, with `source` set to "local" so
+    clients can tell the values did not come from TradingView.
+
+    Args:
+        symbol (str): The symbol as requested by the caller.
+        local (dict): The entry returned by services.indicators.local_analyses.
+
+    Returns:
+        dict: A dictionary containing the stock analysis data.
+    """
+    info = symbol_index.classify(symbol)
+    is_crypto = info.asset_class == "crypto"
+
+    return {
+        "symbol": symbol,
+        "exchange": info.exchange,
+        "screener": info.screener,
+        "display_symbol": info.symbol,
+        "name": info.name or COMMON_STOCKS.get(info.symbol, info.symbol),
+        "price": local["price"],
+        "change": local["change"],
+        "volume": local["volume"],
+        "marketCap": 0,
+        "peRatio": None,
+        "dayHigh": local["dayHigh"],
+        "dayLow": local["dayLow"],
+        "technical_analysis": {
+            "summary": local["summary"],
+            "oscillators": local["oscillators"],
+            "moving_averages": local["moving_averages"],
+        },
+        "indicators": local["indicators"],
+        "is_crypto": is_crypto,
+        "source": "local",
+    }
+
+
+def get_local_stock_analyses(symbols: list, interval: Interval = Interval.INTERVAL_1_DAY) -> dict:
+    """Computes analyses locally for symbols TradingView could not serve.
+
+    Results are cached with a short soft TTL so the next request retries
+    TradingView once it is reachable again.
+
+    Args:
+        symbols (list): The stock symbols to analyze.
+        interval (Interval): The interval for the analysis.
+
+    Returns:
+        dict: A mapping of each symbol to its analysis data, or None if no bars
+        were available.
+    """
+    try:
+        computed = local_analyses(symbols, interval)
+    except Exception as e:
+        print(f"Error computing local analyses: {str(e)}")
+        computed = {}
+
+    _, hard_ttl = analysis_ttls(interval)
+    results = {}
+    for symbol in symbols:
+        if symbol not in computed:
+            results[symbol] = None
+            continue
+
+        response_data = build_local_analysis_response(symbol, computed[symbol])
+        cache_db_query(f"stock_analysis:{symbol}:{interval}", response_data, hard_ttl, soft_timeout=LOCAL_ANALYSIS_SOFT_TTL)
+        results[symbol] = response_data
+    return results
+
+
+def analysis_ttls(interval: str) -> tuple[int, int]:
+    """Returns the soft and hard cache TTLs for an analysis interval.
+
+    Longer timeframes change more slowly, so their analyses are kept longer.
+
+    Args:
+        interval (str): The analysis interval.
+
+    Returns:
+        tuple[int, int]: The (soft, hard) TTLs in seconds.
+    """
+    soft_ttl = ANALYSIS_SOFT_TTLS.get(interval, ANALYSIS_SOFT_TTLS[Interval.INTERVAL_1_DAY])
+    return soft_ttl, soft_ttl * ANALYSIS_HARD_TTL_FACTOR
+
+
+def get_stock_analysis_timeframes(symbol: str, intervals: list) -> dict:
+    """Retrieves stock analysis data for one symbol over several intervals concurrently.
+
+    Args:
+        symbol (str): The stock symbol to analyze.
+        intervals (list): The intervals to analyze.
+
+    Returns:
+        dict: A mapping of each interval to its analysis data, or None if unavailable.
+    """
+    pool = eventlet.GreenPool(len(intervals))
+    analyses = pool.imap(lambda interval: get_stock_analysis(symbol, interval), intervals)
+    return dict(zip(intervals, analyses))
+
+
 def get_stock_analysis(symbol: str, interval: Interval = Interval.INTERVAL_1_DAY) -> dict:
     """Retrieves stock analysis data for a given symbol.
 
+    Concurrent cache misses for the same symbol and interval, in this worker or
+    in others, share a single upstream fetch.
+
+    Args:
+        symbol (str): The stock symbol to analyze.
+        interval (Interval): The interval for the analysis.
+
+    Returns:
+        dict: A dictionary containing the stock analysis data.
+    """
+    if symbol == "NONE" or not symbol:
+        return None
+
+    cached_result = get_cached_stock_analysis(symbol, interval)
+    if cached_result:
+        return cached_result
+
+    if negative_cache.get(symbol) is not None:
+        return None
+
+    return analysis_flight.do(f"{symbol}:{interval}", _fetch_stock_analysis, symbol, interval)
+
+
+def get_cached_stock_analysis(symbol: str, interval: Interval = Interval.INTERVAL_1_DAY) -> dict | None:
+    """Returns the cached analysis for a symbol, refreshing it in the background if stale.
+
+    Args:
+        symbol (str): The stock symbol to analyze.
+        interval (Interval): The interval for the analysis.
+
+    Returns:
+        dict | None: The cached analysis data, or None on a miss.
+    """
+    cached_result = get_cached_query(
+        f"stock_analysis:{symbol}:{interval}",
+        revalidate=lambda: analysis_flight.do(f"{symbol}:{interval}", _fetch_stock_analysis, symbol, interval),
+    )
+    prefetcher.record_lookup(symbol, interval, hit=bool(cached_result))
+    return cached_result
+
+
+def get_cached_stock_analyses(symbols: list, intervals: list) -> dict:
+    """Returns the cached analyses of several symbols over several intervals with a single MGET.
+
+    Nothing is fetched upstream and stale entries are not refreshed.
+
+    Args:
+        symbols (list): The stock symbols.
+        intervals (list): The intervals.
+
+    Returns:
+        dict: A mapping of each interval to the cached analyses by symbol.
+    """
+    cache_keys = {
+        f"stock_analysis:{symbol}:{interval}": (interval, symbol) for interval in intervals for symbol in symbols
+    }
+    results = {interval: {} for interval in intervals}
+    for key, analysis in get_cached_queries(list(cache_keys)).items():
+        interval, symbol = cache_keys[key]
+        results[interval][symbol] = analysis
+    return results
+
+
+def _fetch_stock_analysis(symbol: str, interval: Interval = Interval.INTERVAL_1_DAY) -> dict:
+    """Fetches stock analysis data for a given symbol from TradingView.
+
     Args:
         symbol (str): The stock symbol to analyze.
         interval (Interval): The interval for the analysis.
@@ -1655,322 +2383,242 @@ def get_stock_analysis(symbol: str, interval: Interval = Interval.INTERVAL_1_DAY
             return None
 
         cache_key = f"stock_analysis:{symbol}:{interval}"
-        cached_result = get_cached_query(cache_key)
-        if cached_result:
-            return cached_result
-
-        if ":" in symbol:
-            parts = symbol.split(":")
-            if len(parts) == 2:
-                exchange = parts[0]
-                raw_symbol = parts[1]
+        original_symbol = symbol
+        route = lookup_symbol_route(symbol)
 
-                screener = None
-                try:
-                    conn = symbols_db_pool.get_connection()
-                    try:
-                        cursor = conn.cursor()
-                        cursor.execute(
-                            "SELECT screener FROM tv WHERE exchange = ? AND symbol = ? LIMIT 1",
-                            (exchange, raw_symbol)
-                        )
-                        result = cursor.fetchone()
-                        if result:
-                            screener = result[0]
-                    finally:
-                        symbols_db_pool.return_connection(conn)
-                except Exception as db_error:
-                    print(f"Database error: {str(db_error)}")
-
-                if not screener:
-                    exchange_to_screener = {
-                        "NASDAQ": "america",
-                        "NYSE": "america",
-                        "AMEX": "america",
-                        "TSX": "canada",
-                        "LSE": "uk",
-                        "FWB": "germany",
-                        "BINANCE": "crypto",
-                        "COINBASE": "crypto",
-                        "KRAKEN": "crypto",
-                        "BITFINEX": "crypto",
-                        "FTX": "crypto",
-                        "KUCOIN": "crypto",
-                        "FX": "forex",
-                        "OANDA": "forex",
-                        "CRYPTO": "crypto",
-                    }
-
-                    screener = exchange_to_screener.get(exchange, "america")
+        if route:
+            screener, exchange, symbol, name = route
+            try:
+                handler = TA_Handler(
+                    symbol=symbol,
+                    screener=screener,
+                    exchange=exchange,
+                    interval=interval,
+                )
+                analysis = scanner_governor.call(handler.get_analysis, is_failure=is_tradingview_failure)
+            except UpstreamUnavailable as e:
+                print(f"Computing {original_symbol} locally: {str(e)}")
+                return get_local_stock_analyses([original_symbol], interval)[original_symbol]
+            except Exception as e:
+                print(f"Error analyzing {original_symbol}: {str(e)}")
+                if "not found" in str(e).lower():
+                    negative_cache.record_miss(original_symbol)
+                    return None
+                return get_local_stock_analyses([original_symbol], interval)[original_symbol]
+        elif ":" in symbol:
+            negative_cache.record_miss(original_symbol)
+            return None
+        else:
+            name = None
+            analysis = None
 
+            route = symbol_resolver.get(symbol)
+            if route:
                 try:
                     handler = TA_Handler(
-                        symbol=raw_symbol,
-                        screener=screener,
-                        exchange=exchange,
+                        symbol=route["display_symbol"],
+                        screener=route["screener"],
+                        exchange=route["exchange"],
                         interval=interval,
                     )
-                    analysis = handler.get_analysis()
+                    analysis = scanner_governor.call(handler.get_analysis, is_failure=is_tradingview_failure)
+                    symbol = route["display_symbol"]
+                    exchange = route["exchange"]
+                    screener = route["screener"]
+                except UpstreamUnavailable:
+                    raise
                 except Exception as e:
-                    print(f"Error analyzing {symbol}: {str(e)}")
+                    print(f"Remembered route for {symbol} failed: {str(e)}")
+                    symbol_resolver.record_failure(original_symbol)
+
+            if analysis is None:
+                probed = probe_symbol(symbol, interval)
+                if probed is None:
+                    print(f"{symbol} not found on any exchange")
+                    negative_cache.record_miss(original_symbol)
                     return None
-            else:
-                return None
-        else:
-            try:
-                conn = symbols_db_pool.get_connection()
-                try:
-                    cursor = conn.cursor()
-                    cursor.execute(
-                        "SELECT screener, exchange, symbol, desc FROM tv WHERE UPPER(symbol) = ? LIMIT 1",
-                        (symbol.upper(),)
-                    )
-                    result = cursor.fetchone()
-
-                    if result:
-                        screener, exchange, db_symbol, desc = result
-                        try:
-                            handler = TA_Handler(
-                                symbol=db_symbol,
-                                screener=screener,
-                                exchange=exchange,
-                                interval=interval,
-                            )
-                            analysis = handler.get_analysis()
-                            name = desc
-                        except Exception as e:
-                            print(f"Error analyzing {symbol} from database: {str(e)}")
-                            return None
-                    else:
-                        is_crypto = symbol in ['BTC', 'ETH', 'XRP', 'LTC', 'BCH', 'ADA', 'DOT', 'LINK', 'XLM', 'DOGE', 'UNI', 'SOL'] or \
-                                    symbol.endswith('USDT') or symbol.endswith('USD') or symbol.endswith('BTC') or symbol.endswith('ETH')
-
-                        if is_crypto:
-                            original_symbol = symbol
-
-                            if symbol == 'BTC':
-                                try_symbols = ['BTCUSD', 'BTCUSDT']
-                                exchanges = ['BINANCE', 'COINBASE']
-                                success = False
-
-                                for ex in exchanges:
-                                    for sym in try_symbols:
-                                        try:
-                                            handler = TA_Handler(
-                                                symbol=sym,
-                                                screener="crypto",
-                                                exchange=ex,
-                                                interval=interval,
-                                            )
-                                            analysis = handler.get_analysis()
-                                            symbol = sym
-                                            exchange = ex
-                                            screener = "crypto"
-                                            success = True
-                                            break
-                                        except Exception as e:
-                                            continue
-
-                                    if success:
-                                        break
-
-                                if not success:
-                                    print("Could not find BTC on any exchange")
-                                    return None
-
-                            elif symbol in ['ETH', 'XRP', 'LTC', 'BCH', 'ADA', 'DOT', 'LINK', 'XLM', 'DOGE', 'UNI', 'SOL', 'AVAX', 'MATIC', 'LUNA', 'SHIB', 'ATOM', 'ALGO', 'XTZ', 'FIL', 'VET', 'EOS', 'AAVE', 'MKR', 'COMP'] and \
-                                    not (symbol.endswith('USDT') or symbol.endswith('USD') or symbol.endswith('BTC')):
-                                symbol = f"{symbol}USDT"
-
-                                try:
-                                    handler = TA_Handler(
-                                        symbol=symbol,
-                                        screener="crypto",
-                                        exchange="BINANCE",
-                                        interval=interval,
-                                    )
-                                    analysis = handler.get_analysis()
-                                    exchange = "BINANCE"
-                                    screener = "crypto"
-                                except Exception as binance_error:
-                                    try:
-                                        if symbol.endswith("USDT"):
-                                            alt_symbol = symbol[:-4] + "USD"
-                                            handler = TA_Handler(
-                                                symbol=alt_symbol,
-                                                screener="crypto",
-                                                exchange="BINANCE",
-                                                interval=interval,
-                                            )
-                                            analysis = handler.get_analysis()
-                                            symbol = alt_symbol
-                                            exchange = "BINANCE"
-                                            screener = "crypto"
-                                        else:
-                                            handler = TA_Handler(
-                                                symbol=symbol,
-                                                screener="crypto",
-                                                exchange="COINBASE",
-                                                interval=interval,
-                                            )
-                                            analysis = handler.get_analysis()
-                                            exchange = "COINBASE"
-                                            screener = "crypto"
-                                    except Exception as coinbase_error:
-                                        print(f"Crypto {symbol} not found in BINANCE or COINBASE")
-                                        return None
-                            else:
-                                try:
-                                    handler = TA_Handler(
-                                        symbol=symbol,
-                                        screener="crypto",
-                                        exchange="BINANCE",
-                                        interval=interval,
-                                    )
-                                    analysis = handler.get_analysis()
-                                    exchange = "BINANCE"
-                                    screener = "crypto"
-                                except Exception as binance_error:
-                                    try:
-                                        handler = TA_Handler(
-                                            symbol=symbol,
-                                            screener="crypto",
-                                            exchange="COINBASE",
-                                            interval=interval,
-                                        )
-                                        analysis = handler.get_analysis()
-                                        exchange = "COINBASE"
-                                        screener = "crypto"
-                                    except Exception as coinbase_error:
-                                        print(f"Crypto {symbol} not found in BINANCE or COINBASE")
-                                        return None
-                        else:
-                            try:
-                                handler = TA_Handler(
-                                    symbol=symbol,
-                                    screener="america",
-                                    exchange="NASDAQ",
-                                    interval=interval,
-                                )
-                                analysis = handler.get_analysis()
-                                exchange = "NASDAQ"
-                                screener = "america"
-                            except Exception as nasdaq_error:
-                                try:
-                                    handler = TA_Handler(
-                                        symbol=symbol,
-                                        screener="america",
-                                        exchange="NYSE",
-                                        interval=interval,
-                                    )
-                                    analysis = handler.get_analysis()
-                                    exchange = "NYSE"
-                                    screener = "america"
-                                except Exception as nyse_error:
-                                    try:
-                                        handler = TA_Handler(
-                                            symbol=symbol,
-                                            screener="america",
-                                            exchange="AMEX",
-                                            interval=interval,
-                                        )
-                                        analysis = handler.get_analysis()
-                                        exchange = "AMEX"
-                                        screener = "america"
-                                    except Exception as amex_error:
-                                        print(f"Stock {symbol} not found in US exchanges")
-                                        return None
-                finally:
-                    symbols_db_pool.return_connection(conn)
-            except Exception as db_error:
-                print(f"Database error: {str(db_error)}")
-                return None
-
-        indicators = analysis.indicators
-
-        if 'name' not in locals() or not name:
-            try:
-                conn = symbols_db_pool.get_connection()
-                try:
-                    cursor = conn.cursor()
-                    cursor.execute(
-                        "SELECT desc FROM tv WHERE exchange = ? AND symbol = ? LIMIT 1",
-                        (exchange, symbol)
-                    )
-                    result = cursor.fetchone()
-                    if result:
-                        name = result[0]
-                    else:
-                        name = COMMON_STOCKS.get(symbol, f"{exchange}:{symbol}")
-                finally:
-                    symbols_db_pool.return_connection(conn)
-            except Exception:
-                name = COMMON_STOCKS.get(symbol, f"{exchange}:{symbol}")
-
-        if exchange in ["BINANCE", "COINBASE", "KRAKEN", "CRYPTO"] or screener == "crypto":
-            base_currency = symbol
-            quote_currency = ""
-
-            if "USDT" in symbol:
-                base_currency = symbol.split('USDT')[0]
-                quote_currency = "USDT"
-            elif "USD" in symbol:
-                base_currency = symbol.split('USD')[0]
-                quote_currency = "USD"
-            elif "BTC" in symbol and symbol != "BTC":
-                parts = symbol.split('BTC')
-                if len(parts) > 1 and not parts[1]:
-                    base_currency = parts[0]
-                    quote_currency = "BTC"
-
-            if quote_currency:
-                name = f"{base_currency} / {quote_currency}"
-            else:
-                if 'original_symbol' in locals() and original_symbol in CRYPTO_SYMBOLS:
-                    name = CRYPTO_SYMBOLS.get(original_symbol)
-                else:
-                    name = CRYPTO_SYMBOLS.get(symbol, name)
-
-        original_symbol = locals().get('original_symbol', symbol)
-
-        response_data = {
-            "symbol": original_symbol,
-            "exchange": exchange,
-            "screener": screener,
-            "display_symbol": symbol,
-            "name": name,
-            "price": indicators.get("close", 0),
-            "change": indicators.get("change", 0) / 100,
-            "volume": int(indicators.get("volume", 0)),
-            "marketCap": 0,
-            "peRatio": None,
-            "dayHigh": indicators.get("high", 0),
-            "dayLow": indicators.get("low", 0),
-            "technical_analysis": {
-                "summary": analysis.summary,
-                "oscillators": analysis.oscillators,
-                "moving_averages": analysis.moving_averages,
-            },
-            "indicators": {
-                "rsi": indicators.get("RSI", None),
-                "macd": indicators.get("MACD.macd", None),
-                "stoch_k": indicators.get("Stoch.K", None),
-                "stoch_d": indicators.get("Stoch.D", None),
-                "bb_upper": indicators.get("BB.upper", None),
-                "bb_lower": indicators.get("BB.lower", None),
-            },
-            "is_crypto": exchange in ["BINANCE", "COINBASE", "KRAKEN", "CRYPTO"] or screener == "crypto"
-        }
 
-        cache_db_query(cache_key, response_data, 300)
+                screener, exchange, symbol, analysis = probed
+                symbol_resolver.record(original_symbol, exchange, screener, symbol)
+
+        response_data = build_analysis_response(
+            original_symbol, symbol, exchange, screener, name, analysis
+        )
+
+        soft_ttl, hard_ttl = analysis_ttls(interval)
+        cache_db_query(cache_key, response_data, hard_ttl, soft_timeout=soft_ttl)
+        snapshot_store.record(original_symbol, interval, response_data)
+        negative_cache.clear(original_symbol)
 
         return response_data
 
+    except UpstreamUnavailable as e:
+        print(f"Computing {original_symbol} locally: {str(e)}")
+        return get_local_stock_analyses([original_symbol], interval)[original_symbol]
     except Exception as e:
         print(f"Error analyzing {symbol}: {str(e)}")
         traceback.print_exc()
         return None
 
+
+def get_stock_analyses(symbols: list, interval: Interval = Interval.INTERVAL_1_DAY, force: bool = False) -> dict:
+    """Retrieves stock analysis data for several symbols at once.
+
+    Cached symbols are served from the cache. The others are fetched through
+    analysis_flight with one claim per symbol, so symbols another greenlet or
+    worker is already fetching, in a batch or on their own, are waited for
+    instead of being requested again.
+
+    Args:
+        symbols (list): The stock symbols to analyze.
+        interval (Interval): The interval for the analysis.
+        force (bool): Whether to skip the cache and always fetch from upstream.
+
+    Returns:
+        dict: A mapping of each requested symbol to its analysis data, or None
+        if the symbol could not be analyzed.
+    """
+    results = {}
+    missing = {}
+
+    for symbol in dict.fromkeys(symbols):
+        if symbol == "NONE" or not symbol:
+            results[symbol] = None
+            continue
+
+        if not force:
+            cached_result = get_cached_stock_analysis(symbol, interval)
+            if cached_result:
+                results[symbol] = cached_result
+                continue
+
+        if negative_cache.get(symbol) is not None:
+            results[symbol] = None
+            continue
+
+        missing[f"{symbol}:{interval}"] = symbol
+
+    if missing:
+        def fetch(keys: list) -> dict:
+            """Fetches the symbols this caller claimed."""
+            fetched = _fetch_stock_analyses([missing[key] for key in keys], interval)
+            return {f"{symbol}:{interval}": analysis for symbol, analysis in fetched.items()}
+
+        for key, analysis in analysis_flight.do_many(list(missing), fetch).items():
+            results[missing[key]] = analysis
+
+    return results
+
+
+def _fetch_stock_analyses(symbols: list, interval: Interval = Interval.INTERVAL_1_DAY) -> dict:
+    """Fetches the analyses of several symbols from upstream and caches them.
+
+    Symbols with a known route are grouped by screener and fetched with a
+    single multi-symbol scanner request per screener. Symbols that need
+    exchange probing fall back to the single-symbol fetch. While the scanner's
+    circuit breaker is open, symbols are computed locally in one batch
+    without any TradingView request.
+
+    Args:
+        symbols (list): The stock symbols to fetch.
+        interval (Interval): The interval for the analysis.
+
+    Returns:
+        dict: A mapping of each symbol to its analysis data, or None if the
+        symbol could not be analyzed.
+    """
+    results = {}
+    by_screener = {}
+    fallback = []
+    unavailable = []
+
+    for symbol in symbols:
+        route = resolve_symbol_route(symbol)
+        if route is None:
+            fallback.append(symbol)
+            continue
+
+        by_screener.setdefault(route[0], []).append((symbol, route))
+
+    for screener, entries in by_screener.items():
+        try:
+            analyses = scanner_governor.call(
+                get_multiple_analysis,
+                screener=screener,
+                interval=interval,
+                symbols=[f"{exchange}:{tv_symbol}" for _, (_, exchange, tv_symbol, _) in entries],
+            )
+        except UpstreamUnavailable as e:
+            print(f"Computing batch analysis for {screener} locally: {str(e)}")
+            unavailable.extend(symbol for symbol, _ in entries)
+            continue
+        except Exception as e:
+            print(f"Error fetching batch analysis for {screener}: {str(e)}")
+            fallback.extend(symbol for symbol, _ in entries)
+            continue
+
+        for symbol, (_, exchange, tv_symbol, name) in entries:
+            analysis = analyses.get(f"{exchange}:{tv_symbol}".upper())
+            if analysis is None:
+                fallback.append(symbol)
+                continue
+
+            try:
+                response_data = build_analysis_response(
+                    symbol, tv_symbol, exchange, screener, name, analysis
+                )
+            except Exception as e:
+                print(f"Error analyzing {symbol}: {str(e)}")
+                results[symbol] = None
+                continue
+
+            soft_ttl, hard_ttl = analysis_ttls(interval)
+            cache_db_query(f"stock_analysis:{symbol}:{interval}", response_data, hard_ttl, soft_timeout=soft_ttl)
+            negative_cache.clear(symbol)
+            snapshot_store.record(symbol, interval, response_data)
+            results[symbol] = response_data
+
+    for symbol in fallback:
+        if scanner_governor.is_open():
+            unavailable.append(symbol)
+            continue
+        results[symbol] = _fetch_stock_analysis(symbol, interval)
+
+    if unavailable:
+        results.update(get_local_stock_analyses(unavailable, interval))
+
+    return results
+
+
+def get_watchlist_analyses(symbols: list, interval: Interval = Interval.INTERVAL_1_DAY) -> dict:
+    """Retrieves the analyses of a watchlist with a single MGET and one batched fetch.
+
+    Stale entries are served and refreshed in the background, misses are
+    fetched together with get_stock_analyses.
+
+    Args:
+        symbols (list): The watchlist symbols, upper-cased.
+        interval (Interval): The interval for the analysis.
+
+    Returns:
+        dict: A mapping of each symbol to its analysis data, or None if the
+        symbol could not be analyzed.
+    """
+    cache_keys = {f"stock_analysis:{symbol}:{interval}": symbol for symbol in symbols}
+
+    cached_analyses = get_cached_queries(
+        list(cache_keys),
+        revalidate=lambda stale: get_stock_analyses([cache_keys[key] for key in stale], interval, force=True),
+    )
+    analyses = {cache_keys[key]: analysis for key, analysis in cached_analyses.items()}
+
+    misses = [symbol for symbol in dict.fromkeys(symbols) if symbol not in analyses]
+    if misses:
+        analyses.update(get_stock_analyses(misses, interval, force=True))
+
+    return analyses
+
+
 def get_total_users_count():
     """Gets the total count of users from the database and caches in Redis.
 
@@ -0,0 +1,132 @@
+from typing import Dict, List, Optional, Tuple
+
+from eventlet.greenpool import GreenPool
+from eventlet.queue import Empty, Queue
+from eventlet.semaphore import Semaphore
+from tradingview_ta import Interval, TA_Handler
+
+from services.symbol_index import symbol_index
+from services.upstream_governor import UpstreamUnavailable, is_tradingview_failure, scanner_governor
+
+STOCK_EXCHANGES         : List[str] = ["NASDAQ", "NYSE", "AMEX"]
+CRYPTO_EXCHANGES        : List[str] = ["BINANCE", "COINBASE"]
+CRYPTO_QUOTES           : List[str] = ["USDT", "USD"]
+
+MAX_PROBES_PER_UPSTREAM : int = 4
+PROBE_TIMEOUT           : int = 10
+
+_upstream_semaphores: Dict[str, Semaphore] = {}
+
+
+def probe_candidates(symbol: str) -> List[Tuple[str, str, str]]:
+    """Builds the (screener, exchange, tv_symbol) pairs worth probing for a symbol.
+
+    Crypto bases are tried against every quote currency on every crypto
+    exchange, crypto pairs on every crypto exchange, and anything else on the
+    US stock exchanges.
+
+    Args:
+        symbol (str): The bare symbol to locate.
+
+    Returns:
+        List[Tuple[str, str, str]]: Candidates in order of preference.
+    """
+    info = symbol_index.classify(symbol)
+
+    if info.asset_class == "crypto" and symbol == info.base:
+        return [
+            ("crypto", exchange, f"{info.base}{quote}")
+            for exchange in CRYPTO_EXCHANGES
+            for quote in CRYPTO_QUOTES
+        ]
+
+    if info.asset_class == "crypto":
+        return [("crypto", exchange, symbol) for exchange in CRYPTO_EXCHANGES]
+
+    return [("america", exchange, symbol) for exchange in STOCK_EXCHANGES]
+
+
+def _upstream_semaphore(screener: str) -> Semaphore:
+    """Returns the semaphore capping concurrent probes against one scanner endpoint.
+
+    Args:
+        screener (str): The TradingView screener, which selects the scanner endpoint.
+
+    Returns:
+        Semaphore: The shared semaphore for that screener.
+    """
+    semaphore = _upstream_semaphores.get(screener)
+    if semaphore is None:
+        semaphore = _upstream_semaphores.setdefault(screener, Semaphore(MAX_PROBES_PER_UPSTREAM))
+    return semaphore
+
+
+def _probe(candidate: Tuple[str, str, str], interval: str, results: Queue) -> None:
+    """Fetches the analysis for one candidate and reports the outcome.
+
+    Args:
+        candidate (Tuple[str, str, str]): The (screener, exchange, tv_symbol) to try.
+        interval (str): The interval for the analysis.
+        results (Queue): Queue receiving (candidate, analysis, None or the
+            UpstreamUnavailable error if the scanner refused the probe).
+    """
+    screener, exchange, tv_symbol = candidate
+    try:
+        with _upstream_semaphore(screener):
+            handler = TA_Handler(
+                symbol=tv_symbol,
+                screener=screener,
+                exchange=exchange,
+                interval=interval,
+                timeout=PROBE_TIMEOUT,
+            )
+            results.put((candidate, scanner_governor.call(handler.get_analysis, is_failure=is_tradingview_failure)))
+    except UpstreamUnavailable as e:
+        results.put((candidate, e))
+    except Exception:
+        results.put((candidate, None))
+
+
+def probe_symbol(symbol: str, interval: str = Interval.INTERVAL_1_DAY) -> Optional[Tuple[str, str, str, object]]:
+    """Probes all candidate exchanges for a symbol concurrently.
+
+    The first candidate to return a valid analysis wins and the remaining
+    probes are cancelled.
+
+    Args:
+        symbol (str): The bare symbol to locate.
+        interval (str): The interval for the analysis.
+
+    Returns:
+        Optional[Tuple[str, str, str, object]]: A (screener, exchange, tv_symbol,
+        analysis) tuple, or None if no exchange lists the symbol.
+
+    Raises:
+        UpstreamUnavailable: If the scanner is unavailable and no probe succeeded,
+        so the symbol cannot be declared missing.
+    """
+    if scanner_governor.is_open():
+        raise UpstreamUnavailable("Circuit breaker open for the TradingView scanner")
+
+    candidates = probe_candidates(symbol)
+    refused = None
+    results = Queue()
+    pool = GreenPool(len(candidates))
+    probes = [pool.spawn(_probe, candidate, interval, results) for candidate in candidates]
+
+    try:
+        for _ in candidates:
+            (screener, exchange, tv_symbol), analysis = results.get(timeout=PROBE_TIMEOUT * 2)
+            if isinstance(analysis, UpstreamUnavailable):
+                refused = analysis
+            elif analysis is not None:
+                return screener, exchange, tv_symbol, analysis
+    except Empty:
+        print(f"Timed out probing exchanges for {symbol}")
+    finally:
+        for probe in probes:
+            probe.kill()
+
+    if refused is not None:
+        raise refused
+    return None
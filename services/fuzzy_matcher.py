@@ -0,0 +1,343 @@
+import fcntl
+import hashlib
+import itertools
+import mmap
+import os
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+from eventlet import tpool
+
+from config import symbols_db_pool
+from services.suggestion_index import map_index_file, read_index_layout, suggestion_index, write_index_file
+from services.symbol_index import symbol_index
+
+FUZZY_INDEX_PATH    : str = os.path.join(os.path.dirname(symbols_db_pool.db_path), "fuzzy.idx")
+FUZZY_INDEX_MAGIC   : bytes = b"FUZIDX01"
+MAX_EDIT_DISTANCE   : int = 2
+SHORT_SYMBOL_LENGTH : int = 4
+DELETE_PREFIX_LENGTH: int = 8
+
+
+def _max_distance(length: int) -> int:
+    """Returns the edit distance tolerated for a symbol of a given length.
+
+    Args:
+        length (int): The length of the symbol.
+
+    Returns:
+        int: One edit for short symbols, MAX_EDIT_DISTANCE otherwise.
+    """
+    return 1 if length <= SHORT_SYMBOL_LENGTH else MAX_EDIT_DISTANCE
+
+
+def _delete_keys(symbol: str, distance: int) -> List[int]:
+    """Returns the index keys of every string obtained by deleting up to `distance` characters.
+
+    Only the first DELETE_PREFIX_LENGTH bytes are considered, which keeps the
+    index small for long crypto pairs. Candidates are verified against the
+    full symbol afterwards. A key is the remaining bytes, zero-padded and read
+    as a big-endian 64-bit integer, so it needs no hashing and is the same in
+    every process.
+
+    Args:
+        symbol (str): The symbol.
+        distance (int): The maximum number of deletions.
+
+    Returns:
+        List[int]: The keys, including the one of the unmodified prefix.
+    """
+    prefix = symbol.encode()[:DELETE_PREFIX_LENGTH]
+    deletes = {prefix}
+    for count in range(1, min(distance, len(prefix) - 1) + 1):
+        for positions in itertools.combinations(range(len(prefix)), count):
+            deletes.add(bytes(char for i, char in enumerate(prefix) if i not in positions))
+    return [int.from_bytes(delete.ljust(DELETE_PREFIX_LENGTH, b"\0"), "big") for delete in deletes]
+
+
+def _build_deletes(symbols: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Computes the deletion keys of many symbols at once.
+
+    Produces the same keys as _delete_keys, one deletion pattern at a time
+    over a matrix holding the prefix bytes of every symbol.
+
+    Args:
+        symbols (List[str]): The symbols; a symbol's position is its owner id.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Sorted keys and their owners, without
+        duplicate (key, owner) pairs.
+    """
+    prefixes = [symbol.encode()[:DELETE_PREFIX_LENGTH] for symbol in symbols]
+    matrix = np.frombuffer(
+        b"".join(prefix.ljust(DELETE_PREFIX_LENGTH, b"\0") for prefix in prefixes), dtype=np.uint8
+    ).reshape(len(symbols), DELETE_PREFIX_LENGTH)
+    prefix_lengths = np.array([len(prefix) for prefix in prefixes], dtype=np.int64)
+    distances = np.where(np.array([len(symbol) for symbol in symbols]) <= SHORT_SYMBOL_LENGTH, 1, MAX_EDIT_DISTANCE)
+
+    keys, owners = [], []
+    for count in range(MAX_EDIT_DISTANCE + 1):
+        for positions in itertools.combinations(range(DELETE_PREFIX_LENGTH), count):
+            selected = distances >= count
+            if positions:
+                selected &= (prefix_lengths > count) & (prefix_lengths > positions[-1])
+            rows = np.flatnonzero(selected)
+            kept = [i for i in range(DELETE_PREFIX_LENGTH) if i not in positions]
+            padded = np.zeros((len(rows), DELETE_PREFIX_LENGTH), dtype=np.uint8)
+            padded[:, :len(kept)] = matrix[rows][:, kept]
+            keys.append(padded.view(">u8").ravel().astype(np.uint64))
+            owners.append(rows.astype(np.uint32))
+
+    keys = np.concatenate(keys)
+    owners = np.concatenate(owners)
+    order = np.lexsort((owners, keys))
+    keys, owners = keys[order], owners[order]
+    unique = np.ones(len(keys), dtype=bool)
+    unique[1:] = (keys[1:] != keys[:-1]) | (owners[1:] != owners[:-1])
+    return keys[unique], owners[unique]
+
+
+def edit_distances(query: bytes, candidates: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Computes the optimal string alignment distances between a query and many candidates.
+
+    Adjacent transpositions count as one edit, so "APPL" is one edit away
+    from "AAPL". The dynamic programming table is filled one query byte at a
+    time for all candidates at once; insertions along a row are resolved with
+    a running minimum.
+
+    Args:
+        query (bytes): The query.
+        candidates (np.ndarray): Candidate bytes, one zero-padded row per candidate.
+        lengths (np.ndarray): The length of every candidate.
+
+    Returns:
+        np.ndarray: The distance of every candidate.
+    """
+    needle = np.frombuffer(query, dtype=np.uint8)
+    columns = np.arange(candidates.shape[1] + 1, dtype=np.int64)
+    previous2 = None
+    previous = np.tile(columns, (len(candidates), 1))
+    for i in range(1, len(needle) + 1):
+        current = np.empty_like(previous)
+        current[:, 0] = i
+        cost = (candidates != needle[i - 1]).astype(np.int64)
+        current[:, 1:] = np.minimum(previous[:, 1:] + 1, previous[:, :-1] + cost)
+        if previous2 is not None:
+            swapped = (candidates[:, 1:] == needle[i - 2]) & (candidates[:, :-1] == needle[i - 1])
+            current[:, 2:] = np.where(swapped, np.minimum(current[:, 2:], previous2[:, :-2] + 1), current[:, 2:])
+        current = np.minimum.accumulate(current - columns, axis=1) + columns
+        previous2, previous = previous, current
+    return previous[np.arange(len(candidates)), lengths]
+
+
+class FuzzyMatcher:
+    """Typo-tolerant symbol and company name matching.
+
+    Symbols are matched with a symmetric deletion index in the style of
+    SymSpell: every listed and curated symbol is stored under the keys of the
+    strings left after deleting up to two characters, so a lookup only
+    computes the deletions of the query and verifies the few candidates with
+    an edit distance. Like the suggestion index, the deletion index lives in a
+    memory-mapped file next to the symbols database that every gunicorn
+    worker shares; the file is identified by a digest of the symbols, so the
+    first worker to see new symbols builds it and the others map it. Building
+    and mapping run on eventlet's native thread pool, and lookups keep using
+    the previous index meanwhile. Company names are matched through the
+    trigram index of the suggestion index.
+    """
+
+    def __init__(self, path: str = FUZZY_INDEX_PATH):
+        """Initializes an empty matcher.
+
+        Args:
+            path (str): Location of the index file.
+        """
+        self.path = path
+        self._mm: Optional[mmap.mmap] = None
+        self._sections = {}
+        self._generation = None
+        self._lock = threading.Lock()
+
+    def build(self, symbols: List[str], digest: str) -> None:
+        """Writes a new index file for the symbols and swaps it in atomically.
+
+        Args:
+            symbols (List[str]): The sorted symbols.
+            digest (str): The digest of the symbols, stored in the header.
+        """
+        keys, owners = _build_deletes(symbols)
+        encoded = [symbol.encode() for symbol in symbols]
+        symbol_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        symbol_offsets[1:] = np.cumsum([len(symbol) for symbol in encoded])
+
+        sections = {
+            "symbol_bytes": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            "symbol_offsets": symbol_offsets,
+            "lengths": np.diff(symbol_offsets).astype(np.uint16),
+            "keys": keys,
+            "owners": owners,
+        }
+        write_index_file(self.path, FUZZY_INDEX_MAGIC, {"digest": digest, "symbols": len(symbols)}, sections)
+
+    def _load(self, symbols: List[str]) -> Tuple[mmap.mmap, dict]:
+        """Maps the index file of the symbols, building it first if it does not match them.
+
+        Runs on a native thread, so it may block on the file lock.
+
+        Args:
+            symbols (List[str]): The symbols, in any order.
+
+        Returns:
+            Tuple[mmap.mmap, dict]: The mapping and its sections.
+        """
+        symbols = sorted(symbol for symbol in symbols if symbol)
+        digest = hashlib.sha1("\n".join(symbols).encode()).hexdigest()
+
+        with open(f"{self.path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                layout = read_index_layout(self.path, FUZZY_INDEX_MAGIC)
+                if layout is None or layout["digest"] != digest:
+                    self.build(symbols, digest)
+                    layout = read_index_layout(self.path, FUZZY_INDEX_MAGIC)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+        return map_index_file(self.path, FUZZY_INDEX_MAGIC, layout)
+
+    def _ensure_current(self) -> None:
+        """Maps the index on first use and remaps it when the symbols changed.
+
+        Asking the symbol index for its symbols first lets it pick up a changed
+        database, which bumps its generation. Only the first lookup waits for
+        the index; while it is rebuilt later, lookups use the previous one.
+        """
+        symbols = symbol_index.symbols()
+        generation = symbol_index.generation
+        if self._generation == generation:
+            return
+
+        if not self._lock.acquire(blocking=self._mm is None):
+            return
+        try:
+            if self._generation == generation:
+                return
+            mm, sections = tpool.execute(self._load, list(symbols))
+
+            old = self._mm
+            self._mm, self._sections, self._generation = mm, sections, generation
+            if old is not None:
+                try:
+                    old.close()
+                except BufferError:
+                    pass
+        finally:
+            self._lock.release()
+
+    def _candidates(self, owners: np.ndarray, width: int) -> np.ndarray:
+        """Gathers the bytes of indexed symbols into a matrix.
+
+        Args:
+            owners (np.ndarray): The symbols' positions in the index.
+            width (int): The length of the longest of them.
+
+        Returns:
+            np.ndarray: One zero-padded row of bytes per symbol.
+        """
+        symbol_bytes = self._sections["symbol_bytes"]
+        starts = self._sections["symbol_offsets"][owners]
+        lengths = self._sections["lengths"][owners].astype(np.int64)
+        columns = np.arange(width)
+        positions = np.minimum(starts[:, None] + columns, len(symbol_bytes) - 1)
+        return np.where(columns < lengths[:, None], symbol_bytes[positions], 0).astype(np.uint8)
+
+    def _symbol(self, owner: int) -> str:
+        """Returns a symbol of the index.
+
+        Args:
+            owner (int): The symbol's position in the index.
+
+        Returns:
+            str: The symbol.
+        """
+        offsets = self._sections["symbol_offsets"]
+        return self._sections["symbol_bytes"][offsets[owner]:offsets[owner + 1]].tobytes().decode()
+
+    def match_symbols(self, query: str, limit: int = 5) -> List[str]:
+        """Finds symbols within a small edit distance of the query.
+
+        Args:
+            query (str): The possibly misspelled symbol.
+            limit (int): The maximum number of symbols to return.
+
+        Returns:
+            List[str]: Symbols ordered by edit distance, keeping the query's first
+            letter, then by length difference.
+        """
+        self._ensure_current()
+
+        query = query.strip().upper().replace("/", "")
+        if not query:
+            return []
+
+        distance = _max_distance(len(query))
+        encoded = query.encode()
+        keys = self._sections["keys"]
+        probes = np.array(_delete_keys(query, distance), dtype=np.uint64)
+        starts = np.searchsorted(keys, probes, side="left")
+        ends = np.searchsorted(keys, probes, side="right")
+        owners = np.unique(np.concatenate([self._sections["owners"][start:end] for start, end in zip(starts, ends)]))
+        lengths = self._sections["lengths"][owners].astype(np.int64)
+        close = np.abs(lengths - len(encoded)) <= distance
+        owners, lengths = owners[close], lengths[close]
+        if not len(owners):
+            return []
+
+        distances = edit_distances(encoded, self._candidates(owners, int(lengths.max())), lengths)
+        close = distances <= distance
+
+        ranked = []
+        for owner, symbol_distance in zip(owners[close].tolist(), distances[close].tolist()):
+            symbol = self._symbol(owner)
+            ranked.append((symbol_distance, symbol[0] != query[0], abs(len(symbol) - len(query)), symbol))
+        return [ranked_symbol[-1] for ranked_symbol in sorted(ranked)[:limit]]
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[str, str, str, str]]:
+        """Finds "did you mean" suggestions for a query that matched nothing exactly.
+
+        Close symbols come first, followed by companies whose name resembles
+        the query.
+
+        Args:
+            query (str): The query string.
+            limit (int): The maximum number of suggestions.
+
+        Returns:
+            List[Tuple[str, str, str, str]]: (screener, exchange, symbol, desc) rows.
+        """
+        results = []
+        seen = set()
+
+        for symbol in self.match_symbols(query, limit):
+            info = symbol_index.get(symbol)
+            if info is not None:
+                results.append((info.screener, info.exchange, info.symbol, info.name))
+                seen.add(info.symbol.upper())
+
+        if len(results) < limit and len(query.strip()) > SHORT_SYMBOL_LENGTH:
+            try:
+                for row_id in suggestion_index.similar_descriptions(query, limit * 2):
+                    row = suggestion_index.record(row_id)
+                    if row[2].upper() not in seen:
+                        results.append(row)
+                        seen.add(row[2].upper())
+                        if len(results) >= limit:
+                            break
+            except Exception as e:
+                print(f"Fuzzy name match error: {str(e)}")
+
+        return results[:limit]
+
+
+fuzzy_matcher = FuzzyMatcher()
@@ -0,0 +1,397 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from services.symbol_index import symbol_index
+
+YFINANCE_INTERVALS: Dict[str, Tuple[str, str]] = {
+    "1m": ("1m", "5d"),
+    "5m": ("5m", "30d"),
+    "15m": ("15m", "30d"),
+    "30m": ("30m", "30d"),
+    "1h": ("1h", "90d"),
+    "1d": ("1d", "1y"),
+    "1W": ("1wk", "5y"),
+    "1M": ("1mo", "10y"),
+}
+
+BAR_CACHE_TTL       : int = 900
+MAX_BARS            : int = 250
+MIN_BARS            : int = 35
+MA_PERIODS          : List[int] = [10, 20, 50]
+
+
+def _rma(values: np.ndarray, period: int) -> np.ndarray:
+    """Wilder's moving average along the last axis, seeded with a simple average.
+
+    Args:
+        values (np.ndarray): Array of shape (symbols, bars).
+        period (int): Smoothing period.
+
+    Returns:
+        np.ndarray: Smoothed values, NaN before the first full period.
+    """
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] < period:
+        return out
+    out[..., period - 1] = values[..., :period].mean(axis=-1)
+    for i in range(period, values.shape[-1]):
+        out[..., i] = out[..., i - 1] + (values[..., i] - out[..., i - 1]) / period
+    return out
+
+
+def _ema(values: np.ndarray, period: int) -> np.ndarray:
+    """Exponential moving average along the last axis, seeded with a simple average.
+
+    Leading bars that are NaN for any symbol, such as the warm-up of the MACD
+    line, are skipped.
+
+    Args:
+        values (np.ndarray): Array of shape (symbols, bars).
+        period (int): EMA period.
+
+    Returns:
+        np.ndarray: EMA values, NaN until enough values are available.
+    """
+    out = np.full(values.shape, np.nan)
+    complete = ~np.isnan(values).any(axis=tuple(range(values.ndim - 1)))
+    if not complete.any():
+        return out
+
+    start = int(np.argmax(complete))
+    if start + period > values.shape[-1]:
+        return out
+
+    alpha = 2.0 / (period + 1)
+    out[..., start + period - 1] = values[..., start:start + period].mean(axis=-1)
+    for i in range(start + period, values.shape[-1]):
+        out[..., i] = out[..., i - 1] + alpha * (values[..., i] - out[..., i - 1])
+    return out
+
+
+def _sma(values: np.ndarray, period: int) -> np.ndarray:
+    """Simple moving average along the last axis.
+
+    Args:
+        values (np.ndarray): Array of shape (symbols, bars).
+        period (int): Window length.
+
+    Returns:
+        np.ndarray: SMA values, NaN before the first full window.
+    """
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] >= period:
+        out[..., period - 1:] = sliding_window_view(values, period, axis=-1).mean(axis=-1)
+    return out
+
+
+def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Relative Strength Index using Wilder smoothing.
+
+    Args:
+        close (np.ndarray): Closing prices of shape (symbols, bars).
+        period (int): RSI period.
+
+    Returns:
+        np.ndarray: RSI values of the same shape.
+    """
+    delta = np.diff(close, axis=-1)
+    gains = _rma(np.clip(delta, 0, None), period)
+    losses = _rma(np.clip(-delta, 0, None), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = np.where(losses == 0, 100.0, 100.0 - 100.0 / (1.0 + gains / losses))
+    values = np.where(np.isnan(gains), np.nan, values)
+    return np.concatenate([np.full(close.shape[:-1] + (1,), np.nan), values], axis=-1)
+
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray]:
+    """Moving Average Convergence Divergence.
+
+    Args:
+        close (np.ndarray): Closing prices of shape (symbols, bars).
+        fast (int): Fast EMA period.
+        slow (int): Slow EMA period.
+        signal (int): Signal line EMA period.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The MACD line and its signal line.
+    """
+    line = _ema(close, fast) - _ema(close, slow)
+    return line, _ema(line, signal)
+
+
+def stochastic(
+    high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14, smooth_k: int = 3, smooth_d: int = 3
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Stochastic oscillator %K and %D.
+
+    Args:
+        high (np.ndarray): High prices of shape (symbols, bars).
+        low (np.ndarray): Low prices of shape (symbols, bars).
+        close (np.ndarray): Closing prices of shape (symbols, bars).
+        period (int): Lookback period.
+        smooth_k (int): SMA period applied to the raw %K.
+        smooth_d (int): SMA period applied to %K to get %D.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The %K and %D lines.
+    """
+    raw = np.full(close.shape, np.nan)
+    if close.shape[-1] >= period:
+        highest = sliding_window_view(high, period, axis=-1).max(axis=-1)
+        lowest = sliding_window_view(low, period, axis=-1).min(axis=-1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            raw[..., period - 1:] = np.where(
+                highest == lowest, 50.0, 100.0 * (close[..., period - 1:] - lowest) / (highest - lowest)
+            )
+    k = _sma(raw, smooth_k)
+    return k, _sma(k, smooth_d)
+
+
+def bollinger(close: np.ndarray, period: int = 20, width: float = 2.0) -> Tuple[np.ndarray, np.ndarray]:
+    """Bollinger Bands using the population standard deviation.
+
+    Args:
+        close (np.ndarray): Closing prices of shape (symbols, bars).
+        period (int): Window length.
+        width (float): Band width in standard deviations.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The upper and lower bands.
+    """
+    upper = np.full(close.shape, np.nan)
+    lower = np.full(close.shape, np.nan)
+    if close.shape[-1] >= period:
+        windows = sliding_window_view(close, period, axis=-1)
+        mean = windows.mean(axis=-1)
+        std = windows.std(axis=-1)
+        upper[..., period - 1:] = mean + width * std
+        lower[..., period - 1:] = mean - width * std
+    return upper, lower
+
+
+def _votes(buy: np.ndarray, sell: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Counts buy, sell and neutral signals per symbol.
+
+    Args:
+        buy (np.ndarray): Boolean buy signals of shape (signals, symbols).
+        sell (np.ndarray): Boolean sell signals of shape (signals, symbols).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Buy, sell and neutral counts.
+    """
+    buys = buy.sum(axis=0)
+    sells = sell.sum(axis=0)
+    return buys, sells, buy.shape[0] - buys - sells
+
+
+def _recommendation(buys: int, sells: int, neutral: int) -> Dict[str, object]:
+    """Builds a TradingView-style summary from signal counts.
+
+    Args:
+        buys (int): Number of buy signals.
+        sells (int): Number of sell signals.
+        neutral (int): Number of neutral signals.
+
+    Returns:
+        Dict[str, object]: The recommendation and its counts.
+    """
+    total = buys + sells + neutral
+    score = (buys - sells) / total if total else 0
+    if score > 0.5:
+        recommendation = "STRONG_BUY"
+    elif score > 0.1:
+        recommendation = "BUY"
+    elif score < -0.5:
+        recommendation = "STRONG_SELL"
+    elif score < -0.1:
+        recommendation = "SELL"
+    else:
+        recommendation = "NEUTRAL"
+    return {"RECOMMENDATION": recommendation, "BUY": int(buys), "SELL": int(sells), "NEUTRAL": int(neutral)}
+
+
+def compute_indicators(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> List[Dict[str, object]]:
+    """Computes the latest indicator values and signal summaries for a batch of symbols.
+
+    Args:
+        high (np.ndarray): High prices of shape (symbols, bars) or (bars,).
+        low (np.ndarray): Low prices of the same shape.
+        close (np.ndarray): Closing prices of the same shape.
+
+    Returns:
+        List[Dict[str, object]]: One entry per symbol with the latest indicator
+        values and oscillator, moving average and overall summaries.
+    """
+    high, low, close = (np.atleast_2d(np.asarray(a, dtype=float)) for a in (high, low, close))
+
+    rsi_values = rsi(close)[:, -1]
+    macd_line, macd_signal = macd(close)
+    stoch_k, stoch_d = stochastic(high, low, close)
+    bb_upper, bb_lower = bollinger(close)
+    last_close = close[:, -1]
+
+    macd_line, macd_signal = macd_line[:, -1], macd_signal[:, -1]
+    stoch_k, stoch_d = stoch_k[:, -1], stoch_d[:, -1]
+    bb_upper, bb_lower = bb_upper[:, -1], bb_lower[:, -1]
+
+    osc_buys, osc_sells, osc_neutral = _votes(
+        np.array([rsi_values < 30, macd_line > macd_signal, (stoch_k < 20) & (stoch_k > stoch_d), last_close < bb_lower]),
+        np.array([rsi_values > 70, macd_line < macd_signal, (stoch_k > 80) & (stoch_k < stoch_d), last_close > bb_upper]),
+    )
+
+    averages = [_sma(close, period)[:, -1] for period in MA_PERIODS] + [_ema(close, period)[:, -1] for period in MA_PERIODS]
+    ma_buys, ma_sells, ma_neutral = _votes(
+        np.array([last_close > average for average in averages]),
+        np.array([last_close < average for average in averages]),
+    )
+
+    def clean(value: float) -> Optional[float]:
+        return None if np.isnan(value) else float(value)
+
+    results = []
+    for i in range(close.shape[0]):
+        results.append(
+            {
+                "indicators": {
+                    "rsi": clean(rsi_values[i]),
+                    "macd": clean(macd_line[i]),
+                    "stoch_k": clean(stoch_k[i]),
+                    "stoch_d": clean(stoch_d[i]),
+                    "bb_upper": clean(bb_upper[i]),
+                    "bb_lower": clean(bb_lower[i]),
+                },
+                "oscillators": _recommendation(osc_buys[i], osc_sells[i], osc_neutral[i]),
+                "moving_averages": _recommendation(ma_buys[i], ma_sells[i], ma_neutral[i]),
+                "summary": _recommendation(
+                    osc_buys[i] + ma_buys[i], osc_sells[i] + ma_sells[i], osc_neutral[i] + ma_neutral[i]
+                ),
+            }
+        )
+    return results
+
+
+def yfinance_ticker(symbol: str) -> str:
+    """Maps a symbol as used by the app to a Yahoo Finance ticker.
+
+    Args:
+        symbol (str): A bare symbol or EXCHANGE:SYMBOL.
+
+    Returns:
+        str: The Yahoo Finance ticker.
+    """
+    info = symbol_index.classify(symbol)
+    if info.asset_class == "crypto":
+        quote = "USD" if info.quote in ("", "USDT", "USDC", "BUSD") else info.quote
+        return f"{info.base}-{quote}"
+    return symbol.rpartition(":")[2].replace(".", "-")
+
+
+def get_bars(symbols: List[str], interval: str = "1d") -> Dict[str, Dict[str, List[float]]]:
+    """Returns recent OHLCV bars for several symbols, downloading only uncached ones.
+
+    Bars are cached in Redis for BAR_CACHE_TTL seconds. All misses are fetched
+    from Yahoo Finance with a single download.
+
+    Args:
+        symbols (List[str]): Symbols as used by the app.
+        interval (str): The analysis interval.
+
+    Returns:
+        Dict[str, Dict[str, List[float]]]: Bars per symbol with high, low, close
+        and volume lists. Symbols without data are left out.
+    """
+    from cache import cache_db_query, get_cached_query
+
+    if interval not in YFINANCE_INTERVALS:
+        return {}
+
+    bars = {}
+    misses = []
+    for symbol in dict.fromkeys(symbols):
+        cached = get_cached_query(f"bars:{symbol}:{interval}")
+        if cached:
+            bars[symbol] = cached
+        else:
+            misses.append(symbol)
+
+    if not misses:
+        return bars
+
+    import yfinance as yf
+
+    yf_interval, period = YFINANCE_INTERVALS[interval]
+    tickers = {symbol: yfinance_ticker(symbol) for symbol in misses}
+    try:
+        frame = yf.download(
+            list(dict.fromkeys(tickers.values())),
+            period=period,
+            interval=yf_interval,
+            group_by="ticker",
+            auto_adjust=False,
+            progress=False,
+            threads=False,
+        )
+    except Exception as e:
+        print(f"Error downloading bars: {str(e)}")
+        return bars
+
+    for symbol, ticker in tickers.items():
+        try:
+            data = frame[ticker] if ticker in frame.columns.get_level_values(0) else frame
+            data = data[["High", "Low", "Close", "Volume"]].dropna(subset=["Close"]).tail(MAX_BARS)
+            if len(data) < MIN_BARS:
+                continue
+
+            bars[symbol] = {
+                "high": data["High"].astype(float).tolist(),
+                "low": data["Low"].astype(float).tolist(),
+                "close": data["Close"].astype(float).tolist(),
+                "volume": data["Volume"].fillna(0).astype(float).tolist(),
+            }
+            cache_db_query(f"bars:{symbol}:{interval}", bars[symbol], BAR_CACHE_TTL)
+        except Exception as e:
+            print(f"Error reading bars for {symbol}: {str(e)}")
+
+    return bars
+
+
+def local_analyses(symbols: List[str], interval: str = "1d") -> Dict[str, Dict[str, object]]:
+    """Computes analyses for several symbols from locally sourced bars in one batch.
+
+    The series are trimmed to a common length and stacked into 2-D arrays so
+    every indicator is computed for all symbols at once.
+
+    Args:
+        symbols (List[str]): Symbols as used by the app.
+        interval (str): The analysis interval.
+
+    Returns:
+        Dict[str, Dict[str, object]]: Per symbol, the latest price fields,
+        indicators and signal summaries. Symbols without enough bars are left out.
+    """
+    bars = get_bars(symbols, interval)
+    if not bars:
+        return {}
+
+    names = list(bars)
+    length = min(len(bars[symbol]["close"]) for symbol in names)
+    high = np.array([bars[symbol]["high"][-length:] for symbol in names])
+    low = np.array([bars[symbol]["low"][-length:] for symbol in names])
+    close = np.array([bars[symbol]["close"][-length:] for symbol in names])
+    volume = np.array([bars[symbol]["volume"][-length:] for symbol in names])
+
+    results = {}
+    for i, computed in enumerate(compute_indicators(high, low, close)):
+        computed.update(
+            {
+                "price": float(close[i, -1]),
+                "change": float(close[i, -1] / close[i, -2] - 1) if close[i, -2] else 0.0,
+                "volume": int(volume[i, -1]),
+                "dayHigh": float(high[i, -1]),
+                "dayLow": float(low[i, -1]),
+            }
+        )
+        results[names[i]] = computed
+    return results
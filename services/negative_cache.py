@@ -0,0 +1,152 @@
+import json
+from typing import Any, Dict, Optional
+
+from services.exchange_prober import probe_candidates
+
+NEGATIVE_BASE_TTL   : int = 60
+NEGATIVE_MAX_TTL    : int = 86400
+MISS_HISTORY_TTL    : int = 7 * 86400
+
+
+class NegativeCache:
+    """Remembers symbols that could not be found upstream.
+
+    A missing symbol is blocked for a short TTL that doubles with every
+    repeated miss, up to a day, so typos and bots stop going through the
+    full exchange probing path. The 404 payload, suggestions included, can be
+    stored with the entry so it is served without any further work.
+    """
+
+    def __init__(self):
+        """Initializes the negative cache."""
+        self.redis_prefix = "negative_symbol:"
+
+    def _upstream_cost(self, symbol: str) -> int:
+        """Estimates how many upstream calls a miss of the symbol costs.
+
+        Args:
+            symbol (str): The requested symbol.
+
+        Returns:
+            int: The number of scanner requests a miss would take.
+        """
+        if ":" in symbol:
+            return 1
+        return len(probe_candidates(symbol))
+
+    def get(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Checks whether a symbol is known to be missing.
+
+        Every positive check is counted; stats estimates the upstream calls
+        the checks avoided from the average cost of the recorded misses, so a
+        check costs no more than the GET and one HINCRBY.
+
+        Args:
+            symbol (str): The requested symbol.
+
+        Returns:
+            Optional[Dict[str, Any]]: The stored 404 payload (empty if none was
+            stored) if the symbol is known to be missing, None otherwise.
+        """
+        from cache import redis_client
+
+        if not redis_client:
+            return None
+
+        try:
+            cached = redis_client.get(f"{self.redis_prefix}{symbol}")
+            if cached is None:
+                return None
+
+            redis_client.hincrby(f"{self.redis_prefix}stats", "hits", 1)
+
+            payload = json.loads(cached)
+            return payload if isinstance(payload, dict) else {}
+        except Exception as e:
+            print(f"Negative cache error: {str(e)}")
+            return None
+
+    def record_miss(self, symbol: str) -> None:
+        """Marks a symbol as missing, with a TTL that grows on repeated misses.
+
+        Args:
+            symbol (str): The requested symbol.
+        """
+        from cache import redis_client
+
+        if not redis_client:
+            return
+
+        try:
+            misses_key = f"{self.redis_prefix}misses:{symbol}"
+            misses = redis_client.incr(misses_key)
+            redis_client.expire(misses_key, MISS_HISTORY_TTL)
+
+            ttl = min(NEGATIVE_BASE_TTL * 2 ** (misses - 1), NEGATIVE_MAX_TTL)
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.setex(f"{self.redis_prefix}{symbol}", ttl, "1")
+            pipe.hincrby(f"{self.redis_prefix}stats", "misses_recorded", 1)
+            pipe.hincrby(f"{self.redis_prefix}stats", "miss_cost", self._upstream_cost(symbol))
+            pipe.execute()
+        except Exception as e:
+            print(f"Negative cache error: {str(e)}")
+
+    def attach_response(self, symbol: str, payload: Dict[str, Any]) -> None:
+        """Stores the 404 payload with an existing negative entry.
+
+        Args:
+            symbol (str): The requested symbol.
+            payload (Dict[str, Any]): The JSON body returned for the missing symbol.
+        """
+        from cache import redis_client
+
+        if not redis_client:
+            return
+
+        try:
+            redis_client.set(f"{self.redis_prefix}{symbol}", json.dumps(payload), xx=True, keepttl=True)
+        except Exception as e:
+            print(f"Negative cache error: {str(e)}")
+
+    def clear(self, symbol: str) -> None:
+        """Forgets a symbol's misses once it has been found.
+
+        Args:
+            symbol (str): The requested symbol.
+        """
+        from cache import redis_client
+
+        if not redis_client:
+            return
+
+        try:
+            redis_client.delete(f"{self.redis_prefix}{symbol}", f"{self.redis_prefix}misses:{symbol}")
+        except Exception as e:
+            print(f"Negative cache error: {str(e)}")
+
+    def stats(self) -> Dict[str, int]:
+        """Reports how often the negative cache short-circuited a lookup.
+
+        Returns:
+            Dict[str, int]: Hits, recorded misses and estimated upstream calls saved.
+        """
+        from cache import redis_client
+
+        if not redis_client:
+            return {}
+
+        try:
+            stats = {
+                field.decode(): int(value)
+                for field, value in redis_client.hgetall(f"{self.redis_prefix}stats").items()
+            }
+        except Exception as e:
+            print(f"Negative cache error: {str(e)}")
+            return {}
+
+        misses = stats.get("misses_recorded", 0)
+        stats["upstream_calls_saved"] = round(stats.get("hits", 0) * stats.get("miss_cost", 0) / misses) if misses else 0
+        return stats
+
+
+negative_cache = NegativeCache()
@@ -0,0 +1,280 @@
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+from tradingview_ta import Interval
+
+from services.symbol_index import symbol_index
+from services.tools import get_market_status
+
+PREFETCH_BUDGET_PER_MINUTE  : int = int(os.getenv("PREFETCH_BUDGET_PER_MINUTE", 30))
+PREFETCH_BATCH_SIZE         : int = 20
+PREFETCH_LEAD_TIME          : int = 60
+POPULAR_SYMBOLS_LIMIT       : int = 50
+
+
+class AnalysisPrefetcher:
+    """Keeps stock analyses for symbols we expect to be requested warm.
+
+    The working set is every watchlisted symbol, the current stock and crypto
+    recommendations and today's most requested tickers. Each run refreshes the
+    entries that are about to go stale through the batch analysis path, within
+    an upstream request budget shared by all workers. Only symbols with a known
+    route are prefetched, so every batch costs one scanner request per
+    screener; symbols that would need exchange probing are left to user
+    requests. Stock symbols are only kept warm continuously while their market
+    is open; crypto always is.
+    """
+
+    def __init__(self):
+        """Initializes the prefetcher."""
+        self.redis_prefix = "prefetch:"
+        self._pending_prefetched_hits = 0
+
+    def _popular_key(self) -> str:
+        """Returns the Redis key holding today's request counts.
+
+        Returns:
+            str: The sorted set key for the current UTC day.
+        """
+        return f"{self.redis_prefix}popular:{datetime.utcnow().strftime('%Y%m%d')}"
+
+    def record_request(self, symbol: str) -> None:
+        """Counts a user request for a symbol towards the most-requested list.
+
+        Args:
+            symbol (str): The requested symbol.
+        """
+        from cache import redis_client
+
+        if not redis_client:
+            return
+
+        try:
+            key = self._popular_key()
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.zincrby(key, 1, symbol)
+            pipe.expire(key, 2 * 86400)
+            pipe.execute()
+        except Exception as e:
+            print(f"Prefetch request tracking error: {str(e)}")
+
+    def _refreshed_key(self, symbol: str, interval: str) -> str:
+        """Returns the Redis key marking an analysis entry as written by the prefetcher.
+
+        Args:
+            symbol (str): The symbol.
+            interval (str): The analysis interval.
+
+        Returns:
+            str: The marker key, which expires together with the entry.
+        """
+        return f"{self.redis_prefix}refreshed:{symbol}:{interval}"
+
+    def record_lookup(self, symbol: str, interval: str, hit: bool) -> None:
+        """Counts a user-facing analysis cache lookup.
+
+        Hits on entries that were written by the prefetcher are counted
+        separately so the hit-rate effect of prefetching can be reported. Each
+        lookup costs one pipelined round trip: whether the hit entry was
+        prefetched is only known from its reply, so such hits are added with
+        the worker's next lookup.
+
+        Args:
+            symbol (str): The looked up symbol.
+            interval (str): The analysis interval.
+            hit (bool): Whether the lookup was served from the cache.
+        """
+        from cache import redis_client
+
+        if not redis_client:
+            return
+
+        try:
+            stats_key = f"{self.redis_prefix}stats"
+            pending, self._pending_prefetched_hits = self._pending_prefetched_hits, 0
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.hincrby(stats_key, "hits" if hit else "misses", 1)
+            if pending:
+                pipe.hincrby(stats_key, "prefetched_hits", pending)
+            if hit:
+                pipe.exists(self._refreshed_key(symbol, interval))
+            results = pipe.execute()
+            if hit and results[-1]:
+                self._pending_prefetched_hits += 1
+        except Exception as e:
+            print(f"Prefetch stats error: {str(e)}")
+
+    def is_crypto(self, symbol: str) -> bool:
+        """Checks whether a symbol trades around the clock.
+
+        Args:
+            symbol (str): The symbol to check.
+
+        Returns:
+            bool: True for crypto symbols.
+        """
+        return symbol_index.is_crypto(symbol)
+
+    def build_working_set(self) -> Dict[str, bool]:
+        """Collects the symbols worth keeping warm.
+
+        Returns:
+            Dict[str, bool]: Each symbol mapped to whether it is crypto.
+        """
+        from cache import redis_client
+        from models import StockWatchlist, db
+        from services.stockrecommender import StockRecommender
+
+        working_set: Dict[str, bool] = {}
+
+        try:
+            for (symbol,) in db.session.query(StockWatchlist.symbol).distinct().all():
+                if symbol:
+                    symbol = symbol.upper()
+                    working_set[symbol] = self.is_crypto(symbol)
+        except Exception as e:
+            print(f"Error loading watchlist symbols for prefetch: {str(e)}")
+
+        for asset_type in ("stock", "crypto"):
+            for recommendation in StockRecommender.get_cached_recommendations(asset_type=asset_type) or []:
+                if recommendation.symbol and recommendation.symbol != "--":
+                    working_set[recommendation.symbol.upper()] = asset_type == "crypto"
+
+        if redis_client:
+            try:
+                popular = redis_client.zrevrange(self._popular_key(), 0, POPULAR_SYMBOLS_LIMIT - 1)
+                for symbol in popular:
+                    symbol = symbol.decode()
+                    working_set.setdefault(symbol, self.is_crypto(symbol))
+            except Exception as e:
+                print(f"Error loading popular symbols for prefetch: {str(e)}")
+
+        return working_set
+
+    def due_symbols(self, working_set: Dict[str, bool], interval: str = Interval.INTERVAL_1_DAY) -> List[str]:
+        """Selects the symbols whose cached analysis needs refreshing now.
+
+        While a symbol's market is open, its entry is refreshed shortly before it
+        goes stale. While closed, it is only refetched once the entry is gone.
+
+        Args:
+            working_set (Dict[str, bool]): Symbols mapped to whether they are crypto.
+            interval (str): The analysis interval being kept warm.
+
+        Returns:
+            List[str]: The symbols to refresh, crypto first.
+        """
+        from cache import get_query_freshness
+
+        stock_market_open = any(market["open"] for market in get_market_status().values())
+
+        due = []
+        for symbol, is_crypto in sorted(working_set.items(), key=lambda item: not item[1]):
+            freshness = get_query_freshness(f"stock_analysis:{symbol}:{interval}")
+            if freshness is None:
+                due.append(symbol)
+            elif (is_crypto or stock_market_open) and freshness < PREFETCH_LEAD_TIME:
+                due.append(symbol)
+        return due
+
+    def _take_budget(self, cost: int) -> bool:
+        """Reserves upstream requests from the shared per-minute budget.
+
+        Args:
+            cost (int): Number of upstream requests about to be made.
+
+        Returns:
+            bool: True if the budget allows the requests.
+        """
+        from cache import redis_client
+
+        if not redis_client:
+            return True
+
+        key = f"{self.redis_prefix}budget:{int(time.time() // 60)}"
+        try:
+            used = redis_client.incrby(key, cost)
+            redis_client.expire(key, 120)
+            if used > PREFETCH_BUDGET_PER_MINUTE:
+                redis_client.decrby(key, cost)
+                return False
+            return True
+        except Exception as e:
+            print(f"Prefetch budget error: {str(e)}")
+            return False
+
+    def run(self, interval: str = Interval.INTERVAL_1_DAY) -> int:
+        """Refreshes the due part of the working set.
+
+        Args:
+            interval (str): The analysis interval being kept warm.
+
+        Returns:
+            int: Number of symbols refreshed.
+        """
+        from cache import redis_client
+        from routes import analysis_ttls, get_stock_analyses, resolve_symbol_route
+
+        screener_of = {}
+        for symbol in self.due_symbols(self.build_working_set(), interval):
+            route = resolve_symbol_route(symbol)
+            if route is not None:
+                screener_of[symbol] = route[0]
+        due = list(screener_of)
+        hard_ttl = analysis_ttls(interval)[1]
+        refreshed = 0
+
+        for start in range(0, len(due), PREFETCH_BATCH_SIZE):
+            batch = due[start:start + PREFETCH_BATCH_SIZE]
+            screeners = {screener_of[symbol] for symbol in batch}
+            if not self._take_budget(len(screeners)):
+                if redis_client:
+                    redis_client.hincrby(f"{self.redis_prefix}stats", "budget_exhausted", 1)
+                break
+
+            results = get_stock_analyses(batch, interval, force=True)
+            fetched = [symbol for symbol, analysis in results.items() if analysis]
+            refreshed += len(fetched)
+
+            if redis_client and fetched:
+                try:
+                    pipe = redis_client.pipeline()
+                    for symbol in fetched:
+                        pipe.set(self._refreshed_key(symbol, interval), 1, ex=hard_ttl)
+                    pipe.hincrby(f"{self.redis_prefix}stats", "prefetched", len(fetched))
+                    pipe.execute()
+                except Exception as e:
+                    print(f"Prefetch stats error: {str(e)}")
+
+        return refreshed
+
+    def stats(self) -> Dict[str, Any]:
+        """Reports prefetch activity and its effect on the analysis cache hit rate.
+
+        Returns:
+            Dict[str, Any]: Counters, the overall hit rate and the share of lookups
+            served by entries the prefetcher wrote.
+        """
+        from cache import redis_client
+
+        if not redis_client:
+            return {}
+
+        try:
+            stats = {
+                field.decode(): int(value)
+                for field, value in redis_client.hgetall(f"{self.redis_prefix}stats").items()
+            }
+        except Exception as e:
+            print(f"Prefetch stats error: {str(e)}")
+            return {}
+
+        lookups = stats.get("hits", 0) + stats.get("misses", 0)
+        stats["hit_rate"] = stats.get("hits", 0) / lookups if lookups else 0
+        stats["prefetched_hit_rate"] = stats.get("prefetched_hits", 0) / lookups if lookups else 0
+        return stats
+
+
+prefetcher = AnalysisPrefetcher()
@@ -0,0 +1,291 @@
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional, Set
+
+import eventlet
+from tradingview_ta import Interval
+
+QUOTE_REFRESH_INTERVAL      : int = 15
+QUOTE_SUBSCRIBER_TIMEOUT    : int = QUOTE_REFRESH_INTERVAL * 3
+QUOTE_REFRESHER_LEASE       : int = QUOTE_REFRESH_INTERVAL * 2
+MAX_QUOTE_SUBSCRIPTIONS     : int = 20
+
+
+class QuoteStream:
+    """Streams live quotes to Socket.IO clients with one refresher per symbol.
+
+    Subscribers join a per-symbol room. Their sids are kept in a Redis sorted
+    set scored by the last heartbeat from the worker holding the connection,
+    so subscribers of a worker that died expire on their own. One refresher
+    per symbol, elected across workers with a renewable Redis lease, fetches
+    the quote on a fixed cadence and emits it to the room through the Socket.IO
+    message queue. It stops once the room is empty. Every worker with local
+    subscribers also runs a supervisor that renews their heartbeats and takes
+    over the lease of a symbol whose refresher has gone away.
+    """
+
+    def __init__(self):
+        """Initializes the quote stream."""
+        self.redis_prefix = "quote_stream:"
+        self.worker_id = uuid.uuid4().hex
+        self._subscriptions: Dict[str, Set[str]] = {}
+        self._refreshing: Set[str] = set()
+        self._lock = threading.Lock()
+        self._supervisor = None
+
+    def room(self, symbol: str) -> str:
+        """Returns the Socket.IO room receiving a symbol's quotes.
+
+        Args:
+            symbol (str): The subscribed symbol.
+
+        Returns:
+            str: The room name.
+        """
+        return f"quote:{symbol}"
+
+    def subscriptions(self, sid: str) -> Set[str]:
+        """Returns the symbols a connection is subscribed to in this worker.
+
+        Args:
+            sid (str): The Socket.IO session id.
+
+        Returns:
+            Set[str]: The subscribed symbols.
+        """
+        return set(self._subscriptions.get(sid, ()))
+
+    def subscribe(self, sid: str, symbol: str) -> bool:
+        """Registers a subscriber and makes sure the symbol has a refresher.
+
+        Args:
+            sid (str): The Socket.IO session id.
+            symbol (str): The symbol to stream.
+
+        Returns:
+            bool: False if the connection already has too many subscriptions.
+        """
+        from cache import redis_client
+
+        with self._lock:
+            symbols = self._subscriptions.setdefault(sid, set())
+            if symbol not in symbols and len(symbols) >= MAX_QUOTE_SUBSCRIPTIONS:
+                return False
+            symbols.add(symbol)
+            if self._supervisor is None:
+                self._supervisor = eventlet.spawn(self._supervise)
+
+        if redis_client:
+            try:
+                redis_client.zadd(f"{self.redis_prefix}subscribers:{symbol}", {sid: time.time()})
+            except Exception as e:
+                print(f"Quote stream subscribe error: {str(e)}")
+
+        self._ensure_refresher(symbol)
+        return True
+
+    def unsubscribe(self, sid: str, symbol: str) -> None:
+        """Removes a subscriber from a symbol.
+
+        Args:
+            sid (str): The Socket.IO session id.
+            symbol (str): The symbol to stop streaming.
+        """
+        from cache import redis_client
+
+        with self._lock:
+            symbols = self._subscriptions.get(sid)
+            if symbols is not None:
+                symbols.discard(symbol)
+                if not symbols:
+                    del self._subscriptions[sid]
+
+        if redis_client:
+            try:
+                redis_client.zrem(f"{self.redis_prefix}subscribers:{symbol}", sid)
+            except Exception as e:
+                print(f"Quote stream unsubscribe error: {str(e)}")
+
+    def unsubscribe_all(self, sid: str) -> None:
+        """Removes a disconnected client from every symbol it subscribed to.
+
+        Args:
+            sid (str): The Socket.IO session id.
+        """
+        for symbol in self.subscriptions(sid):
+            self.unsubscribe(sid, symbol)
+
+    def _subscriber_count(self, symbol: str) -> int:
+        """Counts the live subscribers of a symbol across all workers.
+
+        Subscribers whose heartbeat has expired are pruned first.
+
+        Args:
+            symbol (str): The streamed symbol.
+
+        Returns:
+            int: The number of subscribers.
+        """
+        from cache import redis_client
+
+        if not redis_client:
+            return sum(1 for symbols in self._subscriptions.values() if symbol in symbols)
+
+        key = f"{self.redis_prefix}subscribers:{symbol}"
+        redis_client.zremrangebyscore(key, 0, time.time() - QUOTE_SUBSCRIBER_TIMEOUT)
+        return redis_client.zcard(key)
+
+    def _claim(self, symbol: str) -> bool:
+        """Tries to become the refresher for a symbol.
+
+        Args:
+            symbol (str): The streamed symbol.
+
+        Returns:
+            bool: True if this worker holds the refresher lease.
+        """
+        from cache import redis_client
+
+        if not redis_client:
+            return True
+
+        key = f"{self.redis_prefix}refresher:{symbol}"
+        try:
+            if redis_client.set(key, self.worker_id, nx=True, ex=QUOTE_REFRESHER_LEASE):
+                return True
+            if redis_client.get(key) == self.worker_id.encode():
+                redis_client.expire(key, QUOTE_REFRESHER_LEASE)
+                return True
+        except Exception as e:
+            print(f"Quote stream lease error: {str(e)}")
+        return False
+
+    def _release(self, symbol: str) -> None:
+        """Gives up the refresher lease for a symbol.
+
+        Args:
+            symbol (str): The streamed symbol.
+        """
+        from cache import redis_client
+
+        if not redis_client:
+            return
+
+        key = f"{self.redis_prefix}refresher:{symbol}"
+        try:
+            if redis_client.get(key) == self.worker_id.encode():
+                redis_client.delete(key)
+        except Exception as e:
+            print(f"Quote stream lease error: {str(e)}")
+
+    def _ensure_refresher(self, symbol: str) -> None:
+        """Starts a refresher for a symbol in this worker if no worker runs one.
+
+        Args:
+            symbol (str): The streamed symbol.
+        """
+        with self._lock:
+            if symbol in self._refreshing:
+                return
+            if not self._claim(symbol):
+                return
+            self._refreshing.add(symbol)
+
+        eventlet.spawn_n(self._refresh, symbol)
+
+    def _fetch_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Returns a quote for a symbol that is at most one refresh interval old.
+
+        Args:
+            symbol (str): The streamed symbol.
+
+        Returns:
+            Optional[Dict[str, Any]]: The compact quote payload, or None if unavailable.
+        """
+        from cache import get_cached_query, get_query_freshness
+        from routes import _fetch_stock_analysis, analysis_flight, analysis_ttls
+
+        interval = Interval.INTERVAL_1_DAY
+        cache_key = f"stock_analysis:{symbol}:{interval}"
+        soft_ttl, _ = analysis_ttls(interval)
+
+        freshness = get_query_freshness(cache_key)
+        if freshness is not None and soft_ttl - freshness < QUOTE_REFRESH_INTERVAL:
+            analysis = get_cached_query(cache_key)
+        else:
+            analysis = analysis_flight.do(f"{symbol}:{interval}", _fetch_stock_analysis, symbol, interval)
+
+        if not analysis:
+            return None
+
+        return {
+            "symbol": symbol,
+            "display_symbol": analysis.get("display_symbol"),
+            "exchange": analysis.get("exchange"),
+            "price": analysis.get("price"),
+            "change": analysis.get("change"),
+            "volume": analysis.get("volume"),
+            "dayHigh": analysis.get("dayHigh"),
+            "dayLow": analysis.get("dayLow"),
+            "recommendation": analysis.get("technical_analysis", {}).get("summary", {}).get("RECOMMENDATION"),
+        }
+
+    def _refresh(self, symbol: str) -> None:
+        """Fetches and emits a symbol's quote until it has no subscribers left.
+
+        Args:
+            symbol (str): The streamed symbol.
+        """
+        from routes import socketio
+
+        last_quote = None
+        try:
+            while True:
+                try:
+                    if self._subscriber_count(symbol) == 0 or not self._claim(symbol):
+                        break
+
+                    quote = self._fetch_quote(symbol)
+                    if quote is not None and quote != last_quote:
+                        socketio.emit("quote", quote, room=self.room(symbol))
+                        last_quote = quote
+                except Exception as e:
+                    print(f"Quote refresh error for {symbol}: {str(e)}")
+
+                eventlet.sleep(QUOTE_REFRESH_INTERVAL)
+        finally:
+            with self._lock:
+                self._refreshing.discard(symbol)
+            self._release(symbol)
+
+    def _supervise(self) -> None:
+        """Keeps this worker's subscribers alive and adopts orphaned symbols."""
+        from cache import redis_client
+
+        while True:
+            eventlet.sleep(QUOTE_REFRESH_INTERVAL)
+
+            with self._lock:
+                by_symbol: Dict[str, Set[str]] = {}
+                for sid, symbols in self._subscriptions.items():
+                    for symbol in symbols:
+                        by_symbol.setdefault(symbol, set()).add(sid)
+
+                if not by_symbol:
+                    self._supervisor = None
+                    return
+
+            now = time.time()
+            for symbol, sids in by_symbol.items():
+                if redis_client:
+                    try:
+                        redis_client.zadd(
+                            f"{self.redis_prefix}subscribers:{symbol}", {sid: now for sid in sids}
+                        )
+                    except Exception as e:
+                        print(f"Quote stream heartbeat error: {str(e)}")
+                self._ensure_refresher(symbol)
+
+
+quote_stream = QuoteStream()
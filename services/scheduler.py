@@ -4,6 +4,7 @@ from threading import Thread, Event
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from flask import Flask
 from flask_apscheduler import APScheduler
 
@@ -74,6 +75,30 @@ def init_scheduler(app: Flask) -> None:
             name='Update stock recommendations',
             replace_existing=True
         )
+
+        background_scheduler.add_job(
+            prefetch_stock_analyses_job,
+            trigger=IntervalTrigger(seconds=30),
+            id='prefetch_stock_analyses',
+            name='Prefetch stock analyses for hot symbols',
+            replace_existing=True
+        )
+
+        background_scheduler.add_job(
+            materialize_prefix_suggestions_job,
+            trigger=IntervalTrigger(minutes=10),
+            id='materialize_prefix_suggestions',
+            name='Precompute popularity-ranked suggestions for short prefixes',
+            replace_existing=True
+        )
+
+        background_scheduler.add_job(
+            compact_snapshots_job,
+            trigger=CronTrigger(hour=1, minute=30),
+            id='compact_snapshots',
+            name='Compact analysis snapshot files',
+            replace_existing=True
+        )
         
         background_scheduler.start()
 
@@ -170,6 +195,92 @@ def update_stock_recommendations_job():
             redis_client.delete(lock_key)
 
 
+def prefetch_stock_analyses_job():
+    """Refresh cached stock analyses for the hot symbol working set.
+
+    Runs every 30 seconds. A short Redis lock makes sure only one gunicorn
+    worker prefetches per run.
+    """
+    if flask_app is None:
+        return
+
+    with flask_app.app_context():
+        from cache import redis_client
+        from services.prefetcher import prefetcher
+
+        if not redis_client:
+            return
+
+        lock_key = "prefetch_stock_analyses_lock"
+        if not redis_client.set(lock_key, "1", ex=25, nx=True):
+            return
+
+        try:
+            prefetcher.run()
+        except Exception as e:
+            print(f"{datetime.utcnow()}: Error prefetching stock analyses: {str(e)}")
+        finally:
+            redis_client.delete(lock_key)
+
+
+def materialize_prefix_suggestions_job():
+    """Precompute the suggestions of the most used one to three character prefixes.
+
+    Runs every 10 minutes so popularity changes reach short queries, and
+    moves the popularity decay epoch forward when it is due. A Redis lock
+    makes sure only one gunicorn worker rebuilds the table.
+    """
+    if flask_app is None:
+        return
+
+    with flask_app.app_context():
+        from cache import redis_client
+        from services.symbol_popularity import symbol_popularity
+
+        if not redis_client:
+            return
+
+        lock_key = "materialize_prefix_suggestions_lock"
+        if not redis_client.set(lock_key, "1", ex=540, nx=True):
+            return
+
+        try:
+            if symbol_popularity.renormalize():
+                print(f"{datetime.utcnow()}: Moved the symbol popularity decay epoch forward")
+            count = symbol_popularity.materialize()
+            print(f"{datetime.utcnow()}: Precomputed suggestions for {count} prefixes")
+        except Exception as e:
+            print(f"{datetime.utcnow()}: Error precomputing prefix suggestions: {str(e)}")
+        finally:
+            redis_client.delete(lock_key)
+
+
+def compact_snapshots_job():
+    """Compact closed analysis snapshot days and enforce the disk budget.
+
+    Runs daily. A Redis lock makes sure only one gunicorn worker compacts.
+    """
+    if flask_app is None:
+        return
+
+    with flask_app.app_context():
+        from cache import redis_client
+        from services.snapshot_store import snapshot_store
+
+        lock_key = "compact_snapshots_lock"
+        if redis_client and not redis_client.set(lock_key, "1", ex=3600, nx=True):
+            return
+
+        try:
+            stats = snapshot_store.compact()
+            print(f"{datetime.utcnow()}: Snapshot compaction finished: {stats}")
+        except Exception as e:
+            print(f"{datetime.utcnow()}: Error compacting snapshots: {str(e)}")
+        finally:
+            if redis_client:
+                redis_client.delete(lock_key)
+
+
 def reset_daily_limits_job():
     """Check and reset limits for users whose next_reset time has passed.
 
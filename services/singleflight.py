@@ -0,0 +1,325 @@
+import json
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List
+
+import eventlet
+from eventlet.event import Event
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into a single fetch.
+
+    Within a worker, greenlets asking for a key that is already being fetched
+    wait for the in-flight call instead of starting their own. Across workers,
+    a short Redis lock elects one leader per key; followers wait for the
+    leader's result to appear under a notification key.
+    """
+
+    def __init__(self, name: str, lock_timeout: int = 15, result_ttl: int = 10, poll_interval: float = 0.05):
+        """Initializes the SingleFlight group.
+
+        Args:
+            name (str): Name of the group, used to namespace Redis keys.
+            lock_timeout (int): Seconds a leader may hold the cross-worker lock.
+            result_ttl (int): Seconds the leader's result stays available to followers.
+            poll_interval (float): Seconds between follower checks for the result.
+        """
+        self.name = name
+        self.redis_prefix = f"singleflight:{name}:"
+        self.lock_timeout = lock_timeout
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self._calls: Dict[str, Event] = {}
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {
+            "leader": 0,
+            "coalesced_local": 0,
+            "coalesced_remote": 0,
+        }
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        """Increments a counter locally and in Redis.
+
+        Args:
+            counter (str): Name of the counter to increment.
+            amount (int): How much to add.
+        """
+        from cache import redis_client
+
+        if not amount:
+            return
+
+        self._counters[counter] += amount
+        if redis_client:
+            try:
+                redis_client.hincrby(f"{self.redis_prefix}stats", counter, amount)
+            except Exception as e:
+                print(f"SingleFlight stats error: {str(e)}")
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Returns leader and coalesced fetch counters.
+
+        Returns:
+            Dict[str, Dict[str, int]]: Counters for this worker and for the whole cluster.
+        """
+        from cache import redis_client
+
+        cluster = {}
+        if redis_client:
+            try:
+                cluster = {
+                    field.decode(): int(value)
+                    for field, value in redis_client.hgetall(f"{self.redis_prefix}stats").items()
+                }
+            except Exception as e:
+                print(f"SingleFlight stats error: {str(e)}")
+
+        return {"worker": dict(self._counters), "cluster": cluster}
+
+    def do(self, key: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Runs fn once for all concurrent callers sharing the same key.
+
+        Args:
+            key (str): Identifies the fetch being coalesced.
+            fn (Callable[..., Any]): Function producing a JSON-serializable result.
+            *args (Any): Positional arguments passed to fn.
+            **kwargs (Any): Keyword arguments passed to fn.
+
+        Returns:
+            Any: The result of fn, computed by this caller or shared by the leader.
+        """
+        with self._lock:
+            event = self._calls.get(key)
+            is_leader = event is None
+            if is_leader:
+                event = Event()
+                self._calls[key] = event
+
+        if not is_leader:
+            self._count("coalesced_local")
+            return event.wait()
+
+        try:
+            result = self._do_cluster(key, fn, *args, **kwargs)
+        except Exception as e:
+            event.send_exception(e)
+            raise
+        else:
+            event.send(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def _do_cluster(self, key: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Elects a leader across workers and shares its result with followers.
+
+        Args:
+            key (str): Identifies the fetch being coalesced.
+            fn (Callable[..., Any]): Function producing a JSON-serializable result.
+            *args (Any): Positional arguments passed to fn.
+            **kwargs (Any): Keyword arguments passed to fn.
+
+        Returns:
+            Any: The result of fn.
+        """
+        from cache import redis_client
+
+        if not redis_client:
+            self._count("leader")
+            return fn(*args, **kwargs)
+
+        lock_key = f"{self.redis_prefix}lock:{key}"
+        result_key = f"{self.redis_prefix}result:{key}"
+        token = uuid.uuid4().hex
+
+        try:
+            acquired = redis_client.set(lock_key, token, nx=True, ex=self.lock_timeout)
+        except Exception as e:
+            print(f"SingleFlight lock error: {str(e)}")
+            acquired = True
+
+        if not acquired:
+            deadline = time.time() + self.lock_timeout
+            while time.time() < deadline:
+                try:
+                    shared = redis_client.get(result_key)
+                    if shared is not None:
+                        self._count("coalesced_remote")
+                        return json.loads(shared)
+                    if not redis_client.exists(lock_key):
+                        break
+                except Exception as e:
+                    print(f"SingleFlight wait error: {str(e)}")
+                    break
+                eventlet.sleep(self.poll_interval)
+
+        self._count("leader")
+        try:
+            result = fn(*args, **kwargs)
+            try:
+                redis_client.setex(result_key, self.result_ttl, json.dumps(result))
+            except Exception as e:
+                print(f"SingleFlight notify error: {str(e)}")
+            return result
+        finally:
+            if acquired:
+                try:
+                    if redis_client.get(lock_key) == token.encode():
+                        redis_client.delete(lock_key)
+                except Exception as e:
+                    print(f"SingleFlight unlock error: {str(e)}")
+
+    def do_many(self, keys: List[str], fn: Callable[[List[str]], Dict[str, Any]]) -> Dict[str, Any]:
+        """Fetches many keys in one batch, sharing each key with concurrent callers.
+
+        Every key is claimed separately, as in `do`, so a batch coalesces with
+        single-key calls and with other batches that overlap it. Keys another
+        greenlet or worker is already fetching are waited for; fn is called
+        once with all keys this caller claimed.
+
+        Args:
+            keys (List[str]): Identify the fetches being coalesced.
+            fn (Callable[[List[str]], Dict[str, Any]]): Fetches the given keys and
+                returns JSON-serializable results by key.
+
+        Returns:
+            Dict[str, Any]: The result of every key, None where fn returned none.
+        """
+        led, waiting = {}, {}
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                event = self._calls.get(key)
+                if event is None:
+                    event = Event()
+                    self._calls[key] = event
+                    led[key] = event
+                else:
+                    waiting[key] = event
+
+        self._count("coalesced_local", len(waiting))
+
+        results = {}
+        try:
+            if led:
+                results = self._do_cluster_many(list(led), fn)
+        except Exception as e:
+            for event in led.values():
+                event.send_exception(e)
+            raise
+        else:
+            for key, event in led.items():
+                event.send(results.get(key))
+        finally:
+            with self._lock:
+                for key in led:
+                    self._calls.pop(key, None)
+
+        for key, event in waiting.items():
+            results[key] = event.wait()
+        return {key: results.get(key) for key in dict.fromkeys(keys)}
+
+    def _lead_many(self, keys: List[str], fn: Callable[[List[str]], Dict[str, Any]]) -> Dict[str, Any]:
+        """Fetches keys this caller leads and publishes their results for followers.
+
+        Args:
+            keys (List[str]): The claimed keys.
+            fn (Callable[[List[str]], Dict[str, Any]]): Fetches the keys.
+
+        Returns:
+            Dict[str, Any]: The results by key.
+        """
+        from cache import redis_client
+
+        self._count("leader", len(keys))
+        results = fn(keys)
+        if redis_client:
+            try:
+                pipe = redis_client.pipeline(transaction=False)
+                for key in keys:
+                    pipe.setex(f"{self.redis_prefix}result:{key}", self.result_ttl, json.dumps(results.get(key)))
+                pipe.execute()
+            except Exception as e:
+                print(f"SingleFlight notify error: {str(e)}")
+        return results
+
+    def _do_cluster_many(self, keys: List[str], fn: Callable[[List[str]], Dict[str, Any]]) -> Dict[str, Any]:
+        """Claims keys across workers, fetches the claimed ones and waits for the rest.
+
+        Keys whose leader finishes without publishing a result, or does not
+        finish within lock_timeout, are fetched by this caller after all.
+
+        Args:
+            keys (List[str]): Keys no other greenlet of this worker is fetching.
+            fn (Callable[[List[str]], Dict[str, Any]]): Fetches the given keys.
+
+        Returns:
+            Dict[str, Any]: The results by key.
+        """
+        from cache import redis_client
+
+        if not redis_client:
+            return self._lead_many(keys, fn)
+
+        token = uuid.uuid4().hex
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for key in keys:
+                pipe.set(f"{self.redis_prefix}lock:{key}", token, nx=True, ex=self.lock_timeout)
+            acquired = [key for key, claimed in zip(keys, pipe.execute()) if claimed]
+        except Exception as e:
+            print(f"SingleFlight lock error: {str(e)}")
+            return self._lead_many(keys, fn)
+
+        results = {}
+        if acquired:
+            try:
+                results.update(self._lead_many(acquired, fn))
+            finally:
+                self._unlock_many(acquired, token)
+
+        pending = [key for key in keys if key not in results and key not in acquired]
+        deadline = time.time() + self.lock_timeout
+        while pending and time.time() < deadline:
+            try:
+                pipe = redis_client.pipeline(transaction=False)
+                for key in pending:
+                    pipe.exists(f"{self.redis_prefix}lock:{key}")
+                locked = dict(zip(pending, pipe.execute()))
+
+                shared = redis_client.mget([f"{self.redis_prefix}result:{key}" for key in pending])
+                found = {key: json.loads(value) for key, value in zip(pending, shared) if value is not None}
+                self._count("coalesced_remote", len(found))
+                results.update(found)
+                pending = [key for key in pending if key not in found]
+                if not all(locked[key] for key in pending):
+                    break
+            except Exception as e:
+                print(f"SingleFlight wait error: {str(e)}")
+                break
+            eventlet.sleep(self.poll_interval)
+
+        if pending:
+            results.update(self._lead_many(pending, fn))
+        return results
+
+    def _unlock_many(self, keys: List[str], token: str) -> None:
+        """Releases the cross-worker locks this caller still holds.
+
+        Args:
+            keys (List[str]): The claimed keys.
+            token (str): The token the locks were taken with.
+        """
+        from cache import redis_client
+
+        lock_keys = [f"{self.redis_prefix}lock:{key}" for key in keys]
+        try:
+            owned = [
+                lock_key for lock_key, value in zip(lock_keys, redis_client.mget(lock_keys)) if value == token.encode()
+            ]
+            if owned:
+                redis_client.delete(*owned)
+        except Exception as e:
+            print(f"SingleFlight unlock error: {str(e)}")
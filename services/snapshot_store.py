@@ -0,0 +1,305 @@
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+SNAPSHOT_DIR                : str = os.getenv("SNAPSHOT_DIR", "snapshots_db")
+SNAPSHOT_MIN_SPACING        : int = int(os.getenv("SNAPSHOT_MIN_SPACING", 60))
+SNAPSHOT_RETENTION_DAYS     : int = int(os.getenv("SNAPSHOT_RETENTION_DAYS", 90))
+SNAPSHOT_MAX_BYTES          : int = int(os.getenv("SNAPSHOT_MAX_BYTES", 1024 ** 3))
+SNAPSHOT_DOWNSAMPLE_AFTER   : int = 7
+SNAPSHOT_DOWNSAMPLE_STEP    : int = 300
+SNAPSHOT_CLOSE_GRACE        : int = 3600
+
+SNAPSHOT_DTYPE = np.dtype(
+    [
+        ("ts", "<f8"),
+        ("price", "<f8"),
+        ("change", "<f8"),
+        ("volume", "<f8"),
+        ("day_high", "<f8"),
+        ("day_low", "<f8"),
+        ("rsi", "<f8"),
+        ("macd", "<f8"),
+        ("stoch_k", "<f8"),
+        ("stoch_d", "<f8"),
+        ("bb_upper", "<f8"),
+        ("bb_lower", "<f8"),
+        ("buy", "<i4"),
+        ("sell", "<i4"),
+        ("neutral", "<i4"),
+    ]
+)
+
+RAW_SUFFIX          : str = ".bin"
+COMPACTED_SUFFIX    : str = ".c1.bin"
+DOWNSAMPLED_SUFFIX  : str = ".c2.bin"
+
+
+def _float(value: Any) -> float:
+    """Converts an indicator value to a float, using NaN for missing values.
+
+    Args:
+        value (Any): The indicator value.
+
+    Returns:
+        float: The value, or NaN.
+    """
+    try:
+        return float(value) if value is not None else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class SnapshotStore:
+    """Keeps an append-only history of analysis results in columnar day files.
+
+    Each symbol, interval and UTC day gets one file of fixed-size records
+    holding the price, indicators and recommendation counts. Files are read
+    through memory maps, so a requested time range is served as slices of the
+    mapped arrays without copying. A daily compaction sorts and deduplicates
+    closed days, downsamples older ones and enforces the retention period and
+    the total disk budget.
+    """
+
+    def __init__(self, base_dir: str = SNAPSHOT_DIR):
+        """Initializes the snapshot store.
+
+        Args:
+            base_dir (str): Directory holding the snapshot files.
+        """
+        self.base_dir = base_dir
+        self.redis_prefix = "snapshot:"
+
+    def _symbol_dir(self, symbol: str, interval: str) -> str:
+        """Returns the directory holding a symbol's day files for an interval.
+
+        Args:
+            symbol (str): The stock symbol.
+            interval (str): The analysis interval.
+
+        Returns:
+            str: The directory path.
+        """
+        return os.path.join(self.base_dir, interval, symbol.replace(":", "_"))
+
+    def _day_files(self, directory: str) -> Dict[str, str]:
+        """Maps every day in a directory to its most compacted file.
+
+        Args:
+            directory (str): A symbol directory.
+
+        Returns:
+            Dict[str, str]: Day (YYYYMMDD) mapped to the file path to read.
+        """
+        days: Dict[str, Tuple[int, str]] = {}
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return {}
+
+        for name in names:
+            for level, suffix in enumerate((RAW_SUFFIX, COMPACTED_SUFFIX, DOWNSAMPLED_SUFFIX)):
+                stem = name[: -len(suffix)]
+                if name.endswith(suffix) and stem.isdigit() and len(stem) == 8:
+                    if level >= days.get(stem, (-1, ""))[0]:
+                        days[stem] = (level, os.path.join(directory, name))
+        return {day: path for day, (_, path) in days.items()}
+
+    def _map(self, path: str) -> np.ndarray:
+        """Memory-maps a day file.
+
+        A trailing partial record, left by a write in progress, is ignored.
+
+        Args:
+            path (str): The day file.
+
+        Returns:
+            np.ndarray: A read-only view of the records.
+        """
+        try:
+            count = os.path.getsize(path) // SNAPSHOT_DTYPE.itemsize
+        except FileNotFoundError:
+            count = 0
+        if count == 0:
+            return np.empty(0, dtype=SNAPSHOT_DTYPE)
+        return np.memmap(path, dtype=SNAPSHOT_DTYPE, mode="r", shape=(count,))
+
+    def record(self, symbol: str, interval: str, analysis: Dict[str, Any]) -> None:
+        """Appends a snapshot of an analysis result.
+
+        At most one snapshot per symbol and interval is written every
+        SNAPSHOT_MIN_SPACING seconds across all workers.
+
+        Args:
+            symbol (str): The requested symbol.
+            interval (str): The analysis interval.
+            analysis (Dict[str, Any]): The analysis response data.
+        """
+        from cache import redis_client
+
+        try:
+            if redis_client and not redis_client.set(
+                f"{self.redis_prefix}last:{symbol}:{interval}", "1", nx=True, ex=SNAPSHOT_MIN_SPACING
+            ):
+                return
+
+            now = time.time()
+            indicators = analysis.get("indicators") or {}
+            summary = (analysis.get("technical_analysis") or {}).get("summary") or {}
+            row = np.array(
+                [
+                    (
+                        now,
+                        _float(analysis.get("price")),
+                        _float(analysis.get("change")),
+                        _float(analysis.get("volume")),
+                        _float(analysis.get("dayHigh")),
+                        _float(analysis.get("dayLow")),
+                        _float(indicators.get("rsi")),
+                        _float(indicators.get("macd")),
+                        _float(indicators.get("stoch_k")),
+                        _float(indicators.get("stoch_d")),
+                        _float(indicators.get("bb_upper")),
+                        _float(indicators.get("bb_lower")),
+                        int(summary.get("BUY", 0)),
+                        int(summary.get("SELL", 0)),
+                        int(summary.get("NEUTRAL", 0)),
+                    )
+                ],
+                dtype=SNAPSHOT_DTYPE,
+            )
+
+            directory = self._symbol_dir(symbol, interval)
+            os.makedirs(directory, exist_ok=True)
+            day = datetime.fromtimestamp(now, tz=timezone.utc).strftime("%Y%m%d")
+            with open(os.path.join(directory, f"{day}{RAW_SUFFIX}"), "ab") as f:
+                f.write(row.tobytes())
+        except Exception as e:
+            print(f"Snapshot write error for {symbol}: {str(e)}")
+
+    def read(self, symbol: str, interval: str, start: float, end: float) -> List[np.ndarray]:
+        """Reads the snapshots of a symbol within a time range.
+
+        Compacted days are sorted, so their range is a slice of the memory map.
+        Days still being written are filtered with a mask.
+
+        Args:
+            symbol (str): The requested symbol.
+            interval (str): The analysis interval.
+            start (float): Range start as a UNIX timestamp.
+            end (float): Range end as a UNIX timestamp.
+
+        Returns:
+            List[np.ndarray]: One record array per day, in chronological order.
+        """
+        first_day = datetime.fromtimestamp(start, tz=timezone.utc).strftime("%Y%m%d")
+        last_day = datetime.fromtimestamp(end, tz=timezone.utc).strftime("%Y%m%d")
+
+        chunks = []
+        for day, path in sorted(self._day_files(self._symbol_dir(symbol, interval)).items()):
+            if day < first_day or day > last_day:
+                continue
+
+            records = self._map(path)
+            if not path.endswith((COMPACTED_SUFFIX, DOWNSAMPLED_SUFFIX)):
+                records = records[(records["ts"] >= start) & (records["ts"] <= end)]
+                records = records[np.argsort(records["ts"], kind="stable")]
+            else:
+                ts = records["ts"]
+                records = records[np.searchsorted(ts, start, "left"):np.searchsorted(ts, end, "right")]
+
+            if len(records):
+                chunks.append(records)
+        return chunks
+
+    def _compact_file(self, path: str, day: str, downsample: bool) -> None:
+        """Rewrites a closed day file sorted, deduplicated and optionally downsampled.
+
+        Args:
+            path (str): The day file to compact.
+            day (str): The day (YYYYMMDD) the file holds.
+            downsample (bool): Whether to keep only the last snapshot per SNAPSHOT_DOWNSAMPLE_STEP.
+        """
+        records = np.array(self._map(path))
+        records = records[np.argsort(records["ts"], kind="stable")]
+
+        if len(records):
+            buckets = (records["ts"] // SNAPSHOT_DOWNSAMPLE_STEP) if downsample else records["ts"]
+            keep = np.append(buckets[1:] != buckets[:-1], True)
+            records = records[keep]
+
+        directory = os.path.dirname(path)
+        target = os.path.join(directory, f"{day}{DOWNSAMPLED_SUFFIX if downsample else COMPACTED_SUFFIX}")
+        tmp_path = f"{target}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(records.tobytes())
+        os.replace(tmp_path, target)
+        if path != target:
+            os.remove(path)
+
+    def compact(self) -> Dict[str, int]:
+        """Compacts closed days and enforces retention and the disk budget.
+
+        Returns:
+            Dict[str, int]: Counts of compacted, downsampled and deleted files.
+        """
+        now = datetime.now(timezone.utc)
+        closed_before = (now - timedelta(seconds=SNAPSHOT_CLOSE_GRACE)).strftime("%Y%m%d")
+        downsample_before = (now - timedelta(days=SNAPSHOT_DOWNSAMPLE_AFTER)).strftime("%Y%m%d")
+        retain_from = (now - timedelta(days=SNAPSHOT_RETENTION_DAYS)).strftime("%Y%m%d")
+
+        stats = {"compacted": 0, "downsampled": 0, "deleted": 0}
+        remaining: List[Tuple[str, str, int]] = []
+
+        if not os.path.isdir(self.base_dir):
+            return stats
+
+        for interval in os.listdir(self.base_dir):
+            interval_dir = os.path.join(self.base_dir, interval)
+            if not os.path.isdir(interval_dir):
+                continue
+
+            for symbol_dir in os.listdir(interval_dir):
+                directory = os.path.join(interval_dir, symbol_dir)
+                for day, path in self._day_files(directory).items():
+                    try:
+                        if day < retain_from:
+                            for suffix in (RAW_SUFFIX, COMPACTED_SUFFIX, DOWNSAMPLED_SUFFIX):
+                                if os.path.exists(os.path.join(directory, f"{day}{suffix}")):
+                                    os.remove(os.path.join(directory, f"{day}{suffix}"))
+                            stats["deleted"] += 1
+                            continue
+
+                        if day < downsample_before and not path.endswith(DOWNSAMPLED_SUFFIX):
+                            self._compact_file(path, day, downsample=True)
+                            stats["downsampled"] += 1
+                        elif day < closed_before and not path.endswith((COMPACTED_SUFFIX, DOWNSAMPLED_SUFFIX)):
+                            self._compact_file(path, day, downsample=False)
+                            stats["compacted"] += 1
+                    except Exception as e:
+                        print(f"Snapshot compaction error for {path}: {str(e)}")
+
+                for day, path in self._day_files(directory).items():
+                    remaining.append((day, path, os.path.getsize(path)))
+
+                if not os.listdir(directory):
+                    os.rmdir(directory)
+
+        total = sum(size for _, _, size in remaining)
+        for day, path, size in sorted(remaining):
+            if total <= SNAPSHOT_MAX_BYTES:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                stats["deleted"] += 1
+            except OSError as e:
+                print(f"Snapshot eviction error for {path}: {str(e)}")
+
+        return stats
+
+
+snapshot_store = SnapshotStore()
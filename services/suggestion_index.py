@@ -0,0 +1,501 @@
+import fcntl
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+import eventlet
+import numpy as np
+from eventlet import tpool
+
+from config import symbols_db_pool
+
+SUGGESTION_INDEX_PATH   : str = os.path.join(os.path.dirname(symbols_db_pool.db_path), "suggestions.idx")
+SUGGESTION_INDEX_MAGIC  : bytes = b"SUGIDX01"
+RELOAD_CHECK_INTERVAL   : int = 30
+SECTION_ALIGNMENT       : int = 8
+LOCK_RETRY_INTERVAL     : float = 0.05
+
+SEPARATOR       : bytes = b"\n"
+FIELD_SEPARATOR : bytes = b"\x1f"
+
+
+def _trigrams(text: bytes) -> set:
+    """Returns the trigrams of a byte string as 24-bit integers.
+
+    Args:
+        text (bytes): The upper-cased text.
+
+    Returns:
+        set: The distinct trigrams.
+    """
+    return {int.from_bytes(text[i:i + 3], "big") for i in range(len(text) - 2)}
+
+
+def write_index_file(path: str, magic: bytes, layout: dict, sections: Dict[str, Union[bytes, np.ndarray]]) -> None:
+    """Writes an index file of named sections and swaps it in atomically.
+
+    The file starts with the magic bytes and a JSON header holding the layout,
+    followed by every section aligned to SECTION_ALIGNMENT bytes, so arrays can
+    be mapped without copying.
+
+    Args:
+        path (str): Location of the index file.
+        magic (bytes): Bytes identifying the file format.
+        layout (dict): Metadata stored in the header, e.g. the source version.
+        sections (Dict[str, Union[bytes, np.ndarray]]): Blobs and arrays by name.
+    """
+    layout = dict(layout, sections={})
+    payload = []
+    position = 0
+    for name, value in sections.items():
+        data = value if isinstance(value, bytes) else value.tobytes()
+        dtype = None if isinstance(value, bytes) else value.dtype.str
+        layout["sections"][name] = [position, len(data), dtype]
+        padding = -len(data) % SECTION_ALIGNMENT
+        payload.append(data + b"\0" * padding)
+        position += len(data) + padding
+
+    header = json.dumps(layout).encode()
+    header += b" " * (-(len(magic) + 4 + len(header)) % SECTION_ALIGNMENT)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(magic + struct.pack("<I", len(header)) + header)
+        for data in payload:
+            f.write(data)
+    os.replace(tmp_path, path)
+
+
+def read_index_layout(path: str, magic: bytes) -> Optional[dict]:
+    """Reads the layout header of an index file.
+
+    Args:
+        path (str): Location of the index file.
+        magic (bytes): Bytes identifying the file format.
+
+    Returns:
+        Optional[dict]: The layout, or None if the file is missing or invalid.
+    """
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(magic)) != magic:
+                return None
+            (length,) = struct.unpack("<I", f.read(4))
+            return json.loads(f.read(length))
+    except (FileNotFoundError, ValueError, struct.error):
+        return None
+
+
+def map_index_file(path: str, magic: bytes, layout: dict) -> Tuple[mmap.mmap, dict]:
+    """Maps an index file read-only.
+
+    Args:
+        path (str): Location of the index file.
+        magic (bytes): Bytes identifying the file format.
+        layout (dict): The layout read by read_index_layout.
+
+    Returns:
+        Tuple[mmap.mmap, dict]: The mapping and its sections, arrays as NumPy
+        views and blobs as (start, end) positions in the mapping.
+    """
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    base = len(magic) + 4 + struct.unpack_from("<I", mm, len(magic))[0]
+    sections = {}
+    for name, (offset, length, dtype) in layout["sections"].items():
+        if dtype is None:
+            sections[name] = (base + offset, base + offset + length)
+        else:
+            dtype = np.dtype(dtype)
+            sections[name] = np.frombuffer(mm, dtype=dtype, count=length // dtype.itemsize, offset=base + offset)
+    return mm, sections
+
+
+class SuggestionIndex:
+    """Memory-mapped index answering symbol suggestions without SQL.
+
+    The index file holds upper-cased symbols and descriptions as newline
+    separated blobs in table order, row ids sorted by symbol for exact and
+    prefix lookups, and a trigram index over descriptions. It is built once
+    from the `tv` table and every gunicorn worker maps the same file, so the
+    operating system keeps a single copy in the page cache. The file is rebuilt
+    when the symbols database changes, on eventlet's native thread pool, and
+    searches keep using the previous mapping until the new one is ready.
+
+    Ranking follows the SQL it replaces: exact symbol matches, then symbol
+    prefixes, then symbol substrings, then description substrings, each tier
+    in table order.
+    """
+
+    def __init__(self, path: str = SUGGESTION_INDEX_PATH):
+        """Initializes the index.
+
+        Args:
+            path (str): Location of the index file.
+        """
+        self.path = path
+        self._mm: Optional[mmap.mmap] = None
+        self._sections = {}
+        self._db_version = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def _current_db_version(self) -> Optional[list]:
+        """Identifies the current state of the symbols database file.
+
+        Returns:
+            Optional[list]: Modification times and sizes of the database and its
+            WAL, or None if the database does not exist.
+        """
+        version = []
+        for path in (symbols_db_pool.db_path, f"{symbols_db_pool.db_path}-wal"):
+            try:
+                stat = os.stat(path)
+                version.append([stat.st_mtime_ns, stat.st_size])
+            except FileNotFoundError:
+                version.append(None)
+        return version if version[0] else None
+
+    def build(self) -> None:
+        """Writes a new index file from the `tv` table and swaps it in atomically.
+
+        The query and the index construction both run on eventlet's native
+        thread pool, so other greenlets keep running meanwhile.
+        """
+        db_version = self._current_db_version()
+        rows = symbols_db_pool.execute("SELECT screener, exchange, symbol, desc FROM tv ORDER BY rowid")
+        tpool.execute(self._write, rows, db_version)
+
+    def _write(self, rows: List[tuple], db_version: list) -> None:
+        """Builds the index sections from `tv` rows and writes the index file.
+
+        Args:
+            rows (List[tuple]): The (screener, exchange, symbol, desc) rows in table order.
+            db_version (list): The database version the rows were read from.
+        """
+        symbols = [(symbol or "").upper().encode().replace(SEPARATOR, b" ") for _, _, symbol, _ in rows]
+        descs = [(desc or "").upper().encode().replace(SEPARATOR, b" ") for _, _, _, desc in rows]
+        records = [
+            FIELD_SEPARATOR.join((field or "").encode() for field in (symbol, desc, exchange, screener))
+            for screener, exchange, symbol, desc in rows
+        ]
+
+        def blob(values: List[bytes]) -> Tuple[bytes, np.ndarray]:
+            offsets = np.zeros(len(values) + 1, dtype=np.uint64)
+            offsets[1:] = np.cumsum([len(value) + 1 for value in values])
+            return SEPARATOR.join(values) + SEPARATOR, offsets
+
+        symbol_blob, symbol_offsets = blob(symbols)
+        desc_blob, desc_offsets = blob(descs)
+        record_blob, record_offsets = blob(records)
+        sorted_ids = np.array(sorted(range(len(symbols)), key=lambda i: symbols[i]), dtype=np.uint32)
+
+        postings = {}
+        for row_id, desc in enumerate(descs):
+            for trigram in _trigrams(desc):
+                postings.setdefault(trigram, []).append(row_id)
+        trigram_keys = np.array(sorted(postings), dtype=np.uint32)
+        trigram_offsets = np.zeros(len(trigram_keys) + 1, dtype=np.uint64)
+        trigram_offsets[1:] = np.cumsum([len(postings[key]) for key in trigram_keys.tolist()])
+        trigram_postings = np.array(
+            [row_id for key in trigram_keys.tolist() for row_id in postings[key]], dtype=np.uint32
+        )
+
+        sections = {
+            "symbol_blob": symbol_blob,
+            "symbol_offsets": symbol_offsets,
+            "desc_blob": desc_blob,
+            "desc_offsets": desc_offsets,
+            "record_blob": record_blob,
+            "record_offsets": record_offsets,
+            "sorted_ids": sorted_ids,
+            "trigram_keys": trigram_keys,
+            "trigram_offsets": trigram_offsets,
+            "trigram_postings": trigram_postings,
+        }
+
+        write_index_file(
+            self.path, SUGGESTION_INDEX_MAGIC, {"db_version": db_version, "rows": len(rows)}, sections
+        )
+
+    def _open(self, rebuild: bool = False) -> None:
+        """Maps the index file, building it first if it is missing or outdated.
+
+        Args:
+            rebuild (bool): Whether to rebuild the file even if it looks current.
+        """
+        db_version = self._current_db_version()
+        if db_version is None:
+            raise FileNotFoundError(symbols_db_pool.db_path)
+
+        with open(f"{self.path}.lock", "a") as lock_file:
+            while True:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    eventlet.sleep(LOCK_RETRY_INTERVAL)
+            try:
+                layout = read_index_layout(self.path, SUGGESTION_INDEX_MAGIC)
+                if rebuild or layout is None or layout["db_version"] != db_version:
+                    self.build()
+                    layout = read_index_layout(self.path, SUGGESTION_INDEX_MAGIC)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+        mm, sections = map_index_file(self.path, SUGGESTION_INDEX_MAGIC, layout)
+
+        old = self._mm
+        self._mm, self._sections, self._db_version = mm, sections, db_version
+        if old is not None:
+            try:
+                old.close()
+            except BufferError:
+                pass
+
+    def _ensure_current(self) -> None:
+        """Maps the index on first use and remaps it when the database changed.
+
+        Only the first search waits for the index; while it is rebuilt later,
+        searches use the previous mapping.
+        """
+        now = time.monotonic()
+        if self._mm is not None and now < self._next_check:
+            return
+
+        if not self._lock.acquire(blocking=self._mm is None):
+            return
+        try:
+            if self._mm is not None and now < self._next_check:
+                return
+            self._next_check = now + RELOAD_CHECK_INTERVAL
+            if self._mm is None or self._current_db_version() != self._db_version:
+                self._open()
+        finally:
+            self._lock.release()
+
+    def refresh(self) -> None:
+        """Makes the next search check whether the symbols database changed."""
+        self._next_check = 0.0
+
+    def reload(self) -> None:
+        """Rebuilds and remaps the index, e.g. after the symbols database was replaced."""
+        with self._lock:
+            self._open(rebuild=True)
+            self._next_check = time.monotonic() + RELOAD_CHECK_INTERVAL
+
+    def _symbol(self, row_id: int) -> bytes:
+        """Returns the upper-cased symbol of a row.
+
+        Args:
+            row_id (int): The row id.
+
+        Returns:
+            bytes: The symbol.
+        """
+        start, _ = self._sections["symbol_blob"]
+        offsets = self._sections["symbol_offsets"]
+        return self._mm[start + int(offsets[row_id]):start + int(offsets[row_id + 1]) - 1]
+
+    def record(self, row_id: int) -> Tuple[str, str, str, str]:
+        """Returns the original (screener, exchange, symbol, desc) of a row.
+
+        Args:
+            row_id (int): The row id.
+
+        Returns:
+            Tuple[str, str, str, str]: The row as stored in the `tv` table.
+        """
+        start, _ = self._sections["record_blob"]
+        offsets = self._sections["record_offsets"]
+        raw = self._mm[start + int(offsets[row_id]):start + int(offsets[row_id + 1]) - 1]
+        symbol, desc, exchange, screener = raw.decode().split(FIELD_SEPARATOR.decode())
+        return screener, exchange, symbol, desc
+
+    def _prefix_range(self, query: bytes) -> Tuple[int, int, int]:
+        """Finds the ranges of sorted row ids whose symbol equals or starts with the query.
+
+        Exact matches sort first among the symbols starting with the query, so
+        they are the front of the prefix range.
+
+        Args:
+            query (bytes): The upper-cased query.
+
+        Returns:
+            Tuple[int, int, int]: Start of the prefix range, end of the exact
+            matches and end of the prefix range in the sorted id array.
+        """
+        sorted_ids = self._sections["sorted_ids"]
+
+        def bound(low: int, high: int, length: Optional[int], upper: bool) -> int:
+            while low < high:
+                mid = (low + high) // 2
+                key = self._symbol(int(sorted_ids[mid]))[:length]
+                if key < query or (upper and key == query):
+                    low = mid + 1
+                else:
+                    high = mid
+            return low
+
+        start = bound(0, len(sorted_ids), len(query), False)
+        end = bound(start, len(sorted_ids), len(query), True)
+        return start, bound(start, end, None, True), end
+
+    @staticmethod
+    def _first_rows(row_ids: np.ndarray, limit: int) -> List[int]:
+        """Returns the lowest row ids, i.e. the first rows in table order.
+
+        Args:
+            row_ids (np.ndarray): Unordered row ids.
+            limit (int): Maximum number of rows to return.
+
+        Returns:
+            List[int]: Up to limit row ids in table order.
+        """
+        if len(row_ids) > limit:
+            row_ids = np.partition(row_ids, limit - 1)[:limit]
+        return np.sort(row_ids).tolist()
+
+    def _scan(self, blob: str, query: bytes, limit: int, exclude) -> List[int]:
+        """Scans a newline separated blob in table order for rows containing the query.
+
+        Args:
+            blob (str): Name of the blob section, "symbol_blob" or "desc_blob".
+            query (bytes): The upper-cased query.
+            limit (int): Maximum number of rows to return.
+            exclude: Predicate on row ids that should be skipped.
+
+        Returns:
+            List[int]: Matching row ids in table order.
+        """
+        start, end = self._sections[blob]
+        offsets = self._sections[blob.replace("blob", "offsets")]
+        matches = []
+        position = self._mm.find(query, start, end)
+        while position != -1 and len(matches) < limit:
+            row_id = int(np.searchsorted(offsets, position - start, side="right")) - 1
+            if not exclude(row_id):
+                matches.append(row_id)
+            next_row = start + int(offsets[row_id + 1])
+            position = self._mm.find(query, next_row, end)
+        return matches
+
+    def _desc_candidates(self, query: bytes) -> Optional[np.ndarray]:
+        """Narrows description matches down with the trigram index.
+
+        Args:
+            query (bytes): The upper-cased query, at least three bytes long.
+
+        Returns:
+            Optional[np.ndarray]: Sorted candidate row ids.
+        """
+        keys = self._sections["trigram_keys"]
+        offsets = self._sections["trigram_offsets"]
+        postings = self._sections["trigram_postings"]
+
+        lists = []
+        for trigram in _trigrams(query):
+            i = int(np.searchsorted(keys, trigram))
+            if i >= len(keys) or int(keys[i]) != trigram:
+                return np.empty(0, dtype=np.uint32)
+            lists.append(postings[int(offsets[i]):int(offsets[i + 1])])
+
+        lists.sort(key=len)
+        candidates = lists[0]
+        for other in lists[1:]:
+            candidates = np.intersect1d(candidates, other, assume_unique=True)
+        return candidates
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[str, str, str, str]]:
+        """Finds symbol suggestions for a query.
+
+        Args:
+            query (str): The query string.
+            limit (int): The maximum number of suggestions.
+
+        Returns:
+            List[Tuple[str, str, str, str]]: (screener, exchange, symbol, desc) rows,
+            best matches first.
+        """
+        self._ensure_current()
+
+        needle = query.upper().encode()
+        if not needle or SEPARATOR in needle or FIELD_SEPARATOR in needle:
+            return []
+
+        sorted_ids = self._sections["sorted_ids"]
+        prefix_start, exact_end, prefix_end = self._prefix_range(needle)
+        results = self._first_rows(sorted_ids[prefix_start:exact_end], limit)
+
+        if len(results) < limit:
+            results += self._first_rows(sorted_ids[exact_end:prefix_end], limit - len(results))
+
+        if len(results) < limit:
+            results += self._scan(
+                "symbol_blob", needle, limit - len(results), lambda row_id: self._symbol(row_id).startswith(needle)
+            )
+
+        if len(results) < limit:
+            if len(needle) >= 3:
+                desc_start, _ = self._sections["desc_blob"]
+                desc_offsets = self._sections["desc_offsets"]
+                for row_id in self._desc_candidates(needle).tolist():
+                    desc = self._mm[desc_start + int(desc_offsets[row_id]):desc_start + int(desc_offsets[row_id + 1]) - 1]
+                    if needle in desc and needle not in self._symbol(row_id):
+                        results.append(row_id)
+                        if len(results) >= limit:
+                            break
+            else:
+                results += self._scan(
+                    "desc_blob", needle, limit - len(results), lambda row_id: needle in self._symbol(row_id)
+                )
+
+        return [self.record(row_id) for row_id in results[:limit]]
+
+    def similar_descriptions(self, query: str, limit: int = 5, min_score: float = 0.5) -> List[int]:
+        """Finds descriptions sharing most of the query's trigrams, tolerating typos.
+
+        Args:
+            query (str): The query string, e.g. a misspelled company name.
+            limit (int): The maximum number of rows to return.
+            min_score (float): Minimum share of the query's trigrams a description must contain.
+
+        Returns:
+            List[int]: Row ids, best scores first and shorter descriptions breaking ties.
+        """
+        self._ensure_current()
+
+        trigrams = _trigrams(query.upper().encode())
+        if not trigrams:
+            return []
+
+        keys = self._sections["trigram_keys"]
+        offsets = self._sections["trigram_offsets"]
+        postings = self._sections["trigram_postings"]
+
+        lists = []
+        for trigram in trigrams:
+            i = int(np.searchsorted(keys, trigram))
+            if i < len(keys) and int(keys[i]) == trigram:
+                lists.append(postings[int(offsets[i]):int(offsets[i + 1])])
+        if not lists:
+            return []
+
+        counts = np.bincount(np.concatenate(lists))
+        candidates = np.flatnonzero(counts >= max(1, min_score * len(trigrams)))
+        if not len(candidates):
+            return []
+
+        desc_offsets = self._sections["desc_offsets"]
+        lengths = desc_offsets[candidates + 1] - desc_offsets[candidates]
+        order = np.lexsort((candidates, lengths, -counts[candidates]))
+        return candidates[order[:limit]].tolist()
+
+
+suggestion_index = SuggestionIndex()
+symbols_db_pool.add_swap_listener(suggestion_index.refresh)
@@ -0,0 +1,105 @@
+import re
+import sqlite3
+import sys
+from typing import List, Tuple
+
+from config import symbols_db_pool
+from services.symbol_index import EXCHANGE_PRIORITY
+
+FTS_TABLE           : str = "tv_fts"
+FTS_PREFIXES        : str = "1 2 3 4"
+FTS_WEIGHTS         : Tuple[float, float, float] = (10.0, 2.0, 0.5)
+EXCHANGE_BOOST_STEP : float = 0.5
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def build_fts(db_path: str = symbols_db_pool.db_path) -> int:
+    """Creates or rebuilds the FTS5 index over the `tv` table.
+
+    The index is an external-content table, so it stores only the inverted
+    index and reads symbol, description and exchange back from `tv`. Prefix
+    indexes make short "AP*" style queries index lookups.
+
+    Args:
+        db_path (str): Path of the symbols database.
+
+    Returns:
+        int: The number of indexed rows.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+                symbol, desc, exchange,
+                content='tv', content_rowid='rowid',
+                prefix='{FTS_PREFIXES}'
+            )
+            """
+        )
+        conn.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES('rebuild')")
+        conn.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES('optimize')")
+        conn.commit()
+        return conn.execute("SELECT COUNT(*) FROM tv").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _match_expression(query: str) -> str:
+    """Turns a user query into an FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term, so "bitcoin ca" matches
+    descriptions containing both "bitcoin" and a word starting with "ca".
+
+    Args:
+        query (str): The query string.
+
+    Returns:
+        str: The MATCH expression, empty if the query has no words.
+    """
+    return " ".join(f'"{token}"*' for token in TOKEN_PATTERN.findall(query))
+
+
+def search(query: str, limit: int = 5) -> List[Tuple[str, str, str, str]]:
+    """Finds symbol suggestions through the FTS5 index.
+
+    Exact symbol matches come first. The rest is ordered by bm25, weighted
+    towards the symbol column, with a boost for the exchanges listed in
+    EXCHANGE_PRIORITY.
+
+    Args:
+        query (str): The query string.
+        limit (int): The maximum number of suggestions.
+
+    Returns:
+        List[Tuple[str, str, str, str]]: (screener, exchange, symbol, desc) rows.
+
+    Raises:
+        sqlite3.OperationalError: If the FTS5 index has not been built.
+    """
+    expression = _match_expression(query)
+    if not expression:
+        return []
+
+    boost = " ".join(
+        f"WHEN '{exchange}' THEN {(len(EXCHANGE_PRIORITY) - rank) * EXCHANGE_BOOST_STEP}"
+        for rank, exchange in enumerate(EXCHANGE_PRIORITY)
+    )
+
+    return symbols_db_pool.execute(
+        f"""
+        SELECT tv.screener, tv.exchange, tv.symbol, tv.desc FROM {FTS_TABLE}
+        JOIN tv ON tv.rowid = {FTS_TABLE}.rowid
+        WHERE {FTS_TABLE} MATCH ?
+        ORDER BY UPPER(tv.symbol) = ? DESC,
+            bm25({FTS_TABLE}, ?, ?, ?) - CASE UPPER(tv.exchange) {boost} ELSE 0 END
+        LIMIT ?
+        """,
+        (expression, query.upper(), *FTS_WEIGHTS, limit),
+    )
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else symbols_db_pool.db_path
+    print(f"Indexed {build_fts(path)} symbols into {FTS_TABLE} in {path}")
@@ -0,0 +1,328 @@
+import os
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, KeysView, Mapping, NamedTuple, Optional
+
+from config import COMMON_STOCKS, CRYPTO_SYMBOLS, symbols_db_pool
+
+EXCHANGE_SCREENERS: Dict[str, str] = {
+    "NASDAQ": "america",
+    "NYSE": "america",
+    "AMEX": "america",
+    "TSX": "canada",
+    "LSE": "uk",
+    "FWB": "germany",
+    "BINANCE": "crypto",
+    "COINBASE": "crypto",
+    "KRAKEN": "crypto",
+    "BITFINEX": "crypto",
+    "FTX": "crypto",
+    "KUCOIN": "crypto",
+    "FX": "forex",
+    "OANDA": "forex",
+    "CRYPTO": "crypto",
+}
+
+EXCHANGE_PRIORITY   : list[str] = ["NASDAQ", "NYSE", "AMEX", "BINANCE", "COINBASE", "KRAKEN", "BITFINEX", "KUCOIN"]
+CRYPTO_QUOTES       : list[str] = ["USDT", "USDC", "BUSD", "USD", "EUR", "BTC", "ETH", "BNB"]
+DEFAULT_CRYPTO_QUOTE: str = "USDT"
+DEFAULT_CRYPTO_EXCHANGE: str = "BINANCE"
+NASDAQ_COMMON_STOCKS: frozenset = frozenset(
+    ["AAPL", "MSFT", "GOOGL", "AMZN", "META", "NVDA", "TSLA", "NFLX", "INTC", "AMD", "CSCO"]
+)
+
+RELOAD_CHECK_INTERVAL   : int = 30
+MAX_UNLISTED_ENTRIES    : int = 10000
+
+
+class SymbolInfo(NamedTuple):
+    """Routing and classification data for one symbol.
+
+    `symbol` is the ticker as listed on `exchange`, and `listed` is True when
+    that route is known without probing exchanges.
+    """
+
+    symbol: str
+    asset_class: str
+    base: str
+    quote: str
+    exchange: str
+    screener: str
+    name: Optional[str]
+    listed: bool
+
+
+def normalize_symbol(symbol: str) -> str:
+    """Normalizes a user-supplied symbol for index lookups.
+
+    Args:
+        symbol (str): A bare symbol, a BASE/QUOTE pair or EXCHANGE:SYMBOL.
+
+    Returns:
+        str: The upper-cased symbol without whitespace or pair separators.
+    """
+    return symbol.strip().upper().replace("/", "")
+
+
+def _asset_class(screener: str) -> str:
+    """Maps a TradingView screener to an asset class.
+
+    Args:
+        screener (str): The TradingView screener.
+
+    Returns:
+        str: "crypto", "forex" or "stock".
+    """
+    if screener in ("crypto", "forex"):
+        return screener
+    return "stock"
+
+
+class SymbolIndex:
+    """Frozen in-memory map from normalized symbols to their classification.
+
+    Built from the `tv` table of the symbols database plus the curated
+    CRYPTO_SYMBOLS and COMMON_STOCKS lists, and rebuilt when the database file
+    changes. A stock listed in `tv` keeps its ticker even when a curated crypto
+    base has the same name. Every lookup is a dictionary hit; symbols that are
+    not listed are classified once from the known crypto bases and quote
+    currencies and the result is kept until the next rebuild.
+    """
+
+    def __init__(self, db_path: str = symbols_db_pool.db_path):
+        """Initializes an empty index.
+
+        Args:
+            db_path (str): Path of the symbols database the index is built from.
+        """
+        self.db_path = db_path
+        self._by_symbol: Mapping[str, SymbolInfo] = MappingProxyType({})
+        self._by_pair: Mapping[str, SymbolInfo] = MappingProxyType({})
+        self._crypto_bases: frozenset = frozenset(CRYPTO_SYMBOLS)
+        self._unlisted: Dict[str, SymbolInfo] = {}
+        self._db_version = None
+        self._next_check = 0.0
+        self._built = False
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    def _current_db_version(self) -> Optional[tuple]:
+        """Identifies the current state of the symbols database file.
+
+        Returns:
+            Optional[tuple]: Modification times and sizes of the database and its
+            WAL, or None if the database does not exist.
+        """
+        version = []
+        for path in (self.db_path, f"{self.db_path}-wal"):
+            try:
+                stat = os.stat(path)
+                version.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                version.append(None)
+        return tuple(version) if version[0] else None
+
+    def _split_pair(self, symbol: str, crypto_bases: frozenset) -> tuple[str, str]:
+        """Splits a crypto pair into base and quote currency.
+
+        Only splits leaving a known crypto base are accepted. The longest such
+        base wins, so BNBUSD is BNB/USD and not BN/BUSD.
+
+        Args:
+            symbol (str): The pair, e.g. BTCUSDT.
+            crypto_bases (frozenset): Known crypto base currencies.
+
+        Returns:
+            tuple[str, str]: The base and quote, or (symbol, "") if no known
+            base followed by a quote currency makes up the symbol.
+        """
+        for quote in sorted(CRYPTO_QUOTES, key=len):
+            base = symbol[: -len(quote)]
+            if base and symbol.endswith(quote) and base in crypto_bases:
+                return base, quote
+        return symbol, ""
+
+    def _unambiguous_base(self, symbol: str) -> Optional[str]:
+        """Returns the base of a pair that only one quote currency can end.
+
+        Pairs like ABUSD, which could be A/BUSD or AB/USD, are ambiguous and
+        yield no base.
+
+        Args:
+            symbol (str): The normalized pair.
+
+        Returns:
+            Optional[str]: The base, or None if the split is ambiguous or impossible.
+        """
+        quotes = [quote for quote in CRYPTO_QUOTES if symbol.endswith(quote) and len(symbol) > len(quote)]
+        return symbol[: -len(quotes[0])] if len(quotes) == 1 else None
+
+    def build(self) -> None:
+        """Rebuilds the index from the symbols database and the curated lists."""
+        version = self._current_db_version()
+        rows = []
+        if version is not None:
+            try:
+                rows = symbols_db_pool.execute("SELECT screener, exchange, symbol, desc FROM tv")
+            except Exception as e:
+                print(f"Error building symbol index: {str(e)}")
+
+        crypto_bases = set(CRYPTO_SYMBOLS)
+        for screener, _, symbol, _ in rows:
+            if screener == "crypto" and symbol:
+                base = self._unambiguous_base(normalize_symbol(symbol))
+                if base:
+                    crypto_bases.add(base)
+        crypto_bases = frozenset(crypto_bases)
+
+        priority = {exchange: rank for rank, exchange in enumerate(EXCHANGE_PRIORITY)}
+        by_pair: Dict[str, SymbolInfo] = {}
+        by_symbol: Dict[str, SymbolInfo] = {}
+
+        for screener, exchange, symbol, desc in rows:
+            if not symbol or not exchange:
+                continue
+            key = normalize_symbol(symbol)
+            exchange = exchange.upper()
+            asset_class = _asset_class(screener)
+            base, quote = self._split_pair(key, crypto_bases) if asset_class == "crypto" else (key, "")
+
+            info = SymbolInfo(symbol, asset_class, base, quote, exchange, screener, desc, True)
+            by_pair[f"{exchange}:{key}"] = info
+
+            current = by_symbol.get(key)
+            if current is None or priority.get(exchange, len(priority)) < priority.get(current.exchange, len(priority)):
+                by_symbol[key] = info
+
+        for base, name in CRYPTO_SYMBOLS.items():
+            current = by_symbol.get(base)
+            if current is not None and current.asset_class == "stock":
+                continue
+
+            pair = f"{base}{DEFAULT_CRYPTO_QUOTE}"
+            listed = by_pair.get(f"{DEFAULT_CRYPTO_EXCHANGE}:{pair}")
+            if listed is not None:
+                by_symbol[base] = listed._replace(name=name)
+            elif current is None:
+                by_symbol[base] = SymbolInfo(
+                    pair, "crypto", base, DEFAULT_CRYPTO_QUOTE, DEFAULT_CRYPTO_EXCHANGE, "crypto", name, False
+                )
+
+        for symbol, name in COMMON_STOCKS.items():
+            current = by_symbol.get(symbol)
+            if current is None:
+                exchange = "NASDAQ" if symbol in NASDAQ_COMMON_STOCKS else "NYSE"
+                by_symbol[symbol] = SymbolInfo(symbol, "stock", symbol, "", exchange, "america", name, False)
+            elif current.asset_class == "stock":
+                by_symbol[symbol] = current._replace(name=current.name or name)
+
+        self._by_pair = MappingProxyType(by_pair)
+        self._by_symbol = MappingProxyType(by_symbol)
+        self._crypto_bases = crypto_bases
+        self._unlisted = {}
+        self._db_version = version
+        self._built = True
+        self.generation += 1
+
+    def reload(self) -> None:
+        """Forces a rebuild, e.g. after the symbols database was replaced."""
+        with self._lock:
+            self.build()
+            self._next_check = time.monotonic() + RELOAD_CHECK_INTERVAL
+
+    def _ensure_current(self) -> None:
+        """Builds the index on first use and rebuilds it when the database changed."""
+        now = time.monotonic()
+        if self._built and now < self._next_check:
+            return
+
+        with self._lock:
+            if self._built and now < self._next_check:
+                return
+            self._next_check = now + RELOAD_CHECK_INTERVAL
+            if not self._built or self._current_db_version() != self._db_version:
+                self.build()
+
+    def _classify_unlisted(self, key: str) -> SymbolInfo:
+        """Classifies a symbol that is not in the symbols database.
+
+        Args:
+            key (str): The normalized symbol, bare or EXCHANGE:SYMBOL.
+
+        Returns:
+            SymbolInfo: The best classification available without an upstream call.
+        """
+        exchange, _, symbol = key.rpartition(":")
+
+        if exchange:
+            screener = EXCHANGE_SCREENERS.get(exchange, "america")
+            asset_class = _asset_class(screener)
+            base, quote = self._split_pair(symbol, self._crypto_bases) if asset_class == "crypto" else (symbol, "")
+            return SymbolInfo(symbol, asset_class, base, quote, exchange, screener, None, False)
+
+        base, quote = self._split_pair(symbol, self._crypto_bases)
+        if quote and base in self._crypto_bases:
+            return SymbolInfo(symbol, "crypto", base, quote, DEFAULT_CRYPTO_EXCHANGE, "crypto", None, False)
+
+        return SymbolInfo(symbol, "stock", symbol, "", "", "america", None, False)
+
+    def get(self, symbol: str) -> Optional[SymbolInfo]:
+        """Looks up a listed or curated symbol.
+
+        Args:
+            symbol (str): A bare symbol or EXCHANGE:SYMBOL.
+
+        Returns:
+            Optional[SymbolInfo]: The entry, or None if the symbol is not known.
+        """
+        self._ensure_current()
+        key = normalize_symbol(symbol)
+        if ":" in key:
+            return self._by_pair.get(key)
+        return self._by_symbol.get(key)
+
+    def symbols(self) -> KeysView[str]:
+        """Returns every listed or curated symbol.
+
+        Returns:
+            KeysView[str]: A read-only view of the normalized symbols.
+        """
+        self._ensure_current()
+        return self._by_symbol.keys()
+
+    def classify(self, symbol: str) -> SymbolInfo:
+        """Classifies any symbol, listed or not.
+
+        Args:
+            symbol (str): A bare symbol or EXCHANGE:SYMBOL.
+
+        Returns:
+            SymbolInfo: The classification. Unlisted entries have `listed` set to False.
+        """
+        info = self.get(symbol)
+        if info is not None:
+            return info
+
+        key = normalize_symbol(symbol)
+        info = self._unlisted.get(key)
+        if info is None:
+            info = self._classify_unlisted(key)
+            if len(self._unlisted) < MAX_UNLISTED_ENTRIES:
+                self._unlisted[key] = info
+        return info
+
+    def is_crypto(self, symbol: str) -> bool:
+        """Checks whether a symbol is a crypto asset.
+
+        Args:
+            symbol (str): A bare symbol or EXCHANGE:SYMBOL.
+
+        Returns:
+            bool: True for crypto symbols.
+        """
+        return self.classify(symbol).asset_class == "crypto"
+
+
+symbol_index = SymbolIndex()
+symbols_db_pool.add_swap_listener(symbol_index.reload)
@@ -0,0 +1,354 @@
+import json
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+import eventlet
+
+from config import SYMBOL_SUGGESTION_MODE
+from services.symbol_index import normalize_symbol, symbol_index
+
+POPULARITY_HALF_LIFE    : int = 7 * 86400
+POPULARITY_RENORMALIZE  : int = 4 * POPULARITY_HALF_LIFE
+EPOCH_CHECK_INTERVAL    : int = 60
+EPOCH_GRACE             : int = 86400
+POPULARITY_MAX_SYMBOLS  : int = 5000
+SELECTION_WEIGHT        : float = 3.0
+HIT_WEIGHT              : float = 1.0
+RANK_CANDIDATE_FACTOR   : int = 4
+PREFIX_TOP_K            : int = 10
+MAX_MATERIALIZED_PREFIX : int = 3
+MAX_MATERIALIZED_COUNT  : int = 2000
+MATERIALIZED_SYMBOLS    : int = 500
+
+
+def _decay_factor(now: float, epoch: float) -> float:
+    """Returns the weight of an event happening now relative to the decay epoch.
+
+    Scores use forward decay: newer events are weighted up instead of older
+    ones being weighted down, so an event is recorded with a single ZINCRBY
+    and never has to be rewritten. Dividing a score by the current factor
+    gives its decayed value. The factor doubles every half-life, so the epoch
+    is moved forward by SymbolPopularity.renormalize.
+
+    Args:
+        now (float): The current UNIX time.
+        epoch (float): The UNIX time scores are relative to.
+
+    Returns:
+        float: The weight multiplier.
+    """
+    return 2 ** ((now - epoch) / POPULARITY_HALF_LIFE)
+
+
+class SymbolPopularity:
+    """Tracks which symbols users pick and blends that into suggestions.
+
+    Suggestion selections and successful stock lookups are counted in one
+    Redis sorted set with a half-life of POPULARITY_HALF_LIFE, kept relative
+    to a decay epoch stored in Redis. Within each
+    ranking tier of the suggestion index (exact, prefix, substring,
+    description), more popular symbols come first. The top PREFIX_TOP_K
+    suggestions for the most typed queries of up to MAX_MATERIALIZED_PREFIX
+    characters, and for the prefixes of the most popular symbols, are
+    periodically precomputed into a Redis hash, so those queries are answered
+    with one HGET.
+    """
+
+    def __init__(self):
+        """Initializes the popularity tracker."""
+        self.redis_prefix = "popularity:"
+        self._epoch_value: Optional[int] = None
+        self._epoch_checked = 0.0
+
+    def _epoch(self) -> int:
+        """Returns the decay epoch, read from Redis at most every EPOCH_CHECK_INTERVAL seconds.
+
+        The first worker that needs an epoch starts it at the current time.
+
+        Returns:
+            int: The UNIX time scores are relative to.
+        """
+        from cache import redis_client
+
+        now = time.monotonic()
+        if self._epoch_value is not None and now < self._epoch_checked + EPOCH_CHECK_INTERVAL:
+            return self._epoch_value
+
+        key = f"{self.redis_prefix}epoch"
+        epoch = redis_client.get(key)
+        if epoch is None:
+            redis_client.set(key, int(time.time()), nx=True)
+            epoch = redis_client.get(key)
+        self._epoch_value, self._epoch_checked = int(epoch), now
+        return self._epoch_value
+
+    def _symbols_key(self, epoch: int) -> str:
+        """Returns the sorted set of symbol scores relative to an epoch.
+
+        Args:
+            epoch (int): The decay epoch.
+
+        Returns:
+            str: The sorted set key.
+        """
+        return f"{self.redis_prefix}symbols:{epoch}"
+
+    def _prefixes_key(self, epoch: int) -> str:
+        """Returns the sorted set of typed prefix counts relative to an epoch.
+
+        Args:
+            epoch (int): The decay epoch.
+
+        Returns:
+            str: The sorted set key.
+        """
+        return f"{self.redis_prefix}prefixes:{epoch}"
+
+    def _key(self, symbol: str) -> str:
+        """Maps a requested symbol to the symbol suggestions are listed under.
+
+        Args:
+            symbol (str): A bare symbol, a pair or EXCHANGE:SYMBOL.
+
+        Returns:
+            str: The normalized listed symbol without exchange.
+        """
+        info = symbol_index.get(symbol)
+        return normalize_symbol(info.symbol if info else symbol).rpartition(":")[2]
+
+    def _record(self, symbol: str, weight: float) -> None:
+        """Adds a weighted event to a symbol's popularity.
+
+        Args:
+            symbol (str): The symbol.
+            weight (float): The event weight.
+        """
+        from cache import redis_client
+
+        if not redis_client or not symbol:
+            return
+
+        try:
+            epoch = self._epoch()
+            key = self._symbols_key(epoch)
+            redis_client.zincrby(key, weight * _decay_factor(time.time(), epoch), self._key(symbol))
+            if random.random() < 0.01:
+                redis_client.zremrangebyrank(key, 0, -POPULARITY_MAX_SYMBOLS - 1)
+        except Exception as e:
+            print(f"Popularity tracking error: {str(e)}")
+
+    def record_selection(self, symbol: str) -> None:
+        """Counts a user picking a symbol from the suggestions.
+
+        Args:
+            symbol (str): The selected symbol.
+        """
+        self._record(symbol, SELECTION_WEIGHT)
+
+    def record_hit(self, symbol: str) -> None:
+        """Counts a successful stock data request for a symbol.
+
+        Args:
+            symbol (str): The requested symbol.
+        """
+        self._record(symbol, HIT_WEIGHT)
+
+    def scores(self, symbols: List[str]) -> Dict[str, float]:
+        """Returns the decayed popularity of some symbols with one ZMSCORE.
+
+        Args:
+            symbols (List[str]): Normalized symbols without exchange.
+
+        Returns:
+            Dict[str, float]: Each symbol that has a score mapped to it.
+        """
+        from cache import redis_client
+
+        if not redis_client or not symbols:
+            return {}
+
+        try:
+            epoch = self._epoch()
+            values = redis_client.zmscore(self._symbols_key(epoch), symbols)
+        except Exception as e:
+            print(f"Popularity read error: {str(e)}")
+            return {}
+
+        factor = _decay_factor(time.time(), epoch)
+        return {symbol: score / factor for symbol, score in zip(symbols, values) if score is not None}
+
+    def rank(self, query: str, matches: List[Tuple[str, str, str, str]], limit: int) -> List[Tuple[str, str, str, str]]:
+        """Orders suggestion index rows by popularity within each ranking tier.
+
+        Rows keep their tier and, between symbols of equal popularity, their
+        order. Pass about RANK_CANDIDATE_FACTOR times limit rows, so popular
+        symbols just past the limit can move up.
+
+        Args:
+            query (str): The upper-cased query.
+            matches (List[Tuple[str, str, str, str]]): (screener, exchange, symbol, desc)
+                rows in suggestion index order.
+            limit (int): The maximum number of rows to return.
+
+        Returns:
+            List[Tuple[str, str, str, str]]: The re-ranked rows.
+        """
+        if not query or len(matches) < 2:
+            return matches[:limit]
+
+        scores = self.scores(list(dict.fromkeys(normalize_symbol(symbol) for _, _, symbol, _ in matches)))
+        if not scores:
+            return matches[:limit]
+
+        def sort_key(item: Tuple[int, Tuple[str, str, str, str]]) -> tuple:
+            position, (_, _, symbol, _) = item
+            symbol = normalize_symbol(symbol)
+            if symbol == query:
+                tier = 0
+            elif symbol.startswith(query):
+                tier = 1
+            elif query in symbol:
+                tier = 2
+            else:
+                tier = 3
+            return tier, -scores.get(symbol, 0.0), position
+
+        return [row for _, row in sorted(enumerate(matches), key=sort_key)][:limit]
+
+    def _top_key(self) -> str:
+        """Returns the Redis hash holding the precomputed prefix suggestions.
+
+        Returns:
+            str: The hash key for the current suggestion mode.
+        """
+        return f"{self.redis_prefix}top:{SYMBOL_SUGGESTION_MODE}"
+
+    def top_for_prefixes(self, queries: List[str], limit: int) -> Dict[str, list]:
+        """Looks up the precomputed suggestions for short queries with one HMGET.
+
+        The queries are counted in the same round trip, so materialize knows
+        which prefixes users type.
+
+        Args:
+            queries (List[str]): The upper-cased queries.
+            limit (int): The number of suggestions wanted per query.
+
+        Returns:
+            Dict[str, list]: Suggestions for every query that was precomputed.
+        """
+        from cache import redis_client
+
+        short = [query for query in queries if 0 < len(query) <= MAX_MATERIALIZED_PREFIX]
+        if not redis_client or limit > PREFIX_TOP_K or not short:
+            return {}
+
+        try:
+            epoch = self._epoch()
+            key = self._prefixes_key(epoch)
+            weight = _decay_factor(time.time(), epoch)
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.hmget(self._top_key(), short)
+            for query in short:
+                pipe.zincrby(key, weight, query)
+            if random.random() < 0.01:
+                pipe.zremrangebyrank(key, 0, -MAX_MATERIALIZED_COUNT * 2 - 1)
+            values = pipe.execute()[0]
+            return {query: json.loads(top)[:limit] for query, top in zip(short, values) if top is not None}
+        except Exception as e:
+            print(f"Prefix suggestion read error: {str(e)}")
+            return {}
+
+    def top_for_prefix(self, query: str, limit: int) -> Optional[list]:
+        """Looks up the precomputed suggestions for a short query.
+
+        Args:
+            query (str): The upper-cased query.
+            limit (int): The number of suggestions wanted.
+
+        Returns:
+            Optional[list]: The suggestions, or None if they were not precomputed.
+        """
+        return self.top_for_prefixes([query], limit).get(query)
+
+    def materialize(self) -> int:
+        """Precomputes the suggestions of the most used short prefixes.
+
+        Up to MAX_MATERIALIZED_COUNT prefixes are precomputed: the most typed
+        queries of up to MAX_MATERIALIZED_PREFIX characters, then the prefixes
+        of the MATERIALIZED_SYMBOLS most popular symbols. Other short queries
+        go through the suggestion index and the per-query cache. The new table
+        is written under a temporary key and renamed into place, so readers
+        never see a partial table.
+
+        Returns:
+            int: The number of prefixes written.
+        """
+        from cache import redis_client
+        from routes import find_symbol_matches, format_symbol_suggestions
+
+        if not redis_client:
+            return 0
+
+        epoch = self._epoch()
+        typed = redis_client.zrevrange(self._prefixes_key(epoch), 0, MAX_MATERIALIZED_COUNT - 1)
+        popular = redis_client.zrevrange(self._symbols_key(epoch), 0, MATERIALIZED_SYMBOLS - 1)
+        candidates = [prefix.decode() for prefix in typed] + [
+            symbol.decode()[:length] for symbol in popular for length in range(1, MAX_MATERIALIZED_PREFIX + 1)
+        ]
+        prefixes = [
+            prefix for prefix in dict.fromkeys(candidates) if 0 < len(prefix) <= MAX_MATERIALIZED_PREFIX
+        ][:MAX_MATERIALIZED_COUNT]
+
+        tmp_key = f"{self._top_key()}:building"
+        redis_client.delete(tmp_key)
+        pipe = redis_client.pipeline(transaction=False)
+        for count, prefix in enumerate(prefixes, 1):
+            suggestions = format_symbol_suggestions(find_symbol_matches(prefix, PREFIX_TOP_K))
+            pipe.hset(tmp_key, prefix, json.dumps(suggestions))
+            eventlet.sleep(0)
+            if count % 500 == 0:
+                pipe.execute()
+        pipe.execute()
+
+        if prefixes:
+            redis_client.rename(tmp_key, self._top_key())
+        return len(prefixes)
+
+    def renormalize(self) -> bool:
+        """Moves the decay epoch forward once it is POPULARITY_RENORMALIZE old.
+
+        Forward-decayed scores double every half-life and would eventually
+        lose precision and overflow. The sorted sets are copied to the keys of
+        the new epoch, scaled down with ZUNIONSTORE, and the epoch is switched
+        in the same transaction. Workers pick the new epoch up within
+        EPOCH_CHECK_INTERVAL; events they record meanwhile go to the old sets,
+        which expire after EPOCH_GRACE. Run it from one worker at a time.
+
+        Returns:
+            bool: Whether the epoch was moved.
+        """
+        from cache import redis_client
+
+        if not redis_client:
+            return False
+
+        self._epoch_value = None
+        epoch = self._epoch()
+        now = int(time.time())
+        if now - epoch < POPULARITY_RENORMALIZE:
+            return False
+
+        weight = 1 / _decay_factor(now, epoch)
+        pipe = redis_client.pipeline(transaction=True)
+        for key in (self._symbols_key, self._prefixes_key):
+            pipe.zunionstore(key(now), {key(epoch): weight})
+            pipe.expire(key(epoch), EPOCH_GRACE)
+        pipe.set(f"{self.redis_prefix}epoch", now)
+        pipe.execute()
+
+        self._epoch_value, self._epoch_checked = now, time.monotonic()
+        return True
+
+
+symbol_popularity = SymbolPopularity()
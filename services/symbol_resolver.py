@@ -0,0 +1,197 @@
+import time
+from typing import Dict, Optional
+
+from config import symbol_routes_db_pool
+
+ROUTE_TTL           : int = 7 * 86400
+MAX_ROUTE_FAILURES  : int = 3
+
+
+class SymbolResolver:
+    """Remembers which exchange a bare symbol was found on.
+
+    Symbols missing from the `tv` table have to be located by probing several
+    exchanges. The winning (exchange, screener, display_symbol) route is kept in
+    Redis for fast lookups and in a local SQLite side table so it survives Redis
+    restarts. Routes that keep failing are dropped so the symbol is probed again.
+    """
+
+    def __init__(self):
+        """Initializes the resolver and makes sure the side table exists."""
+        self.redis_prefix = "symbol_route:"
+        self.pool = symbol_routes_db_pool
+        self._ensure_schema()
+
+    def _ensure_schema(self) -> None:
+        """Creates the symbol_routes side table if it does not exist."""
+        try:
+            self.pool.execute(
+                """
+                CREATE TABLE IF NOT EXISTS symbol_routes (
+                    symbol          TEXT PRIMARY KEY,
+                    exchange        TEXT NOT NULL,
+                    screener        TEXT NOT NULL,
+                    display_symbol  TEXT NOT NULL,
+                    failures        INTEGER NOT NULL DEFAULT 0,
+                    updated_at      REAL NOT NULL
+                )
+                """,
+                commit=True,
+            )
+        except Exception as e:
+            print(f"Error creating symbol routes table: {str(e)}")
+
+    def get(self, symbol: str) -> Optional[Dict[str, str]]:
+        """Returns the remembered route for a symbol.
+
+        Args:
+            symbol (str): The requested symbol.
+
+        Returns:
+            Optional[Dict[str, str]]: A dict with exchange, screener and
+            display_symbol, or None if the symbol has no known route.
+        """
+        from cache import redis_client
+
+        key = f"{self.redis_prefix}{symbol}"
+
+        if redis_client:
+            try:
+                cached = redis_client.hgetall(key)
+                if cached:
+                    return {
+                        "exchange": cached[b"exchange"].decode(),
+                        "screener": cached[b"screener"].decode(),
+                        "display_symbol": cached[b"display_symbol"].decode(),
+                    }
+            except Exception as e:
+                print(f"Symbol route cache error: {str(e)}")
+
+        try:
+            result = self.pool.execute(
+                "SELECT exchange, screener, display_symbol, updated_at FROM symbol_routes WHERE symbol = ?",
+                (symbol,),
+                one=True,
+            )
+        except Exception as e:
+            print(f"Symbol routes database error: {str(e)}")
+            return None
+
+        if not result:
+            return None
+
+        exchange, screener, display_symbol, updated_at = result
+        if time.time() - updated_at > ROUTE_TTL:
+            self.forget(symbol)
+            return None
+
+        route = {"exchange": exchange, "screener": screener, "display_symbol": display_symbol}
+
+        if redis_client:
+            try:
+                redis_client.hset(key, mapping=route)
+                redis_client.expire(key, ROUTE_TTL)
+            except Exception as e:
+                print(f"Symbol route cache error: {str(e)}")
+
+        return route
+
+    def record(self, symbol: str, exchange: str, screener: str, display_symbol: str) -> None:
+        """Records the route a symbol was successfully found on.
+
+        Args:
+            symbol (str): The requested symbol.
+            exchange (str): The exchange the symbol was found on.
+            screener (str): The TradingView screener used.
+            display_symbol (str): The symbol as listed on the exchange.
+        """
+        from cache import redis_client
+
+        if redis_client:
+            try:
+                key = f"{self.redis_prefix}{symbol}"
+                redis_client.delete(key)
+                redis_client.hset(
+                    key,
+                    mapping={"exchange": exchange, "screener": screener, "display_symbol": display_symbol},
+                )
+                redis_client.expire(key, ROUTE_TTL)
+            except Exception as e:
+                print(f"Symbol route cache error: {str(e)}")
+
+        try:
+            self.pool.execute(
+                """
+                INSERT INTO symbol_routes (symbol, exchange, screener, display_symbol, failures, updated_at)
+                VALUES (?, ?, ?, ?, 0, ?)
+                ON CONFLICT(symbol) DO UPDATE SET
+                    exchange = excluded.exchange,
+                    screener = excluded.screener,
+                    display_symbol = excluded.display_symbol,
+                    failures = 0,
+                    updated_at = excluded.updated_at
+                """,
+                (symbol, exchange, screener, display_symbol, time.time()),
+                commit=True,
+            )
+        except Exception as e:
+            print(f"Symbol routes database error: {str(e)}")
+
+    def record_failure(self, symbol: str) -> None:
+        """Records a failed lookup on a remembered route.
+
+        The route is dropped once it has failed MAX_ROUTE_FAILURES times in a row.
+
+        Args:
+            symbol (str): The requested symbol.
+        """
+        from cache import redis_client
+
+        failures = 0
+
+        if redis_client:
+            try:
+                key = f"{self.redis_prefix}{symbol}"
+                if redis_client.exists(key):
+                    failures = redis_client.hincrby(key, "failures", 1)
+            except Exception as e:
+                print(f"Symbol route cache error: {str(e)}")
+
+        try:
+            def increment(conn):
+                """Bumps the failure count and reads it back in one transaction."""
+                conn.execute("UPDATE symbol_routes SET failures = failures + 1 WHERE symbol = ?", (symbol,))
+                result = conn.execute("SELECT failures FROM symbol_routes WHERE symbol = ?", (symbol,)).fetchone()
+                conn.commit()
+                return result
+
+            result = self.pool.run(increment)
+            if result:
+                failures = max(failures, result[0])
+        except Exception as e:
+            print(f"Symbol routes database error: {str(e)}")
+
+        if failures >= MAX_ROUTE_FAILURES:
+            self.forget(symbol)
+
+    def forget(self, symbol: str) -> None:
+        """Removes the remembered route for a symbol.
+
+        Args:
+            symbol (str): The requested symbol.
+        """
+        from cache import redis_client
+
+        if redis_client:
+            try:
+                redis_client.delete(f"{self.redis_prefix}{symbol}")
+            except Exception as e:
+                print(f"Symbol route cache error: {str(e)}")
+
+        try:
+            self.pool.execute("DELETE FROM symbol_routes WHERE symbol = ?", (symbol,), commit=True)
+        except Exception as e:
+            print(f"Symbol routes database error: {str(e)}")
+
+
+symbol_resolver = SymbolResolver()
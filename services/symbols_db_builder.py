@@ -0,0 +1,182 @@
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Iterator, Tuple
+
+from config import symbols_db_pool
+from services.symbol_fts import build_fts
+
+SYMBOL_COLUMNS  : Tuple[str, ...] = ("screener", "exchange", "symbol", "desc")
+INSERT_BATCH    : int = 5000
+
+TV_SCHEMA = """
+    CREATE TABLE tv (
+        screener TEXT NOT NULL,
+        exchange TEXT NOT NULL COLLATE NOCASE,
+        symbol   TEXT NOT NULL COLLATE NOCASE,
+        desc     TEXT
+    )
+"""
+
+TV_INDEXES = (
+    "CREATE UNIQUE INDEX idx_tv_exchange_symbol ON tv(exchange, symbol)",
+    "CREATE INDEX idx_tv_symbol ON tv(symbol)",
+    "CREATE INDEX idx_tv_symbol_upper ON tv(UPPER(symbol))",
+)
+
+
+def read_symbol_dump(source: str) -> Iterator[Tuple[str, str, str, str]]:
+    """Reads (screener, exchange, symbol, desc) rows from a symbol dump.
+
+    Supported dumps are CSV files with a header row, JSON arrays or JSON lines
+    of objects with those keys, and SQLite databases with a `tv` table.
+
+    Args:
+        source (str): Path of the dump.
+
+    Yields:
+        Tuple[str, str, str, str]: The rows, in dump order.
+    """
+    if source.endswith((".db", ".sqlite", ".sqlite3")):
+        conn = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+        try:
+            yield from conn.execute("SELECT screener, exchange, symbol, desc FROM tv ORDER BY rowid")
+        finally:
+            conn.close()
+        return
+
+    with open(source, encoding="utf-8") as f:
+        if source.endswith(".csv"):
+            records = csv.DictReader(f)
+        elif source.endswith(".jsonl"):
+            records = (json.loads(line) for line in f if line.strip())
+        else:
+            records = json.load(f)
+
+        for record in records:
+            yield tuple(record.get(column) for column in SYMBOL_COLUMNS)
+
+
+def build_symbols_db(source: str, target: str) -> Dict[str, int]:
+    """Builds an optimized, immutable symbols database from a dump.
+
+    The database gets the `tv` table with case-insensitive symbol and exchange
+    columns, the indexes our lookups need, the FTS5 suggestion index and
+    planner statistics. It is vacuumed, switched to a rollback journal so no
+    WAL is needed to read it, and marked immutable by removing write
+    permission.
+
+    Args:
+        source (str): Path of the symbol dump.
+        target (str): Path of the database to create. Must not exist yet.
+
+    Returns:
+        Dict[str, int]: Counts of rows read, rows kept and the resulting file size.
+    """
+    stats = {"read": 0, "kept": 0}
+    conn = sqlite3.connect(target)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute(TV_SCHEMA)
+
+        seen = set()
+        batch = []
+        for screener, exchange, symbol, desc in read_symbol_dump(source):
+            stats["read"] += 1
+            exchange = (exchange or "").strip().upper()
+            symbol = (symbol or "").strip().upper()
+            key = (exchange, symbol)
+            if not screener or not exchange or not symbol or key in seen:
+                continue
+            seen.add(key)
+            batch.append((screener.strip().lower(), exchange, symbol, (desc or "").strip()))
+            if len(batch) >= INSERT_BATCH:
+                conn.executemany("INSERT INTO tv VALUES (?, ?, ?, ?)", batch)
+                batch = []
+        conn.executemany("INSERT INTO tv VALUES (?, ?, ?, ?)", batch)
+        stats["kept"] = len(seen)
+
+        for statement in TV_INDEXES:
+            conn.execute(statement)
+        conn.commit()
+    finally:
+        conn.close()
+
+    build_fts(target)
+
+    conn = sqlite3.connect(target)
+    try:
+        conn.execute("ANALYZE")
+        conn.commit()
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA journal_mode = DELETE")
+        result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+        if result != "ok":
+            raise sqlite3.DatabaseError(f"Integrity check failed: {result}")
+    finally:
+        conn.close()
+
+    with open(target, "rb") as f:
+        os.fsync(f.fileno())
+    os.chmod(target, 0o444)
+
+    stats["bytes"] = os.path.getsize(target)
+    return stats
+
+
+def install_symbols_db(built_path: str, db_path: str = symbols_db_pool.db_path) -> None:
+    """Atomically replaces the live symbols database with a built one.
+
+    Running workers notice the new file within a second, drain their
+    connections to the old file and reopen read-only. The -wal and -shm files
+    left by the old database are removed, so SQLite never replays them onto
+    the new file.
+
+    Args:
+        built_path (str): Path of the database built by build_symbols_db.
+        db_path (str): Path of the live symbols database.
+    """
+    os.replace(built_path, db_path)
+    for suffix in ("-wal", "-shm"):
+        try:
+            os.remove(db_path + suffix)
+        except FileNotFoundError:
+            pass
+    directory = os.open(os.path.dirname(os.path.abspath(db_path)), os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
+
+
+def main() -> None:
+    """Builds a symbols database from a dump and optionally swaps it in."""
+    parser = argparse.ArgumentParser(description="Build, optimize and install the symbols database.")
+    parser.add_argument("source", help="Symbol dump: .csv, .json, .jsonl or a SQLite database with a tv table")
+    parser.add_argument("--db", default=symbols_db_pool.db_path, help="Live symbols database to replace")
+    parser.add_argument("--no-install", action="store_true", help="Build next to the live database without swapping it in")
+    args = parser.parse_args()
+
+    target = f"{args.db}.{int(time.time())}.building"
+    try:
+        stats = build_symbols_db(args.source, target)
+    except Exception:
+        if os.path.exists(target):
+            os.remove(target)
+        raise
+
+    print(f"Built {target}: {stats['kept']} of {stats['read']} symbols, {stats['bytes']} bytes")
+
+    if args.no_install:
+        return
+
+    install_symbols_db(target, args.db)
+    print(f"Installed {args.db}")
+
+
+if __name__ == "__main__":
+    main()
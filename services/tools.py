@@ -324,33 +324,42 @@ def wiki_search(query: str, sentences: int = 3) -> str:
         return f"Error searching Wikipedia: {str(e)}"
 
 
+def get_market_status() -> Dict[str, Dict[str, Any]]:
+    """Return the open/closed state and local time of major stock markets.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Per market, whether it is open and its local time.
+    """
+    ny_time = datetime.now(pytz.timezone("America/New_York"))
+    london_time = datetime.now(pytz.timezone("Europe/London"))
+    tokyo_time = datetime.now(pytz.timezone("Asia/Tokyo"))
+
+    return {
+        "NYSE/NASDAQ": {
+            "open": ny_time.hour >= 9
+            and ny_time.hour < 16
+            and ny_time.weekday() < 5,
+            "time": ny_time.strftime("%H:%M"),
+        },
+        "London LSE": {
+            "open": london_time.hour >= 8
+            and london_time.hour < 16
+            and london_time.weekday() < 5,
+            "time": london_time.strftime("%H:%M"),
+        },
+        "Tokyo TSE": {
+            "open": tokyo_time.hour >= 9
+            and tokyo_time.hour < 15
+            and tokyo_time.weekday() < 5,
+            "time": tokyo_time.strftime("%H:%M"),
+        },
+    }
+
+
 def check_market_hours() -> str:
     """Check if major stock markets are currently open."""
     try:
-        ny_time = datetime.now(pytz.timezone("America/New_York"))
-        london_time = datetime.now(pytz.timezone("Europe/London"))
-        tokyo_time = datetime.now(pytz.timezone("Asia/Tokyo"))
-
-        markets = {
-            "NYSE/NASDAQ": {
-                "open": ny_time.hour >= 9
-                and ny_time.hour < 16
-                and ny_time.weekday() < 5,
-                "time": ny_time.strftime("%H:%M"),
-            },
-            "London LSE": {
-                "open": london_time.hour >= 8
-                and london_time.hour < 16
-                and london_time.weekday() < 5,
-                "time": london_time.strftime("%H:%M"),
-            },
-            "Tokyo TSE": {
-                "open": tokyo_time.hour >= 9
-                and tokyo_time.hour < 15
-                and tokyo_time.weekday() < 5,
-                "time": tokyo_time.strftime("%H:%M"),
-            },
-        }
+        markets = get_market_status()
 
         result = "Market Hours Status:\n"
         for market, data in markets.items():
@@ -366,11 +375,13 @@ def check_market_hours_v2(dummy) -> str:
     return check_market_hours()
 
 
-def format_stock_data(stock_data: Dict[str, Any]) -> str:
+def format_stock_data(stock_data: Dict[str, Any], timeframes: Dict[str, Dict[str, Any]] = None) -> str:
     """Formats stock data into a detailed string for the AI prompt.
 
     Args:
         stock_data (Dict[str, Any]): A dictionary containing stock data.
+        timeframes (Dict[str, Dict[str, Any]], optional): Stock data for additional
+            intervals, keyed by interval, summarized after the main analysis.
 
     Returns:
         str: A formatted string containing stock data.
@@ -381,6 +392,22 @@ def format_stock_data(stock_data: Dict[str, Any]) -> str:
     technical_analysis = stock_data["technical_analysis"]
     indicators = stock_data["indicators"]
 
+    def fmt(name: str, prefix: str = "") -> str:
+        value = indicators.get(name)
+        return "N/A" if value is None else f"{prefix}{value:.2f}"
+
+    timeframe_summary = ""
+    if timeframes:
+        timeframe_summary = "\n\nMulti-Timeframe Summary:"
+        for interval, data in timeframes.items():
+            summary = data["technical_analysis"]["summary"]
+            rsi = data["indicators"].get("rsi")
+            timeframe_summary += (
+                f"\n- {interval}: {summary.get('RECOMMENDATION', 'N/A')} "
+                f"(Buy {summary.get('BUY', 0)} / Neutral {summary.get('NEUTRAL', 0)} / Sell {summary.get('SELL', 0)})"
+                f"{f', RSI {rsi:.2f}' if rsi is not None else ''}"
+            )
+
     return f"""
 Stock: {stock_data['symbol']} ({stock_data['name']})
 Price: ${stock_data['price']:.2f} ({stock_data['change']*100:+.2f}%)
@@ -392,14 +419,14 @@ Technical Analysis:
 - Oscillators: {technical_analysis['oscillators'].get('RECOMMENDATION', 'N/A')}
 
 Key Indicators:
-- RSI (14): {indicators['rsi']:.2f} (Oversold < 30, Overbought > 70)
-- MACD: {indicators['macd']:.2f}
-- Stochastic K/D: {indicators['stoch_k']:.2f}/{indicators['stoch_d']:.2f}
-- Bollinger Bands: Upper ${indicators['bb_upper']:.2f}, Lower ${indicators['bb_lower']:.2f}
+- RSI (14): {fmt('rsi')} (Oversold < 30, Overbought > 70)
+- MACD: {fmt('macd')}
+- Stochastic K/D: {fmt('stoch_k')}/{fmt('stoch_d')}
+- Bollinger Bands: Upper {fmt('bb_upper', '$')}, Lower {fmt('bb_lower', '$')}
 
 Buy Signals: {technical_analysis['summary'].get('BUY', 0)}
 Neutral Signals: {technical_analysis['summary'].get('NEUTRAL', 0)}
-Sell Signals: {technical_analysis['summary'].get('SELL', 0)}"""
+Sell Signals: {technical_analysis['summary'].get('SELL', 0)}{timeframe_summary}"""
 
 def get_system_prompt(language: str = 'en', image_attached: bool = False) -> str:
     """Generates a simplified system prompt for StockAssist AI.
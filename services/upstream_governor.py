@@ -0,0 +1,248 @@
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+UPSTREAM_LIMITS: Dict[str, Tuple[float, int]] = {
+    "scanner.tradingview.com": (5.0, 20),
+    "news-headlines.tradingview.com": (1.0, 5),
+}
+DEFAULT_UPSTREAM_LIMIT: Tuple[float, int] = (1.0, 5)
+
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return allowed
+"""
+
+
+class UpstreamUnavailable(Exception):
+    """Raised when an upstream call is refused by its governor."""
+
+
+class UpstreamGovernor:
+    """Shares a request budget and a circuit breaker for one upstream host across workers.
+
+    Calls take a token from a Redis-backed token bucket, waiting briefly if the
+    bucket is empty. A burst of failures opens the breaker, after which calls
+    fail fast with UpstreamUnavailable until the cool-down has passed. The
+    first failure after a cool-down reopens it immediately.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        rate: float,
+        burst: int,
+        failure_threshold: int = 5,
+        failure_window: int = 30,
+        open_seconds: int = 60,
+    ):
+        """Initializes the governor.
+
+        Args:
+            host (str): The upstream host being governed.
+            rate (float): Requests per second allowed across all workers.
+            burst (int): Maximum number of requests allowed in a burst.
+            failure_threshold (int): Failures within the window that open the breaker.
+            failure_window (int): Seconds over which failures are counted.
+            open_seconds (int): Seconds the breaker stays open.
+        """
+        self.host = host
+        self.rate = rate
+        self.burst = burst
+        self.failure_threshold = failure_threshold
+        self.failure_window = failure_window
+        self.open_seconds = open_seconds
+        self.redis_prefix = f"upstream:{host}:"
+        self._script = None
+        self._script_client = None
+
+    def _take_token(self) -> bool:
+        """Takes one token from the shared bucket.
+
+        Returns:
+            bool: True if a token was available.
+        """
+        from cache import redis_client
+
+        if not redis_client:
+            return True
+
+        try:
+            if self._script is None or self._script_client is not redis_client:
+                self._script = redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+                self._script_client = redis_client
+            return bool(self._script(keys=[f"{self.redis_prefix}bucket"], args=[self.rate, self.burst, time.time()]))
+        except Exception as e:
+            print(f"Upstream rate limiter error: {str(e)}")
+            return True
+
+    def is_open(self) -> bool:
+        """Checks whether the circuit breaker is open.
+
+        Returns:
+            bool: True if calls to the host should currently fail fast.
+        """
+        from cache import redis_client
+
+        if not redis_client:
+            return False
+
+        try:
+            return bool(redis_client.exists(f"{self.redis_prefix}open"))
+        except Exception as e:
+            print(f"Upstream breaker error: {str(e)}")
+            return False
+
+    def record_success(self) -> None:
+        """Closes a half-open breaker after a successful call."""
+        from cache import redis_client
+
+        if not redis_client:
+            return
+
+        try:
+            redis_client.delete(f"{self.redis_prefix}half_open")
+        except Exception as e:
+            print(f"Upstream breaker error: {str(e)}")
+
+    def record_failure(self) -> None:
+        """Counts a failed call and opens the breaker on a burst of failures."""
+        from cache import redis_client
+
+        if not redis_client:
+            return
+
+        try:
+            failures_key = f"{self.redis_prefix}failures"
+            failures = redis_client.incr(failures_key)
+            if failures == 1:
+                redis_client.expire(failures_key, self.failure_window)
+
+            if failures >= self.failure_threshold or redis_client.exists(f"{self.redis_prefix}half_open"):
+                redis_client.setex(f"{self.redis_prefix}open", self.open_seconds, "1")
+                redis_client.setex(f"{self.redis_prefix}half_open", self.open_seconds * 10, "1")
+                redis_client.delete(failures_key)
+                redis_client.hincrby(f"{self.redis_prefix}stats", "breaker_opened", 1)
+                print(f"Circuit breaker opened for {self.host}")
+        except Exception as e:
+            print(f"Upstream breaker error: {str(e)}")
+
+    def call(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        wait: float = 2.0,
+        is_failure: Optional[Callable[[Exception], bool]] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Runs an upstream call under the host's rate limit and circuit breaker.
+
+        Args:
+            fn (Callable[..., Any]): The function performing the upstream call.
+            *args (Any): Positional arguments passed to fn.
+            wait (float): Seconds to wait for a token before giving up.
+            is_failure (Optional[Callable[[Exception], bool]]): Decides whether an
+                exception raised by fn counts as an upstream failure. All
+                exceptions count by default.
+            **kwargs (Any): Keyword arguments passed to fn.
+
+        Returns:
+            Any: The result of fn.
+
+        Raises:
+            UpstreamUnavailable: If the breaker is open or no token became available in time.
+        """
+        from cache import redis_client
+
+        if self.is_open():
+            if redis_client:
+                redis_client.hincrby(f"{self.redis_prefix}stats", "rejected_open", 1)
+            raise UpstreamUnavailable(f"Circuit breaker open for {self.host}")
+
+        deadline = time.time() + wait
+        while not self._take_token():
+            if time.time() >= deadline:
+                if redis_client:
+                    redis_client.hincrby(f"{self.redis_prefix}stats", "rejected_rate", 1)
+                raise UpstreamUnavailable(f"Rate limit exceeded for {self.host}")
+            time.sleep(1.0 / self.rate if self.rate else 0.1)
+
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if is_failure is None or is_failure(e):
+                self.record_failure()
+            raise
+
+        self.record_success()
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Reports the breaker state and how many calls were refused.
+
+        Returns:
+            Dict[str, Any]: Breaker state and rejection counters.
+        """
+        from cache import redis_client
+
+        stats: Dict[str, Any] = {"open": self.is_open()}
+        if redis_client:
+            try:
+                stats.update(
+                    {
+                        field.decode(): int(value)
+                        for field, value in redis_client.hgetall(f"{self.redis_prefix}stats").items()
+                    }
+                )
+            except Exception as e:
+                print(f"Upstream stats error: {str(e)}")
+        return stats
+
+
+_governors: Dict[str, UpstreamGovernor] = {}
+
+
+def get_governor(host: str) -> UpstreamGovernor:
+    """Returns the shared governor for an upstream host.
+
+    Args:
+        host (str): The upstream host.
+
+    Returns:
+        UpstreamGovernor: The governor for that host.
+    """
+    governor = _governors.get(host)
+    if governor is None:
+        rate, burst = UPSTREAM_LIMITS.get(host, DEFAULT_UPSTREAM_LIMIT)
+        governor = _governors.setdefault(host, UpstreamGovernor(host, rate, burst))
+    return governor
+
+
+def is_tradingview_failure(error: Exception) -> bool:
+    """Decides whether a tradingview_ta error means the scanner is struggling.
+
+    Unknown symbols are reported with a "not found" error, which says nothing
+    about the health of the scanner.
+
+    Args:
+        error (Exception): The exception raised by tradingview_ta.
+
+    Returns:
+        bool: True if the error should count towards opening the breaker.
+    """
+    return "not found" not in str(error).lower()
+
+
+scanner_governor = get_governor("scanner.tradingview.com")
@@ -12,8 +12,8 @@ async function loadWatchlist() {
      * Loads the watchlist from the server and displays it.
      */
     try {
-        const response = await fetch("/api/watchlist");
-        const watchlist = await response.json();
+        const response = await fetch("/api/watchlist/dashboard");
+        const watchlist = (await response.json()).items;
 
         const watchlistDiv = document.getElementById("watchlist");
         if (watchlistDiv) {
@@ -37,6 +37,13 @@ async function loadWatchlist() {
                                                     item.added_at
                                                 ).toLocaleDateString()}</div>
                                         </div>
+                                        ${typeof item.price === "number" ? `
+                                        <div class="text-right">
+                                                <div class="font-medium text-white">$${item.price.toFixed(2)}</div>
+                                                <div class="text-sm ${item.change >= 0 ? "text-accent" : "text-red-500"}">${
+                                                    item.change >= 0 ? "+" : ""
+                                                }${(item.change * 100).toFixed(2)}%</div>
+                                        </div>` : ""}
                                         <div class="flex items-center gap-3">
                                                 <button onclick="searchStock('${
                                                     item.symbol
@@ -261,6 +268,7 @@ async function searchStock(manualSymbol) {
         }
         
         updateChartForStock(chartSymbol);
+        subscribeQuote(data.symbol);
         
     } catch (error) {
         console.error("Error:", error);
@@ -271,6 +279,60 @@ async function searchStock(manualSymbol) {
     }
 }
 
+let quoteSocket = null;
+let quoteSymbol = null;
+
+function subscribeQuote(symbol) {
+    /**
+     * Subscribes to live quote updates for the displayed symbol, replacing any previous subscription.
+     * @param {string} symbol The stock symbol to stream.
+     */
+    if (typeof io === "undefined") return;
+
+    if (!quoteSocket) {
+        quoteSocket = io({ transports: ["websocket", "polling"], reconnection: true });
+        quoteSocket.on("quote", updateLiveQuote);
+        quoteSocket.on("connect", () => {
+            if (quoteSymbol) quoteSocket.emit("subscribe_quote", { symbol: quoteSymbol });
+        });
+    }
+
+    if (quoteSymbol && quoteSymbol !== symbol) {
+        quoteSocket.emit("unsubscribe_quote", { symbol: quoteSymbol });
+    }
+    quoteSymbol = symbol;
+    if (quoteSocket.connected) {
+        quoteSocket.emit("subscribe_quote", { symbol });
+    }
+}
+
+function updateLiveQuote(quote) {
+    /**
+     * Updates the displayed price, change and volume from a streamed quote.
+     * @param {Object} quote The quote pushed by the server.
+     */
+    if (!quote || quote.symbol !== quoteSymbol) return;
+
+    const price = document.getElementById("stockPrice");
+    const change = document.getElementById("stockChange");
+    const volume = document.getElementById("volume");
+
+    if (price && typeof quote.price === "number") {
+        price.textContent = `$${quote.price.toFixed(2)}`;
+    }
+    if (change && typeof quote.change === "number") {
+        const span = change.querySelector("span");
+        if (span) {
+            const isPositive = quote.change >= 0;
+            span.className = isPositive ? "text-accent" : "text-red-500";
+            span.textContent = `${isPositive ? "+" : ""}${(quote.change * 100).toFixed(2)}%`;
+        }
+    }
+    if (volume && typeof quote.volume === "number") {
+        volume.textContent = formatNumber(quote.volume);
+    }
+}
+
 function showError(message) {
     /**
      * Displays an error message on the screen.
@@ -839,6 +901,13 @@ function selectSuggestion(symbol) {
     const searchInput = document.getElementById("stockSearch");
     if (searchInput) {
         const plainSymbol = symbol.includes(':') ? symbol.split(':')[1] : symbol;
+        fetch("/api/stock/suggest/select", {
+            method: "POST",
+            headers: {
+                "Content-Type": "application/json",
+            },
+            body: JSON.stringify({ symbol }),
+        }).catch(() => {});
         searchInput.value = plainSymbol;
         searchStock();
         hideSuggestions();
@@ -869,6 +938,51 @@ window.selectSuggestion = selectSuggestion;
 window.toggleWatchlist = toggleWatchlist;
 window.loadWatchlist = loadWatchlist;
 
+async function loadRecommendationQuotes() {
+    /**
+     * Loads prices for all recommendation cards with a single batch request.
+     */
+    const quoteElements = document.querySelectorAll(".recommendation-quote[data-symbol]");
+    const symbols = [...new Set(
+        [...quoteElements].map((el) => el.dataset.symbol).filter((symbol) => symbol && symbol !== "--")
+    )];
+
+    if (symbols.length === 0) {
+        return;
+    }
+
+    try {
+        const response = await fetch("/api/stocks/batch", {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ symbols }),
+        });
+
+        if (!response.ok) {
+            return;
+        }
+
+        const data = await response.json();
+
+        quoteElements.forEach((el) => {
+            const quote = data.results[el.dataset.symbol.toUpperCase()];
+            if (!quote) {
+                return;
+            }
+
+            const isPositive = quote.change >= 0;
+            el.innerHTML = `
+                <span class="text-white">$${Number(quote.price).toFixed(2)}</span>
+                <span class="${isPositive ? "text-accent" : "text-red-500"} ml-2">
+                    ${isPositive ? "+" : ""}${(quote.change * 100).toFixed(2)}%
+                </span>
+            `;
+        });
+    } catch (error) {
+        console.error("Error loading recommendation quotes:", error);
+    }
+}
+
 document.addEventListener("DOMContentLoaded", () => {
     const stockResult = document.getElementById("stockResult");
     const searchInput = document.getElementById("stockSearch");
@@ -938,6 +1052,8 @@ document.addEventListener("DOMContentLoaded", () => {
     if (userAuthenticated) {
         loadWatchlist();
     }
+
+    loadRecommendationQuotes();
 });
 
 document.addEventListener("click", (event) => {
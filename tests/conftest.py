@@ -0,0 +1,289 @@
+import eventlet
+
+# The app runs under gunicorn's eventlet worker, which monkey patches before
+# anything is imported.
+eventlet.monkey_patch()
+
+import fnmatch
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# config opens the symbols databases relative to the working directory on
+# import, so the tests run from a scratch directory.
+WORKDIR = tempfile.mkdtemp(prefix="stockassist-tests-")
+os.makedirs(os.path.join(WORKDIR, "symbols_db"))
+os.chdir(WORKDIR)
+
+
+class FakeRedis:
+    """The subset of the redis-py client the cache uses, kept in a dict."""
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.commands = []
+        self.pipelined = 0
+        self.executes = 0
+
+    @property
+    def round_trips(self):
+        """Commands sent on their own plus pipeline executions."""
+        return len(self.commands) - self.pipelined + self.executes
+
+    def _alive(self, key):
+        if key in self.expires and self.expires[key] <= time.time():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def get(self, key):
+        self.commands.append(("get", key))
+        return self.data[key] if self._alive(key) else None
+
+    def mget(self, keys):
+        self.commands.append(("mget", tuple(keys)))
+        return [self.data[key] if self._alive(key) else None for key in keys]
+
+    def set(self, key, value, nx=False, xx=False, ex=None, keepttl=False):
+        self.commands.append(("set", key))
+        if (nx and self._alive(key)) or (xx and not self._alive(key)):
+            return None
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+        if ex:
+            self.expires[key] = time.time() + ex
+        elif not keepttl:
+            self.expires.pop(key, None)
+        return True
+
+    def setex(self, key, timeout, value):
+        return self.set(key, value, ex=timeout)
+
+    def incr(self, key):
+        return self.incrby(key, 1)
+
+    def _hash(self, key):
+        if not self._alive(key):
+            self.data[key] = {}
+        return self.data[key]
+
+    def hincrby(self, key, field, amount=1):
+        self.commands.append(("hincrby", key))
+        value = self._hash(key)
+        value[field] = int(value.get(field, 0)) + amount
+        return value[field]
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        self.commands.append(("hset", key))
+        fields = dict(mapping or {})
+        if field is not None:
+            fields[field] = value
+        self._hash(key).update(fields)
+        return len(fields)
+
+    def hexists(self, key, field):
+        self.commands.append(("hexists", key))
+        return self._alive(key) and field in self.data[key]
+
+    def hmget(self, key, fields):
+        self.commands.append(("hmget", key))
+        value = self.data.get(key, {}) if self._alive(key) else {}
+        return [None if value.get(field) is None else str(value[field]).encode() for field in fields]
+
+    def hgetall(self, key):
+        self.commands.append(("hgetall", key))
+        value = self.data[key] if self._alive(key) else {}
+        return {str(field).encode(): str(item).encode() for field, item in value.items()}
+
+    def incrby(self, key, amount):
+        self.commands.append(("incrby", key))
+        value = int(self.data[key]) + amount if self._alive(key) else amount
+        self.data[key] = str(value).encode()
+        return value
+
+    def decrby(self, key, amount):
+        return self.incrby(key, -amount)
+
+    def exists(self, *keys):
+        self.commands.append(("exists", keys))
+        return sum(self._alive(key) for key in keys)
+
+    def expire(self, key, seconds):
+        if self._alive(key):
+            self.expires[key] = time.time() + seconds
+        return True
+
+    def ttl(self, key):
+        if not self._alive(key):
+            return -2
+        return int(self.expires[key] - time.time()) if key in self.expires else -1
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def scan_iter(self, match="*", count=None):
+        return [key for key in list(self.data) if self._alive(key) and fnmatch.fnmatchcase(key, match)]
+
+    def publish(self, channel, message):
+        return 0
+
+    def _zset(self, key):
+        if not self._alive(key):
+            self.data[key] = {}
+        return self.data[key]
+
+    def zadd(self, key, mapping):
+        self.commands.append(("zadd", key))
+        zset = self._zset(key)
+        added = sum(member not in zset for member in mapping)
+        zset.update(mapping)
+        return added
+
+    def zrem(self, key, *members):
+        self.commands.append(("zrem", key))
+        zset = self.data.get(key, {}) if self._alive(key) else {}
+        return sum(zset.pop(member, None) is not None for member in members)
+
+    def zremrangebyscore(self, key, min, max):
+        self.commands.append(("zremrangebyscore", key))
+        zset = self.data.get(key, {}) if self._alive(key) else {}
+        removed = [member for member, score in zset.items() if min <= score <= max]
+        for member in removed:
+            del zset[member]
+        return len(removed)
+
+    def zcard(self, key):
+        self.commands.append(("zcard", key))
+        return len(self.data.get(key, {})) if self._alive(key) else 0
+
+    def zincrby(self, key, amount, member):
+        self.commands.append(("zincrby", key))
+        zset = self._zset(key)
+        zset[member] = zset.get(member, 0.0) + amount
+        return zset[member]
+
+    def zmscore(self, key, members):
+        self.commands.append(("zmscore", key))
+        zset = self.data.get(key, {}) if self._alive(key) else {}
+        return [zset.get(member) for member in members]
+
+    def zrevrange(self, key, start, end, withscores=False):
+        self.commands.append(("zrevrange", key))
+        zset = self.data.get(key, {}) if self._alive(key) else {}
+        ordered = sorted(zset.items(), key=lambda item: -item[1])
+        ordered = ordered[start:None if end == -1 else end + 1]
+        if withscores:
+            return [(member.encode(), score) for member, score in ordered]
+        return [member.encode() for member, _ in ordered]
+
+    def zremrangebyrank(self, key, start, end):
+        zset = self.data.get(key, {}) if self._alive(key) else {}
+        ordered = sorted(zset, key=zset.get)
+        removed = ordered[start:None if end == -1 else end + 1]
+        for member in removed:
+            del zset[member]
+        return len(removed)
+
+    def zunionstore(self, destination, keys):
+        weights = keys if isinstance(keys, dict) else dict.fromkeys(keys, 1)
+        union = {}
+        for key, weight in weights.items():
+            for member, score in (self.data.get(key, {}) if self._alive(key) else {}).items():
+                union[member] = union.get(member, 0.0) + score * weight
+        self.data[destination] = union
+        self.expires.pop(destination, None)
+        return len(union)
+
+    def rename(self, source, destination):
+        self.data[destination] = self.data.pop(source)
+        self.expires.pop(destination, None)
+        return True
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Queues FakeRedis calls until execute."""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((getattr(self.client, name), args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        before = len(self.client.commands)
+        results = [method(*args, **kwargs) for method, args, kwargs in self.calls]
+        self.client.pipelined += len(self.client.commands) - before
+        self.client.executes += 1
+        self.calls = []
+        return results
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Points the cache module at an empty FakeRedis with a clean local cache."""
+    import cache
+
+    client = FakeRedis()
+    monkeypatch.setattr(cache, "redis_client", client)
+    cache.local_cache.clear()
+    yield client
+    cache.local_cache.clear()
+
+
+SCANNER_LATENCY = 0.02
+
+
+@pytest.fixture
+def stub_scanner(fake_redis, monkeypatch):
+    """Replaces TradingView with a scanner that answers every request after SCANNER_LATENCY.
+
+    Returns a dict counting scanner requests and listing the requested
+    symbols. Every symbol is routed to NASDAQ.
+    """
+    import routes
+
+    calls = {"requests": 0, "symbols": []}
+
+    class Handler:
+        def __init__(self, symbol, screener, exchange, interval, timeout=None):
+            self.symbol = symbol
+
+        def get_analysis(self):
+            calls["requests"] += 1
+            calls["symbols"].append(self.symbol)
+            time.sleep(SCANNER_LATENCY)
+            return object()
+
+    def get_multiple_analysis(screener, interval, symbols, timeout=None):
+        calls["requests"] += 1
+        calls["symbols"].extend(symbol.partition(":")[2] for symbol in symbols)
+        time.sleep(SCANNER_LATENCY)
+        return {symbol.upper(): object() for symbol in symbols}
+
+    monkeypatch.setattr(routes, "TA_Handler", Handler)
+    monkeypatch.setattr(routes, "get_multiple_analysis", get_multiple_analysis)
+    monkeypatch.setattr(routes, "lookup_symbol_route", lambda symbol: ("america", "NASDAQ", symbol, symbol))
+    monkeypatch.setattr(
+        routes,
+        "build_analysis_response",
+        lambda symbol, display_symbol, exchange, screener, name, analysis: {"symbol": symbol, "exchange": exchange},
+    )
+    monkeypatch.setattr(routes.scanner_governor, "call", lambda fn, *args, wait=2.0, is_failure=None, **kwargs: fn(*args, **kwargs))
+    monkeypatch.setattr(routes.analysis_flight, "do", lambda key, fn, *args: fn(*args))
+    monkeypatch.setattr(routes.negative_cache, "get", lambda symbol: None)
+    monkeypatch.setattr(routes.negative_cache, "clear", lambda symbol: None)
+    monkeypatch.setattr(routes.snapshot_store, "record", lambda *args: None)
+    return calls
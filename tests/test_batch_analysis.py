@@ -0,0 +1,82 @@
+import time
+import types
+
+import eventlet
+import pytest
+
+import routes
+from services.negative_cache import NegativeCache
+from services.singleflight import SingleFlight
+
+SYMBOLS = [f"SYM{i}" for i in range(10)]
+
+
+def test_batch_returns_every_symbol(stub_scanner):
+    results = routes.get_stock_analyses(SYMBOLS)
+    assert set(results) == set(SYMBOLS)
+    assert results["SYM3"] == {"symbol": "SYM3", "exchange": "NASDAQ"}
+    assert stub_scanner["requests"] == 1
+
+
+def test_batch_serves_cached_symbols_without_requests(stub_scanner):
+    routes.get_stock_analyses(SYMBOLS)
+    routes.get_stock_analyses(SYMBOLS)
+    assert stub_scanner["requests"] == 1
+
+
+def test_batch_forgets_earlier_misses(stub_scanner, fake_redis, monkeypatch):
+    monkeypatch.setattr(routes.negative_cache, "clear", types.MethodType(NegativeCache.clear, routes.negative_cache))
+    fake_redis.set("negative_symbol:misses:AAPL", 5)
+
+    routes.get_stock_analyses(["AAPL"])
+
+    assert fake_redis.get("negative_symbol:misses:AAPL") is None
+
+
+def test_concurrent_batches_fetch_each_symbol_once(stub_scanner):
+    first = eventlet.spawn(routes.get_stock_analyses, ["AAPL", "MSFT", "NVDA"])
+    second = eventlet.spawn(routes.get_stock_analyses, ["MSFT", "NVDA", "TSLA"])
+
+    assert first.wait()["MSFT"] == second.wait()["MSFT"] == {"symbol": "MSFT", "exchange": "NASDAQ"}
+    assert sorted(stub_scanner["symbols"]) == ["AAPL", "MSFT", "NVDA", "TSLA"]
+
+
+def test_batches_wait_for_symbols_other_workers_fetch(stub_scanner):
+    other_worker = SingleFlight("stock_analysis")
+    key = f"MSFT:{routes.Interval.INTERVAL_1_DAY}"
+
+    def fetch(keys):
+        eventlet.sleep(0.05)
+        return {key: {"symbol": "MSFT", "exchange": "OTHER"}}
+
+    leader = eventlet.spawn(other_worker.do_many, [key], fetch)
+    eventlet.sleep(0)
+    results = routes.get_stock_analyses(["AAPL", "MSFT"])
+
+    assert results["MSFT"] == {"symbol": "MSFT", "exchange": "OTHER"}
+    assert stub_scanner["symbols"] == ["AAPL"]
+    leader.wait()
+
+
+@pytest.mark.parametrize("count", [5, 20])
+def test_serial_vs_batch_benchmark(stub_scanner, fake_redis, count):
+    symbols = [f"BENCH{i}" for i in range(count)]
+
+    started = time.perf_counter()
+    serial = {symbol: routes.get_stock_analysis(symbol) for symbol in symbols}
+    serial_time = time.perf_counter() - started
+    serial_requests = stub_scanner["requests"]
+
+    fake_redis.data.clear()
+    stub_scanner["requests"] = 0
+    started = time.perf_counter()
+    batch = routes.get_stock_analyses(symbols)
+    batch_time = time.perf_counter() - started
+
+    print(
+        f"{count} symbols: serial {serial_requests} requests in {serial_time * 1000:.0f} ms, "
+        f"batch {stub_scanner['requests']} request in {batch_time * 1000:.0f} ms"
+    )
+    assert batch == serial
+    assert serial_requests == count
+    assert stub_scanner["requests"] == 1
@@ -0,0 +1,31 @@
+from cache import bump_generation, cache_db_query, generation_key, get_cached_query
+
+
+def test_bump_refreshes_the_entity_listing(fake_redis):
+    key = generation_key("user_chats", 1, "page", 1)
+    cache_db_query(key, [{"id": 10}])
+    assert get_cached_query(generation_key("user_chats", 1, "page", 1)) == [{"id": 10}]
+
+    assert bump_generation("user_chats", 1) == 1
+
+    fresh_key = generation_key("user_chats", 1, "page", 1)
+    assert fresh_key != key
+    assert get_cached_query(fresh_key) is None
+    cache_db_query(fresh_key, [])
+    assert get_cached_query(generation_key("user_chats", 1, "page", 1)) == []
+
+
+def test_bump_leaves_other_entities_cached(fake_redis):
+    other = generation_key("user_chats", 2, "page", 1)
+    cache_db_query(other, [{"id": 20}])
+
+    bump_generation("user_chats", 1)
+
+    assert generation_key("user_chats", 2, "page", 1) == other
+    assert get_cached_query(other) == [{"id": 20}]
+
+
+def test_generation_counter_expires(fake_redis):
+    bump_generation("chat_messages", 5)
+    counter = next(key for key in fake_redis.data if "chat_messages" in key)
+    assert fake_redis.ttl(counter) > 0
@@ -0,0 +1,84 @@
+import gzip
+
+import pytest
+from flask import Flask, jsonify
+
+from cache import COMPRESS_MIN_SIZE, cached
+
+
+@pytest.fixture
+def client(fake_redis):
+    """A client for views cached with @cached, counting how often each one runs."""
+    app = Flask(__name__)
+    app.calls = {"small": 0, "large": 0, "failing": 0}
+
+    @app.route("/small")
+    @cached(timeout=300)
+    def small():
+        app.calls["small"] += 1
+        return jsonify({"symbol": "AAPL"})
+
+    @app.route("/large")
+    @cached(timeout=300)
+    def large():
+        app.calls["large"] += 1
+        return jsonify({"symbols": ["AAPL"] * COMPRESS_MIN_SIZE})
+
+    @app.route("/failing")
+    @cached(timeout=300)
+    def failing():
+        app.calls["failing"] += 1
+        return jsonify({"error": "upstream down"}), 503
+
+    client = app.test_client()
+    client.calls = app.calls
+    return client
+
+
+def test_matching_etag_gets_an_empty_304(client):
+    first = client.get("/small")
+    etag = first.headers["ETag"]
+
+    revalidated = client.get("/small", headers={"If-None-Match": etag})
+
+    assert revalidated.status_code == 304
+    assert revalidated.data == b""
+    assert revalidated.headers["ETag"] == etag
+    assert client.calls["small"] == 1
+
+
+def test_stale_etag_gets_the_body(client):
+    first = client.get("/small")
+
+    response = client.get("/small", headers={"If-None-Match": 'W/"outdated"'})
+
+    assert response.status_code == 200
+    assert response.get_json() == {"symbol": "AAPL"}
+    assert response.data == first.data
+
+
+def test_gzip_is_served_only_when_accepted(client):
+    plain = client.get("/large", headers={"Accept-Encoding": "identity"})
+    compressed = client.get("/large", headers={"Accept-Encoding": "gzip, deflate"})
+    refused = client.get("/large", headers={"Accept-Encoding": "gzip;q=0"})
+
+    assert "Content-Encoding" not in plain.headers
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(compressed.data) == plain.data
+    assert "Content-Encoding" not in refused.headers
+    assert refused.data == plain.data
+    assert "Accept-Encoding" in compressed.headers["Vary"]
+    assert client.calls["large"] == 1
+
+
+def test_small_bodies_are_not_gzipped(client):
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+
+
+def test_server_errors_are_not_stored(client, fake_redis):
+    assert client.get("/failing").status_code == 503
+    assert client.get("/failing").status_code == 503
+
+    assert client.calls["failing"] == 2
+    assert not [key for key in fake_redis.data if key.startswith("response:")]
@@ -0,0 +1,27 @@
+import pytest
+
+import routes
+from routes import CHAT_TIMEFRAME_PATTERN, CHAT_TIMEFRAMES, Interval
+
+
+@pytest.mark.parametrize(
+    "message", ["How does AAPL look on the 4h chart?", "Weekly outlook for BTC", "Is TSLA a swing trade?", "Compare timeframes"]
+)
+def test_timeframe_questions_fetch_timeframes(message):
+    assert CHAT_TIMEFRAME_PATTERN.search(message)
+
+
+@pytest.mark.parametrize("message", ["Should I buy AAPL?", "What is the RSI of MSFT", "Tell me about H100 demand"])
+def test_other_questions_do_not(message):
+    assert not CHAT_TIMEFRAME_PATTERN.search(message)
+
+
+def test_cached_timeframes_cost_no_scanner_requests(stub_scanner):
+    routes.get_stock_analyses(["AAPL"], Interval.INTERVAL_4_HOURS)
+    stub_scanner["requests"] = 0
+
+    cached = routes.get_cached_stock_analyses(["AAPL", "MSFT"], CHAT_TIMEFRAMES)
+
+    assert cached[Interval.INTERVAL_4_HOURS] == {"AAPL": {"symbol": "AAPL", "exchange": "NASDAQ"}}
+    assert cached[Interval.INTERVAL_1_HOUR] == {}
+    assert stub_scanner["requests"] == 0
@@ -0,0 +1,72 @@
+import time
+
+import eventlet
+import pytest
+
+from services import exchange_prober
+from services.exchange_prober import probe_symbol
+
+DELAYS = {"NASDAQ": 0.3, "NYSE": 0.05, "AMEX": 0.5}
+
+
+@pytest.fixture
+def fake_scanner(monkeypatch):
+    """A scanner where each exchange answers after its own delay and only `listed` exchanges know the symbol.
+
+    The delay is a green sleep, as the HTTP request of a real probe is under
+    the monkey patching routes applies.
+    """
+    state = {"listed": {"NYSE"}, "active": 0, "peak": 0, "started": []}
+
+    class Handler:
+        def __init__(self, symbol, screener, exchange, interval, timeout=None):
+            self.exchange = exchange
+
+        def get_analysis(self):
+            state["started"].append(self.exchange)
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            try:
+                eventlet.sleep(DELAYS.get(self.exchange, 0.01))
+                if self.exchange not in state["listed"]:
+                    raise Exception("Exchange or symbol not found.")
+                return f"analysis from {self.exchange}"
+            finally:
+                state["active"] -= 1
+
+    monkeypatch.setattr(exchange_prober, "TA_Handler", Handler)
+    monkeypatch.setattr(exchange_prober.scanner_governor, "is_open", lambda: False)
+    monkeypatch.setattr(exchange_prober.scanner_governor, "call", lambda fn, *args, is_failure=None, **kwargs: fn())
+    monkeypatch.setattr(exchange_prober, "probe_candidates", lambda symbol: [("america", exchange, symbol) for exchange in DELAYS])
+    return state
+
+
+def test_first_success_wins_without_waiting_for_slower_exchanges(fake_scanner):
+    started = time.perf_counter()
+    result = probe_symbol("ACME")
+    elapsed = time.perf_counter() - started
+
+    assert result == ("america", "NYSE", "ACME", "analysis from NYSE")
+    assert elapsed < DELAYS["NASDAQ"]
+    print(f"Probed {len(DELAYS)} exchanges in {elapsed * 1000:.0f} ms, serial worst case {sum(DELAYS.values()) * 1000:.0f} ms")
+
+
+def test_unlisted_symbol_costs_the_slowest_exchange_not_the_sum(fake_scanner):
+    fake_scanner["listed"] = set()
+    started = time.perf_counter()
+    assert probe_symbol("NOPE") is None
+    elapsed = time.perf_counter() - started
+
+    assert max(DELAYS.values()) <= elapsed < sum(DELAYS.values())
+
+
+def test_probes_per_upstream_are_capped(fake_scanner, monkeypatch):
+    exchanges = [f"EX{i}" for i in range(10)]
+    monkeypatch.setattr(
+        exchange_prober, "probe_candidates", lambda symbol: [("america", exchange, symbol) for exchange in exchanges]
+    )
+    fake_scanner["listed"] = set()
+
+    assert probe_symbol("NOPE") is None
+    assert sorted(fake_scanner["started"]) == sorted(exchanges)
+    assert fake_scanner["peak"] <= exchange_prober.MAX_PROBES_PER_UPSTREAM
@@ -0,0 +1,136 @@
+import random
+import string
+import time
+
+import eventlet
+import numpy as np
+import pytest
+
+from services import fuzzy_matcher as fuzzy_matcher_module
+from services.fuzzy_matcher import FuzzyMatcher, _build_deletes, _delete_keys, _max_distance, edit_distances
+
+SYMBOLS = 50000
+REAL_SYMBOLS = ["AAPL", "MSFT", "AMZN", "GOOGL", "TSLA", "NVDA", "META", "BTCUSDT", "ETHUSDT", "APP", "MSTR"]
+
+
+class FakeSymbolIndex:
+    """Serves a fixed symbol list with a generation, like SymbolIndex."""
+
+    def __init__(self, symbols):
+        self._symbols = dict.fromkeys(symbols)
+        self.generation = 1
+
+    def symbols(self):
+        return self._symbols.keys()
+
+
+@pytest.fixture(scope="module")
+def symbols():
+    rng = random.Random(17)
+    generated = {
+        "".join(rng.choices(string.ascii_uppercase, k=rng.randint(1, 5))) for _ in range(SYMBOLS)
+    } | {
+        "".join(rng.choices(string.ascii_uppercase, k=rng.randint(3, 5))) + "USDT" for _ in range(SYMBOLS // 10)
+    }
+    return sorted(generated | set(REAL_SYMBOLS))
+
+
+@pytest.fixture
+def matcher(symbols, tmp_path, monkeypatch):
+    monkeypatch.setattr(fuzzy_matcher_module, "symbol_index", FakeSymbolIndex(symbols))
+    return FuzzyMatcher(str(tmp_path / "fuzzy.idx"))
+
+
+def test_vectorized_build_matches_the_per_symbol_deletes(symbols):
+    sample = random.Random(3).sample(symbols, 2000) + ["A", "AB", "ABCDEFGHIJ"]
+    keys, owners = _build_deletes(sample)
+
+    expected = sorted(
+        (key, owner)
+        for owner, symbol in enumerate(sample)
+        for key in _delete_keys(symbol, _max_distance(len(symbol)))
+    )
+    assert list(zip(keys.tolist(), owners.tolist())) == expected
+
+
+def _osa_distance(a, b):
+    """Textbook optimal string alignment distance."""
+    d = [[i + j if i * j == 0 else 0 for j in range(len(b) + 1)] for i in range(len(a) + 1)]
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[-1][-1]
+
+
+def test_edit_distances_match_the_textbook_algorithm():
+    rng = random.Random(5)
+    for _ in range(200):
+        query = "".join(rng.choices("ABC", k=rng.randint(1, 6))).encode()
+        candidates = ["".join(rng.choices("ABC", k=rng.randint(1, 8))).encode() for _ in range(20)]
+        width = max(len(candidate) for candidate in candidates)
+        matrix = np.array([list(candidate.ljust(width, b"\0")) for candidate in candidates], dtype=np.uint8)
+        lengths = np.array([len(candidate) for candidate in candidates])
+        assert edit_distances(query, matrix, lengths).tolist() == [_osa_distance(query, c) for c in candidates]
+
+
+@pytest.mark.parametrize("query,expected", [("APPL", "AAPL"), ("MSFTT", "MSFT"), ("aapl", "AAPL"), ("ETHUSTD", "ETHUSDT")])
+def test_corrects_typos(matcher, query, expected):
+    assert matcher.match_symbols(query)[0] == expected
+
+
+def test_ignores_unrelated_queries(matcher):
+    assert all(len(symbol) >= 5 for symbol in matcher.match_symbols("QQQQQQQQQQ"))
+
+
+def test_builds_off_the_hub(matcher):
+    ticks = []
+
+    def tick():
+        while True:
+            ticks.append(time.perf_counter())
+            eventlet.sleep(0.005)
+
+    ticker = eventlet.spawn(tick)
+    eventlet.sleep(0)
+    try:
+        started = time.perf_counter()
+        matcher.match_symbols("APPL")
+        elapsed = time.perf_counter() - started
+    finally:
+        ticker.kill()
+
+    gaps = np.diff(ticks)
+    assert elapsed > 0.05
+    assert gaps.max() < max(0.05, elapsed / 4)
+
+
+def test_workers_share_the_index_file(matcher, symbols, monkeypatch):
+    matcher.match_symbols("APPL")
+
+    other = FuzzyMatcher(matcher.path)
+    monkeypatch.setattr(other, "build", lambda *args: pytest.fail("the index file was rebuilt"))
+    assert other.match_symbols("MSFTT")[0] == "MSFT"
+
+
+def test_rebuilds_when_the_symbols_change(matcher, symbols, monkeypatch):
+    assert "ZZZZZZZ" not in matcher.match_symbols("ZZZZZZY")
+
+    changed = FakeSymbolIndex(symbols + ["ZZZZZZZ"])
+    changed.generation = 2
+    monkeypatch.setattr(fuzzy_matcher_module, "symbol_index", changed)
+    assert matcher.match_symbols("ZZZZZZY")[0] == "ZZZZZZZ"
+
+
+def test_lookup_time(matcher):
+    queries = ["APPL", "MSFTT", "GOGL", "TSLAA", "NVIDA", "BTCUSTD", "METAA", "AMZM", "XQ", "QWERTY"]
+    matcher.match_symbols("APPL")
+
+    rounds = 50
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for query in queries:
+            matcher.match_symbols(query)
+    per_query_ms = (time.perf_counter() - started) / (rounds * len(queries)) * 1000
+    assert per_query_ms < 1.0
@@ -0,0 +1,122 @@
+import time
+
+import numpy as np
+import pytest
+
+from services import indicators
+
+BARS = 250
+
+
+def _series(symbols: int = 1, bars: int = BARS, seed: int = 7):
+    """Random-walk OHLC bars of shape (symbols, bars)."""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, (symbols, bars)), axis=-1)
+    high = close + rng.uniform(0, 2, (symbols, bars))
+    low = close - rng.uniform(0, 2, (symbols, bars))
+    return high, low, close
+
+
+def _reference_ema(values, period):
+    out = [float("nan")] * len(values)
+    start = next(i for i, value in enumerate(values) if not np.isnan(value))
+    if start + period > len(values):
+        return out
+    out[start + period - 1] = sum(values[start:start + period]) / period
+    alpha = 2 / (period + 1)
+    for i in range(start + period, len(values)):
+        out[i] = out[i - 1] + alpha * (values[i] - out[i - 1])
+    return out
+
+
+def _reference_rsi(close, period=14):
+    deltas = [close[i] - close[i - 1] for i in range(1, len(close))]
+    gain = sum(max(d, 0) for d in deltas[:period]) / period
+    loss = sum(max(-d, 0) for d in deltas[:period]) / period
+    for d in deltas[period:]:
+        gain = (gain * (period - 1) + max(d, 0)) / period
+        loss = (loss * (period - 1) + max(-d, 0)) / period
+    return 100.0 if loss == 0 else 100 - 100 / (1 + gain / loss)
+
+
+def _reference_stochastic(high, low, close, period=14, smooth=3):
+    raw = []
+    for i in range(period - 1, len(close)):
+        highest, lowest = max(high[i - period + 1:i + 1]), min(low[i - period + 1:i + 1])
+        raw.append(50.0 if highest == lowest else 100 * (close[i] - lowest) / (highest - lowest))
+    k = [sum(raw[i - smooth + 1:i + 1]) / smooth for i in range(smooth - 1, len(raw))]
+    return k[-1], sum(k[-smooth:]) / smooth
+
+
+def test_rsi_matches_wilder_reference():
+    _, _, close = _series()
+    assert indicators.rsi(close)[0, -1] == pytest.approx(_reference_rsi(list(close[0])), rel=1e-9)
+
+
+def test_rsi_warm_up_is_nan():
+    _, _, close = _series()
+    values = indicators.rsi(close)[0]
+    assert np.isnan(values[:14]).all()
+    assert not np.isnan(values[14:]).any()
+
+
+def test_rsi_only_gains_is_100():
+    close = np.arange(1.0, 40.0)[None, :]
+    assert indicators.rsi(close)[0, -1] == 100.0
+
+
+def test_macd_matches_ema_reference():
+    _, _, close = _series()
+    series = list(close[0])
+    line = [fast - slow for fast, slow in zip(_reference_ema(series, 12), _reference_ema(series, 26))]
+    signal = _reference_ema(line, 9)
+
+    macd_line, macd_signal = indicators.macd(close)
+    np.testing.assert_allclose(macd_line[0, 25:], line[25:], rtol=1e-9)
+    np.testing.assert_allclose(macd_signal[0, 33:], signal[33:], rtol=1e-9)
+    assert np.isnan(macd_signal[0, :33]).all()
+
+
+def test_stochastic_matches_reference():
+    high, low, close = _series()
+    k, d = indicators.stochastic(high, low, close)
+    expected_k, expected_d = _reference_stochastic(list(high[0]), list(low[0]), list(close[0]))
+    assert k[0, -1] == pytest.approx(expected_k, rel=1e-9)
+    assert d[0, -1] == pytest.approx(expected_d, rel=1e-9)
+
+
+def test_bollinger_uses_population_std():
+    _, _, close = _series()
+    window = close[0, -20:]
+    mean = window.sum() / 20
+    std = (((window - mean) ** 2).sum() / 20) ** 0.5
+
+    upper, lower = indicators.bollinger(close)
+    assert upper[0, -1] == pytest.approx(mean + 2 * std, rel=1e-9)
+    assert lower[0, -1] == pytest.approx(mean - 2 * std, rel=1e-9)
+
+
+def test_batch_matches_single_symbol():
+    high, low, close = _series(symbols=5)
+    batch = indicators.compute_indicators(high, low, close)
+    for i in range(5):
+        assert indicators.compute_indicators(high[i], low[i], close[i])[0] == batch[i]
+
+
+def test_short_history_reports_none():
+    high, low, close = _series(bars=10)
+    values = indicators.compute_indicators(high, low, close)[0]["indicators"]
+    assert values["rsi"] is None
+    assert values["macd"] is None
+    assert values["bb_upper"] is None
+
+
+def test_compute_indicators_throughput():
+    high, low, close = _series(symbols=500)
+    started = time.perf_counter()
+    results = indicators.compute_indicators(high, low, close)
+    elapsed = time.perf_counter() - started
+
+    assert len(results) == 500
+    print(f"compute_indicators: {500 / elapsed:.0f} symbols/s over {BARS} bars")
+    assert elapsed < 2.0
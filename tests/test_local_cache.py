@@ -0,0 +1,68 @@
+import time
+
+import cache
+from cache import LocalCache, cache_db_query, get_cached_query
+
+REDIS_ROUND_TRIP = 0.0005
+
+
+def test_evicts_least_recently_used():
+    local = LocalCache(max_bytes=30)
+    local.set("a", 1, 10, 60)
+    local.set("b", 2, 10, 60)
+    local.set("c", 3, 10, 60)
+    local.get("a")
+    local.set("d", 4, 10, 60)
+
+    assert local.get("a") == 1
+    assert local.get("b") is cache._MISSING
+    assert local.stats()["l1"]["evictions"] == 1
+
+
+def test_expired_entries_are_dropped(monkeypatch):
+    local = LocalCache()
+    local.set("a", 1, 10, 5)
+    now = time.monotonic()
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now + 6)
+    assert local.get("a") is cache._MISSING
+    assert local.stats()["l1"]["bytes"] == 0
+
+
+def test_pattern_invalidation():
+    local = LocalCache()
+    local.set("response:1", 1, 10, 60)
+    local.set("response:2", 2, 10, 60)
+    local.set("db:1", 3, 10, 60)
+    local.invalidate("response:*")
+    assert local.get("response:1") is cache._MISSING
+    assert local.get("db:1") == 3
+
+
+def test_hot_keys_skip_redis(fake_redis, monkeypatch):
+    """Micro-benchmark: repeated reads of a hot key against a Redis with a round trip."""
+    get = fake_redis.get
+
+    def slow_get(key):
+        time.sleep(REDIS_ROUND_TRIP)
+        return get(key)
+
+    monkeypatch.setattr(fake_redis, "get", slow_get)
+    payload = [{"symbol": f"SYM{i}", "price": i * 1.5} for i in range(50)]
+    reads = 200
+
+    cache_db_query("uncached:1", payload)
+    started = time.perf_counter()
+    for _ in range(reads):
+        assert get_cached_query("uncached:1") == payload
+    redis_time = time.perf_counter() - started
+
+    cache_db_query("stock_analysis:1", payload)
+    fake_redis.commands.clear()
+    started = time.perf_counter()
+    for _ in range(reads):
+        assert get_cached_query("stock_analysis:1") == payload
+    local_time = time.perf_counter() - started
+
+    print(f"{reads} reads: {redis_time * 1000:.1f} ms via Redis, {local_time * 1000:.1f} ms via L1")
+    assert len(fake_redis.commands) <= 1
+    assert local_time < redis_time / 5
@@ -0,0 +1,42 @@
+import pytest
+
+from services import negative_cache as negative_cache_module
+from services.negative_cache import NEGATIVE_BASE_TTL, NegativeCache
+
+
+@pytest.fixture
+def cache(fake_redis, monkeypatch):
+    monkeypatch.setattr(negative_cache_module, "probe_candidates", lambda symbol: ["NASDAQ", "NYSE", "AMEX"])
+    return NegativeCache()
+
+
+def test_repeated_misses_double_the_ttl(cache, fake_redis):
+    cache.record_miss("XYZQ")
+    first = fake_redis.ttl("negative_symbol:XYZQ")
+    cache.record_miss("XYZQ")
+
+    assert first in (NEGATIVE_BASE_TTL - 1, NEGATIVE_BASE_TTL)
+    assert fake_redis.ttl("negative_symbol:XYZQ") > first
+
+
+def test_hits_cost_one_counter_and_no_probe_estimate(cache, fake_redis, monkeypatch):
+    cache.record_miss("XYZQ")
+    cache.attach_response("XYZQ", {"error": "missing"})
+    monkeypatch.setattr(negative_cache_module, "probe_candidates", lambda symbol: pytest.fail("estimated on a hit"))
+
+    round_trips = fake_redis.round_trips
+    assert cache.get("XYZQ") == {"error": "missing"}
+    assert cache.get("XYZQ") == {"error": "missing"}
+    assert fake_redis.round_trips - round_trips == 4
+
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["upstream_calls_saved"] == 6
+
+
+def test_clear_forgets_the_misses(cache, fake_redis):
+    cache.record_miss("XYZQ")
+    cache.clear("XYZQ")
+
+    assert cache.get("XYZQ") is None
+    assert fake_redis.get("negative_symbol:misses:XYZQ") is None
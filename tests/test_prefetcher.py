@@ -0,0 +1,85 @@
+import pytest
+
+import routes
+from services import prefetcher as prefetcher_module
+from services.prefetcher import AnalysisPrefetcher
+
+ROUTES = {
+    "AAPL": ("america", "NASDAQ", "AAPL", "Apple Inc."),
+    "MSFT": ("america", "NASDAQ", "MSFT", "Microsoft Corporation"),
+    "BTC": ("crypto", "BINANCE", "BTCUSDT", "Bitcoin / TetherUS"),
+}
+
+
+@pytest.fixture
+def prefetcher(fake_redis, monkeypatch):
+    """A prefetcher whose working set is ROUTES plus one symbol without a route."""
+    calls = []
+
+    def get_stock_analyses(symbols, interval, force=False):
+        calls.append(list(symbols))
+        return {symbol: {"symbol": symbol} for symbol in symbols}
+
+    instance = AnalysisPrefetcher()
+    monkeypatch.setattr(instance, "build_working_set", lambda: {})
+    monkeypatch.setattr(instance, "due_symbols", lambda working_set, interval: [*ROUTES, "UNROUTED"])
+    monkeypatch.setattr(routes, "resolve_symbol_route", ROUTES.get)
+    monkeypatch.setattr(routes, "get_stock_analyses", get_stock_analyses)
+    instance.calls = calls
+    return instance
+
+
+def _budget_used(client):
+    return sum(int(value) for key, value in client.data.items() if key.startswith("prefetch:budget:"))
+
+
+def test_unrouted_symbols_are_not_prefetched(prefetcher, fake_redis):
+    assert prefetcher.run() == 3
+    assert prefetcher.calls == [list(ROUTES)]
+    assert _budget_used(fake_redis) == 2
+
+
+def test_budget_stops_the_run(prefetcher, fake_redis, monkeypatch):
+    monkeypatch.setattr(prefetcher_module, "PREFETCH_BUDGET_PER_MINUTE", 1)
+    assert prefetcher.run() == 0
+    assert prefetcher.calls == []
+    assert _budget_used(fake_redis) == 0
+
+
+def test_prefetched_hits_need_a_live_marker(prefetcher, fake_redis):
+    interval = routes.Interval.INTERVAL_1_DAY
+    prefetcher.run(interval)
+
+    marker = prefetcher._refreshed_key("AAPL", interval)
+    assert 0 < fake_redis.ttl(marker) <= routes.analysis_ttls(interval)[1]
+
+    for symbol in ("AAPL", "UNROUTED"):
+        round_trips = fake_redis.round_trips
+        prefetcher.record_lookup(symbol, interval, hit=True)
+        assert fake_redis.round_trips - round_trips == 1
+    fake_redis.delete(marker)
+    prefetcher.record_lookup("AAPL", interval, hit=True)
+
+    stats = prefetcher.stats()
+    assert stats["hits"] == 3
+    assert stats["prefetched_hits"] == 1
+
+
+def test_requests_served_from_the_response_cache_are_counted(fake_redis):
+    from flask import Flask, jsonify
+
+    from cache import cached
+
+    app = Flask(__name__)
+    app.after_request(routes.track_stock_request)
+
+    @app.route("/api/stock/<symbol>")
+    @cached(timeout=300, include_query_params=True, soft_timeout=60)
+    def get_stock_data(symbol):
+        return jsonify({"symbol": symbol})
+
+    client = app.test_client()
+    for _ in range(3):
+        client.get("/api/stock/aapl")
+
+    assert fake_redis.zrevrange(AnalysisPrefetcher()._popular_key(), 0, -1, withscores=True) == [(b"AAPL", 3.0)]
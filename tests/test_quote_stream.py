@@ -0,0 +1,83 @@
+import time
+
+import eventlet
+import pytest
+
+import routes
+from services import quote_stream as quote_stream_module
+from services.quote_stream import QUOTE_REFRESHER_LEASE, QUOTE_SUBSCRIBER_TIMEOUT, QuoteStream
+
+LEASE_KEY = "quote_stream:refresher:AAPL"
+
+
+@pytest.fixture
+def emitted(fake_redis, monkeypatch):
+    """Runs refreshers every 10 ms against a fixed quote and records what they emit."""
+
+    class SocketIO:
+        def __init__(self):
+            self.quotes = []
+
+        def emit(self, event, data, room=None):
+            self.quotes.append((room, data))
+
+    socketio = SocketIO()
+    monkeypatch.setattr(routes, "socketio", socketio, raising=False)
+    monkeypatch.setattr(quote_stream_module, "QUOTE_REFRESH_INTERVAL", 0.01)
+    monkeypatch.setattr(QuoteStream, "_fetch_quote", lambda self, symbol: {"symbol": symbol, "price": 1.5})
+    return socketio.quotes
+
+
+def test_only_one_worker_holds_the_lease(fake_redis):
+    first, second = QuoteStream(), QuoteStream()
+
+    assert first._claim("AAPL")
+    assert not second._claim("AAPL")
+    assert fake_redis.get(LEASE_KEY) == first.worker_id.encode()
+
+
+def test_the_holder_renews_its_lease(fake_redis):
+    stream = QuoteStream()
+    stream._claim("AAPL")
+    fake_redis.expire(LEASE_KEY, 1)
+
+    assert stream._claim("AAPL")
+    assert fake_redis.ttl(LEASE_KEY) > QUOTE_REFRESHER_LEASE - 2
+
+
+def test_only_the_holder_releases_the_lease(fake_redis):
+    first, second = QuoteStream(), QuoteStream()
+    first._claim("AAPL")
+
+    second._release("AAPL")
+    assert fake_redis.get(LEASE_KEY) == first.worker_id.encode()
+
+    first._release("AAPL")
+    assert second._claim("AAPL")
+
+
+def test_refresher_stops_when_its_room_empties(emitted, fake_redis):
+    stream = QuoteStream()
+    stream.subscribe("sid-1", "AAPL")
+    eventlet.sleep(0.03)
+
+    assert emitted == [("quote:AAPL", {"symbol": "AAPL", "price": 1.5})]
+    assert stream._refreshing == {"AAPL"}
+
+    stream.unsubscribe("sid-1", "AAPL")
+    eventlet.sleep(0.03)
+
+    assert stream._refreshing == set()
+    assert fake_redis.get(LEASE_KEY) is None
+    assert stream._supervisor is None
+
+
+def test_subscribers_of_a_dead_worker_expire(emitted, fake_redis):
+    fake_redis.zadd("quote_stream:subscribers:AAPL", {"sid-on-dead-worker": time.time() - QUOTE_SUBSCRIBER_TIMEOUT - 1})
+    stream = QuoteStream()
+    stream._ensure_refresher("AAPL")
+    eventlet.sleep(0.03)
+
+    assert emitted == []
+    assert stream._refreshing == set()
+    assert fake_redis.zcard("quote_stream:subscribers:AAPL") == 0
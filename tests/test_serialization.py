@@ -0,0 +1,85 @@
+import json
+import math
+import zlib
+
+import pytest
+
+from utils import serialization
+from utils.serialization import COMPRESS_THRESHOLD, COMPRESSOR_IDS, LEGACY_PREFIX, SERIALIZER_IDS, CacheCodec
+
+ANALYSIS = {
+    "symbol": "AAPL",
+    "exchange": "NASDAQ",
+    "price": 190.5,
+    "indicators": {f"indicator_{i}": i * 1.5 for i in range(100)},
+    "recommendation": "BUY",
+    "is_crypto": False,
+    "history": [[1700000000 + i, 190.0 + i] for i in range(50)],
+}
+
+
+def _codec(serializer, compressor):
+    """Builds a codec, skipping when the library is not installed here."""
+    if SERIALIZER_IDS[serializer] not in serialization._serializers():
+        pytest.skip(f"{serializer} is not installed")
+    if COMPRESSOR_IDS[compressor] not in serialization._compressors():
+        pytest.skip(f"{compressor} is not installed")
+    return CacheCodec(serializer, compressor)
+
+
+@pytest.mark.parametrize("compressor", ["none", "zlib", "lz4", "zstd"])
+@pytest.mark.parametrize("serializer", ["json", "orjson", "msgpack"])
+def test_round_trip(serializer, compressor):
+    codec = _codec(serializer, compressor)
+    data = codec.encode(ANALYSIS)
+
+    assert codec.name == f"{serializer}+{compressor}"
+    assert data[0] >> 3 & 0x0F == SERIALIZER_IDS[serializer]
+    assert data[0] & 0x07 == COMPRESSOR_IDS[compressor]
+    assert codec.decode(data)[0] == ANALYSIS
+
+
+@pytest.mark.parametrize("serializer", ["json", "orjson", "msgpack"])
+def test_small_values_are_not_compressed(serializer):
+    codec = _codec(serializer, "zlib")
+    data = codec.encode({"symbol": "AAPL"})
+
+    assert len(data) < COMPRESS_THRESHOLD
+    assert data[0] & 0x07 == COMPRESSOR_IDS["none"]
+    assert codec.decode(data)[0] == {"symbol": "AAPL"}
+
+
+def test_values_written_by_another_codec_decode():
+    writer = CacheCodec("json", "zlib")
+    reader = CacheCodec()
+    assert reader.decode(writer.encode(ANALYSIS))[0] == ANALYSIS
+
+
+def test_legacy_entries_decode():
+    codec = CacheCodec()
+    plain = json.dumps(ANALYSIS).encode()
+    compressed = LEGACY_PREFIX + zlib.compress(plain)
+
+    assert codec.decode(plain) == (ANALYSIS, len(plain))
+    assert codec.decode(compressed) == (ANALYSIS, len(plain))
+
+
+def test_legacy_entries_with_nan_decode():
+    value, _ = CacheCodec().decode(json.dumps({"rsi": float("nan")}).encode())
+    assert math.isnan(value["rsi"])
+
+
+def test_orjson_stores_nan_as_none():
+    codec = _codec("orjson", "none")
+    assert codec.decode(codec.encode({"rsi": float("nan"), "macd": 1.0}))[0] == {"rsi": None, "macd": 1.0}
+
+
+def test_missing_libraries_fall_back(monkeypatch):
+    monkeypatch.setattr(serialization, "msgpack", None)
+    monkeypatch.setattr(serialization, "lz4_frame", None)
+    monkeypatch.setattr(serialization, "zstandard", None)
+
+    codec = CacheCodec("msgpack", "lz4")
+
+    assert codec.name in ("orjson+zlib", "json+zlib")
+    assert codec.decode(codec.encode(ANALYSIS))[0] == ANALYSIS
@@ -0,0 +1,93 @@
+import eventlet
+import pytest
+
+from services.singleflight import SingleFlight
+
+
+@pytest.fixture
+def flight(fake_redis):
+    return SingleFlight("quotes", poll_interval=0.01)
+
+
+def _slow_fetch(calls, value):
+    def fetch(*args):
+        calls.append(args)
+        eventlet.sleep(0.05)
+        return value
+    return fetch
+
+
+def test_followers_in_a_worker_share_the_leaders_result(flight):
+    calls = []
+    fetch = _slow_fetch(calls, {"price": 1.5})
+
+    leader = eventlet.spawn(flight.do, "AAPL", fetch, "AAPL")
+    follower = eventlet.spawn(flight.do, "AAPL", fetch, "AAPL")
+
+    assert leader.wait() == follower.wait() == {"price": 1.5}
+    assert calls == [("AAPL",)]
+    assert flight.stats()["worker"] == {"leader": 1, "coalesced_local": 1, "coalesced_remote": 0}
+
+
+def test_followers_in_other_workers_share_the_leaders_result(flight, fake_redis):
+    other_worker = SingleFlight("quotes", poll_interval=0.01)
+    calls = []
+    fetch = _slow_fetch(calls, {"price": 1.5})
+
+    leader = eventlet.spawn(flight.do, "AAPL", fetch)
+    eventlet.sleep(0)
+    follower = eventlet.spawn(other_worker.do, "AAPL", fetch)
+
+    assert leader.wait() == follower.wait() == {"price": 1.5}
+    assert len(calls) == 1
+    assert other_worker.stats()["worker"]["coalesced_remote"] == 1
+    assert flight.stats()["cluster"] == {"leader": 1, "coalesced_remote": 1}
+    assert "singleflight:quotes:lock:AAPL" not in fake_redis.data
+
+
+def test_leader_errors_reach_local_followers(flight):
+    def fail():
+        eventlet.sleep(0.01)
+        raise ValueError("upstream down")
+
+    leader = eventlet.spawn(flight.do, "AAPL", fail)
+    follower = eventlet.spawn(flight.do, "AAPL", fail)
+
+    with pytest.raises(ValueError):
+        leader.wait()
+    with pytest.raises(ValueError):
+        follower.wait()
+
+
+def test_overlapping_batches_fetch_each_key_once(flight, fake_redis):
+    other_worker = SingleFlight("quotes", poll_interval=0.01)
+    fetched = []
+
+    def fetch(keys):
+        fetched.extend(keys)
+        eventlet.sleep(0.05)
+        return {key: key.lower() for key in keys}
+
+    first = eventlet.spawn(flight.do_many, ["AAPL", "MSFT"], fetch)
+    eventlet.sleep(0)
+    second = eventlet.spawn(flight.do_many, ["MSFT", "NVDA"], fetch)
+    third = eventlet.spawn(other_worker.do_many, ["NVDA", "TSLA"], fetch)
+
+    assert first.wait() == {"AAPL": "aapl", "MSFT": "msft"}
+    assert second.wait() == {"MSFT": "msft", "NVDA": "nvda"}
+    assert third.wait() == {"NVDA": "nvda", "TSLA": "tsla"}
+    assert sorted(fetched) == ["AAPL", "MSFT", "NVDA", "TSLA"]
+    assert not [key for key in fake_redis.data if ":lock:" in key]
+
+
+def test_batch_fetches_keys_whose_leader_gave_up(flight, fake_redis):
+    fake_redis.set("singleflight:quotes:lock:AAPL", "crashed-worker", ex=15)
+    eventlet.spawn_after(0.03, fake_redis.delete, "singleflight:quotes:lock:AAPL")
+    fetched = []
+
+    def fetch(keys):
+        fetched.extend(keys)
+        return {key: 2.0 for key in keys}
+
+    assert flight.do_many(["AAPL", "MSFT"], fetch) == {"AAPL": 2.0, "MSFT": 2.0}
+    assert fetched == ["MSFT", "AAPL"]
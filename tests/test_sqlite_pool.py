@@ -0,0 +1,71 @@
+import os
+import sqlite3
+
+import eventlet
+import pytest
+
+from utils.utils import SQLiteConnectionPool
+
+HEAVY_QUERY = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < ?) SELECT sum(x) FROM c"
+ROWS = 300000
+
+
+@pytest.fixture
+def pool(tmp_path):
+    path = str(tmp_path / "symbols.db")
+    sqlite3.connect(path).close()
+    pool = SQLiteConnectionPool(path, max_connections=4)
+    yield pool
+    pool.close_all()
+
+
+def test_queries_on_threads_keep_the_hub_responsive(pool):
+    """Load test: concurrent slow queries while a greenlet keeps ticking on the hub."""
+    ticks = []
+    running = [True]
+
+    def ticker():
+        while running[0]:
+            ticks.append(eventlet.sleep(0.005))
+
+    ticker_thread = eventlet.spawn(ticker)
+    greenlets = [eventlet.spawn(pool.execute, HEAVY_QUERY, (ROWS,), True) for _ in range(8)]
+    results = [greenlet.wait() for greenlet in greenlets]
+    running[0] = False
+    ticker_thread.wait()
+
+    stats = pool.stats()
+    print(f"8 queries, {len(ticks)} hub ticks, stats {stats}")
+    assert results == [(ROWS * (ROWS + 1) // 2,)] * 8
+    assert stats["queries"] == 8
+    assert stats["connections"] == 4
+    assert stats["avg_exec_ms"] > 0
+    assert stats["max_queue_ms"] >= 0
+    assert len(ticks) >= 5
+
+
+def test_queue_wait_is_separate_from_execution(pool):
+    pool.execute("SELECT 1")
+    stats = pool.stats()
+    assert set(stats) >= {"avg_wait_ms", "avg_queue_ms", "avg_exec_ms", "max_queue_ms"}
+
+
+def test_swap_listeners_run_in_their_own_greenlet(pool):
+    calls = []
+
+    def slow_listener():
+        eventlet.sleep(0.05)
+        calls.append("rebuilt")
+
+    def failing_listener():
+        raise RuntimeError("boom")
+
+    pool.add_swap_listener(failing_listener)
+    pool.add_swap_listener(slow_listener)
+    os.utime(pool.db_path, ns=(0, 0))
+    pool.swap()
+    assert calls == []
+
+    eventlet.sleep(0.1)
+    assert calls == ["rebuilt"]
+    assert pool.execute("SELECT 1", one=True) == (1,)
@@ -0,0 +1,77 @@
+import time
+
+import eventlet
+import pytest
+
+from cache import cache_db_query, get_cached_query
+
+QUERY = "stock_analysis:AAPL:1d"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Lets a test move time.time forward."""
+    now = [time.time()]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    return now
+
+
+def _revalidator(calls, data):
+    def revalidate():
+        calls.append(data)
+        cache_db_query(QUERY, data, timeout=300, soft_timeout=60)
+    return revalidate
+
+
+def test_fresh_entries_are_not_refreshed(fake_redis, clock):
+    calls = []
+    cache_db_query(QUERY, {"price": 1}, timeout=300, soft_timeout=60)
+
+    clock[0] += 59
+    assert get_cached_query(QUERY, _revalidator(calls, {"price": 2})) == {"price": 1}
+    eventlet.sleep(0)
+
+    assert calls == []
+
+
+def test_stale_entry_is_served_and_refreshed_in_the_background(fake_redis, clock):
+    calls = []
+    cache_db_query(QUERY, {"price": 1}, timeout=300, soft_timeout=60)
+
+    clock[0] += 61
+    assert get_cached_query(QUERY, _revalidator(calls, {"price": 2})) == {"price": 1}
+    assert calls == []
+
+    eventlet.sleep(0)
+    assert calls == [{"price": 2}]
+    assert get_cached_query(QUERY, _revalidator(calls, {"price": 3})) == {"price": 2}
+    eventlet.sleep(0)
+    assert calls == [{"price": 2}]
+
+
+def test_concurrent_stale_reads_refresh_once(fake_redis, clock):
+    calls = []
+    cache_db_query(QUERY, {"price": 1}, timeout=300, soft_timeout=60)
+
+    def slow_revalidate():
+        eventlet.sleep(0.02)
+        _revalidator(calls, {"price": 2})()
+
+    clock[0] += 61
+    readers = [eventlet.spawn(get_cached_query, QUERY, slow_revalidate) for _ in range(5)]
+
+    assert [reader.wait() for reader in readers] == [{"price": 1}] * 5
+    eventlet.sleep(0.05)
+    assert calls == [{"price": 2}]
+    assert not [key for key in fake_redis.data if key.startswith("refresh:")]
+
+
+def test_entries_without_a_soft_timeout_never_go_stale(fake_redis, clock):
+    calls = []
+    cache_db_query(QUERY, {"price": 1}, timeout=300)
+
+    clock[0] += 299
+    assert get_cached_query(QUERY, _revalidator(calls, {"price": 2})) == {"price": 1}
+    eventlet.sleep(0)
+
+    assert calls == []
@@ -0,0 +1,162 @@
+import fcntl
+import random
+import sqlite3
+import string
+import time
+
+import eventlet
+import pytest
+
+from services import suggestion_index as suggestion_index_module
+from services.suggestion_index import SuggestionIndex
+from utils.utils import SQLiteConnectionPool
+
+ROWS = 20000
+WORDS = ["APPLE", "MICRO", "SYSTEMS", "HOLDINGS", "BANK", "ENERGY", "GLOBAL", "TECH", "PHARMA", "MINING", "GROUP"]
+
+SUGGESTION_SQL = """
+    SELECT screener, exchange, symbol, desc, 1 as match_type FROM tv
+    WHERE UPPER(symbol) = ?
+    UNION ALL
+    SELECT screener, exchange, symbol, desc, 2 as match_type FROM tv
+    WHERE UPPER(symbol) LIKE ? AND UPPER(symbol) != ?
+    UNION ALL
+    SELECT screener, exchange, symbol, desc, 3 as match_type FROM tv
+    WHERE UPPER(symbol) LIKE ? AND UPPER(symbol) NOT LIKE ? AND UPPER(symbol) != ?
+    UNION ALL
+    SELECT screener, exchange, symbol, desc, 4 as match_type FROM tv
+    WHERE UPPER(desc) LIKE ? AND UPPER(symbol) NOT LIKE ?
+    ORDER BY match_type
+    LIMIT ?
+"""
+
+
+def _sql_search(conn, query, limit):
+    """The LIKE scans the index replaced."""
+    rows = conn.execute(
+        SUGGESTION_SQL,
+        (query, f"{query}%", query, f"%{query}%", f"{query}%", query, f"%{query}%", f"%{query}%", limit),
+    ).fetchall()
+    return [row[:4] for row in rows]
+
+
+@pytest.fixture(scope="module")
+def database(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("symbols") / "tradingview.db")
+    rng = random.Random(15)
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE tv (screener TEXT, exchange TEXT, symbol TEXT, desc TEXT)")
+    rows = [("america", "NASDAQ", "A", "Agilent Technologies"), ("america", "NYSE", "AA", "Alcoa Corporation")]
+    for _ in range(ROWS):
+        symbol = "".join(rng.choices(string.ascii_uppercase, k=rng.randint(1, 5)))
+        desc = " ".join(rng.choices(WORDS, k=3)).title()
+        rows.append((rng.choice(["america", "crypto"]), rng.choice(["NASDAQ", "NYSE", "BINANCE"]), symbol, desc))
+    conn.executemany("INSERT INTO tv VALUES (?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def index(database, tmp_path, monkeypatch):
+    pool = SQLiteConnectionPool(database, max_connections=2)
+    monkeypatch.setattr(suggestion_index_module, "symbols_db_pool", pool)
+    yield SuggestionIndex(str(tmp_path / "suggestions.idx"))
+    pool.close_all()
+
+
+def test_exact_matches_come_first(index):
+    results = index.search("A", 5)
+    assert results[0][2] == "A"
+    assert all(symbol.startswith("A") for _, _, symbol, _ in results)
+
+
+@pytest.mark.parametrize("query", ["A", "AA", "QX", "ZZZ", "MIC", "BANK", "XYZQ", "TECH"])
+def test_matches_the_sql(index, database, query):
+    conn = sqlite3.connect(database)
+    try:
+        assert index.search(query, 10) == _sql_search(conn, query, 10)
+    finally:
+        conn.close()
+
+
+def test_lock_held_elsewhere_does_not_block_the_hub(index, tmp_path):
+    ticks = []
+    with open(f"{index.path}.lock", "a") as held:
+        fcntl.flock(held, fcntl.LOCK_EX)
+        opener = eventlet.spawn(index._open)
+        for _ in range(3):
+            eventlet.sleep(0.01)
+            ticks.append(opener.dead)
+        fcntl.flock(held, fcntl.LOCK_UN)
+    opener.wait()
+
+    assert ticks == [False, False, False]
+    assert index.search("AA", 1)[0][2] == "AA"
+
+
+def test_first_build_does_not_block_the_hub(index):
+    ticks = []
+
+    def tick():
+        while True:
+            ticks.append(time.perf_counter())
+            eventlet.sleep(0.005)
+
+    ticker = eventlet.spawn(tick)
+    eventlet.sleep(0)
+    try:
+        started = time.perf_counter()
+        index.search("AA", 1)
+        elapsed = time.perf_counter() - started
+    finally:
+        ticker.kill()
+
+    assert len(ticks) > 1
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < max(0.05, elapsed / 4)
+
+
+def test_searches_use_the_old_mapping_while_rebuilding(index):
+    assert index.search("AA", 1)[0][2] == "AA"
+
+    rebuilder = eventlet.spawn(index.reload)
+    eventlet.sleep(0)
+    assert index._lock.locked()
+
+    index.refresh()
+    assert index.search("AA", 1)[0][2] == "AA"
+    assert not rebuilder.dead
+    rebuilder.wait()
+
+
+def test_benchmark_against_sql(index, database, monkeypatch):
+    """Benchmark: 1 to 4 character queries against the LIKE scans.
+
+    The timings are printed only. What is asserted is that the index returns
+    the same rows while reading a small fraction of the rows the LIKE scans read.
+    """
+    queries = ["A", "B", "AA", "QX", "ABC", "MIC", "BANK", "TECH"]
+    conn = sqlite3.connect(database)
+    index.search("A")
+    table_rows = conn.execute("SELECT COUNT(*) FROM tv").fetchone()[0]
+
+    reads = []
+    symbol = index._symbol
+    monkeypatch.setattr(index, "_symbol", lambda row_id: reads.append(row_id) or symbol(row_id))
+
+    try:
+        for query in queries:
+            started = time.perf_counter()
+            expected = _sql_search(conn, query, 10)
+            sql_ms = (time.perf_counter() - started) * 1000
+
+            reads.clear()
+            started = time.perf_counter()
+            results = index.search(query, 10)
+            index_ms = (time.perf_counter() - started) * 1000
+
+            print(f"{query!r:8} SQL {sql_ms:8.3f} ms, index {index_ms:8.3f} ms, {len(reads)} of {table_rows} rows read")
+            assert results == expected
+            assert len(reads) < table_rows / 100
+    finally:
+        conn.close()
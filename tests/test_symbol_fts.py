@@ -0,0 +1,78 @@
+import sqlite3
+
+import pytest
+
+import routes
+from services import symbol_fts
+from utils.utils import SQLiteConnectionPool
+
+ROWS = [
+    ("america", "NASDAQ", "AAPL", "Apple Inc."),
+    ("america", "OTC", "APPLE", "Apple Rush Company"),
+    ("america", "NYSE", "APLE", "Apple Hospitality REIT"),
+    ("america", "NYSE", "MICROX", "Xylo Holdings"),
+    ("america", "NYSE", "ZZZ", "Micro Systems"),
+    ("crypto", "KRAKEN", "BTCUSD", "Bitcoin / US Dollar"),
+    ("crypto", "BINANCE", "BTCUSD", "Bitcoin / US Dollar"),
+    ("crypto", "COINBASE", "BTCCAD", "Bitcoin / Canadian Dollar"),
+]
+
+
+def _create_database(path):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE tv (screener TEXT, exchange TEXT, symbol TEXT, desc TEXT)")
+    conn.executemany("INSERT INTO tv VALUES (?, ?, ?, ?)", ROWS)
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    path = str(tmp_path / "tradingview.db")
+    _create_database(path)
+    assert symbol_fts.build_fts(path) == len(ROWS)
+
+    pool = SQLiteConnectionPool(path, max_connections=2)
+    monkeypatch.setattr(symbol_fts, "symbols_db_pool", pool)
+    yield pool
+    pool.close_all()
+
+
+def _symbols(rows):
+    return [(exchange, symbol) for _, exchange, symbol, _ in rows]
+
+
+def test_exact_symbol_comes_first(pool):
+    assert symbol_fts.search("apple", 3)[0][2] == "APPLE"
+
+
+def test_symbol_column_outweighs_descriptions(pool):
+    assert _symbols(symbol_fts.search("micro", 2)) == [("NYSE", "MICROX"), ("NYSE", "ZZZ")]
+
+
+def test_priority_exchanges_are_boosted(pool):
+    assert _symbols(symbol_fts.search("bitcoin us", 2)) == [("BINANCE", "BTCUSD"), ("KRAKEN", "BTCUSD")]
+
+
+def test_every_word_is_a_prefix_term(pool):
+    assert _symbols(symbol_fts.search("bitcoin ca", 5)) == [("COINBASE", "BTCCAD")]
+    assert symbol_fts.search("!!", 5) == []
+
+
+def test_rebuilding_keeps_one_entry_per_row(pool):
+    symbol_fts.build_fts(pool.db_path)
+    assert len(symbol_fts.search("apple", 10)) == 3
+
+
+def test_missing_index_falls_back_to_the_suggestion_index(tmp_path, fake_redis, monkeypatch):
+    path = str(tmp_path / "without_fts.db")
+    _create_database(path)
+    pool = SQLiteConnectionPool(path, max_connections=2)
+    monkeypatch.setattr(symbol_fts, "symbols_db_pool", pool)
+    monkeypatch.setattr(routes, "SYMBOL_SUGGESTION_MODE", "fts")
+    monkeypatch.setattr(routes.suggestion_index, "search", lambda query, limit: ROWS[:2])
+
+    with pytest.raises(sqlite3.OperationalError):
+        symbol_fts.search("apple", 2)
+    assert routes.find_symbol_matches("APPLE", 2) == ROWS[:2]
+    pool.close_all()
@@ -0,0 +1,64 @@
+import pytest
+
+from services import symbol_index as symbol_index_module
+from services.symbol_index import SymbolIndex
+
+TV_ROWS = [
+    ("america", "NASDAQ", "AAPL", "Apple Inc."),
+    ("america", "NYSE", "SOL", "Emeren Group Ltd"),
+    ("america", "NASDAQ", "COMP", "Compass Inc."),
+    ("crypto", "BINANCE", "BTCUSDT", "Bitcoin / TetherUS"),
+    ("crypto", "BINANCE", "ETHBTC", "Ethereum / Bitcoin"),
+    ("crypto", "BINANCE", "PEPEUSDT", "Pepe / TetherUS"),
+    ("crypto", "BINANCE", "BNBUSDT", "BNB / TetherUS"),
+    ("crypto", "BINANCE", "ABUSD", "Ambiguous / USD"),
+    ("crypto", "BINANCE", "BNBUSD", "BNB / USD"),
+    ("crypto", "BINANCE", "MBUSD", "Ambiguous / USD"),
+    ("crypto", "BINANCE", "TBUSD", "Ambiguous / USD"),
+]
+
+
+@pytest.fixture
+def index(monkeypatch):
+    """Builds an index over TV_ROWS instead of the symbols database."""
+    monkeypatch.setattr(symbol_index_module.symbols_db_pool, "execute", lambda *args, **kwargs: TV_ROWS)
+    monkeypatch.setattr(SymbolIndex, "_current_db_version", lambda self: ("test",))
+    index = SymbolIndex()
+    index.build()
+    return index
+
+
+def test_ambiguous_splits_add_no_bases(index):
+    assert index._crypto_bases >= {"BTC", "ETH", "PEPE", "BNB"}
+    assert not {"A", "AB", "M", "MB", "T", "TB", "BN"} & index._crypto_bases
+
+
+@pytest.mark.parametrize("symbol", ["AUSD", "MUSD", "TUSD", "KBTC"])
+def test_unlisted_short_symbols_stay_stocks(index, symbol):
+    assert index.classify(symbol).asset_class == "stock"
+
+
+def test_longest_known_base_wins(index):
+    info = index.get("BNBUSD")
+    assert (info.base, info.quote) == ("BNB", "USD")
+
+    info = index.get("ABUSD")
+    assert (info.asset_class, info.base, info.quote) == ("crypto", "ABUSD", "")
+
+
+def test_unlisted_pairs_of_known_bases_are_crypto(index):
+    info = index.classify("PEPEUSDC")
+    assert (info.asset_class, info.base, info.quote) == ("crypto", "PEPE", "USDC")
+
+
+def test_listed_stocks_are_not_shadowed_by_curated_crypto(index):
+    assert index.get("SOL").asset_class == "stock"
+    assert index.get("COMP").exchange == "NASDAQ"
+
+
+def test_curated_crypto_is_listed_only_when_in_table(index):
+    assert index.get("BTC").listed
+    assert index.get("BTC").symbol == "BTCUSDT"
+
+    doge = index.get("DOGE")
+    assert doge.asset_class == "crypto" and not doge.listed
@@ -0,0 +1,117 @@
+import json
+import time
+
+import pytest
+
+import routes
+from services import symbol_popularity as popularity_module
+from services.symbol_popularity import SymbolPopularity
+
+ROWS = [
+    ("america", "NASDAQ", "MS", "Morgan Stanley"),
+    ("america", "NASDAQ", "MSA", "MSA Safety"),
+    ("america", "NASDAQ", "MSFT", "Microsoft Corporation"),
+    ("america", "NYSE", "AMS", "Some Company"),
+]
+
+
+@pytest.fixture
+def popularity(fake_redis):
+    return SymbolPopularity()
+
+
+def _score(popularity, client, symbol, score):
+    epoch = popularity._epoch()
+    client.zincrby(popularity._symbols_key(epoch), score * popularity_module._decay_factor(time.time(), epoch), symbol)
+
+
+def test_popularity_reorders_within_tiers_only(popularity, fake_redis):
+    _score(popularity, fake_redis, "MSFT", 5)
+    _score(popularity, fake_redis, "AMS", 50)
+
+    ranked = popularity.rank("MS", ROWS, 4)
+
+    assert [row[2] for row in ranked] == ["MS", "MSFT", "MSA", "AMS"]
+    assert [command for command, _ in fake_redis.commands].count("zmscore") == 1
+
+
+def test_without_scores_the_index_order_stays(popularity):
+    assert popularity.rank("MS", ROWS, 3) == ROWS[:3]
+
+
+def test_fts_results_keep_bm25_order(fake_redis, monkeypatch):
+    bm25 = [ROWS[3], ROWS[1], ROWS[0]]
+    _score(routes.symbol_popularity, fake_redis, "MS", 100)
+    monkeypatch.setattr(routes, "SYMBOL_SUGGESTION_MODE", "fts")
+    monkeypatch.setattr(routes.symbol_fts, "search", lambda query, limit: bm25)
+
+    assert routes.find_symbol_matches("MS", 3) == bm25
+
+
+def test_materialize_covers_typed_and_popular_prefixes(popularity, fake_redis, monkeypatch):
+    calls = []
+    monkeypatch.setattr(routes, "find_symbol_matches", lambda prefix, limit: calls.append(prefix) or ROWS[:1])
+    monkeypatch.setattr(popularity_module, "MAX_MATERIALIZED_COUNT", 5)
+    popularity.top_for_prefixes(["Q", "QQ", "QQQ", "LONGER"], 5)
+    popularity.top_for_prefixes(["QQ"], 5)
+    _score(popularity, fake_redis, "NVDA", 10)
+
+    assert popularity.materialize() == 5
+    assert calls == ["QQ", "Q", "QQQ", "N", "NV"]
+
+    top = popularity.top_for_prefix("QQ", 5)
+    assert top[0]["symbol"] == "MS"
+    assert json.loads(fake_redis.data["popularity:top:" + popularity_module.SYMBOL_SUGGESTION_MODE]["NV"])
+
+
+def test_renormalize_moves_the_epoch_and_keeps_scores(popularity, fake_redis):
+    old_epoch = int(time.time()) - 5 * popularity_module.POPULARITY_HALF_LIFE
+    fake_redis.set("popularity:epoch", old_epoch)
+    _score(popularity, fake_redis, "MSFT", 5)
+    _score(popularity, fake_redis, "AMS", 50)
+    assert popularity.renormalize()
+
+    new_epoch = int(fake_redis.get("popularity:epoch"))
+    assert new_epoch > old_epoch
+    assert popularity.scores(["MSFT", "AMS"]) == pytest.approx({"MSFT": 5, "AMS": 50}, rel=1e-3)
+    assert fake_redis.zmscore(popularity._symbols_key(new_epoch), ["AMS"])[0] == pytest.approx(50, rel=1e-3)
+    assert 0 < fake_redis.ttl(popularity._symbols_key(old_epoch)) <= popularity_module.EPOCH_GRACE
+
+    assert not popularity.renormalize()
+
+
+def test_other_workers_pick_up_the_new_epoch(popularity, fake_redis, monkeypatch):
+    fake_redis.set("popularity:epoch", int(time.time()) - 5 * popularity_module.POPULARITY_HALF_LIFE)
+    other_worker = SymbolPopularity()
+    stale_epoch = other_worker._epoch()
+    popularity.renormalize()
+
+    assert other_worker._epoch() == stale_epoch
+    monkeypatch.setattr(popularity_module, "EPOCH_CHECK_INTERVAL", 0)
+    assert other_worker._epoch() == popularity._epoch() != stale_epoch
+
+
+def test_hits_served_from_the_response_cache_are_counted(fake_redis, monkeypatch):
+    from flask import Flask, jsonify
+
+    from cache import cached
+
+    hits, views = [], []
+    monkeypatch.setattr(routes.symbol_popularity, "record_hit", hits.append)
+
+    app = Flask(__name__)
+    app.after_request(routes.track_stock_request)
+
+    @app.route("/api/stock/<symbol>")
+    @cached(timeout=300, include_query_params=True, soft_timeout=60)
+    def get_stock_data(symbol):
+        views.append(symbol)
+        return jsonify({"symbol": symbol})
+
+    client = app.test_client()
+    etag = client.get("/api/stock/msft").headers["ETag"]
+    client.get("/api/stock/msft")
+    assert client.get("/api/stock/msft", headers={"If-None-Match": etag}).status_code == 304
+
+    assert views == ["msft"]
+    assert hits == ["MSFT", "MSFT", "MSFT"]
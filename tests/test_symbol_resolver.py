@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from services import symbol_resolver as resolver_module
+from services.symbol_resolver import MAX_ROUTE_FAILURES, ROUTE_TTL, SymbolResolver
+from utils.utils import SQLiteConnectionPool
+
+ROUTE = {"exchange": "NYSE", "screener": "america", "display_symbol": "BRK.B"}
+
+
+@pytest.fixture
+def resolver(tmp_path, fake_redis, monkeypatch):
+    pool = SQLiteConnectionPool(str(tmp_path / "symbol_routes.db"), max_connections=2)
+    monkeypatch.setattr(resolver_module, "symbol_routes_db_pool", pool)
+    yield SymbolResolver()
+    pool.close_all()
+
+
+def test_routes_are_served_from_sqlite_after_a_redis_restart(resolver, fake_redis):
+    resolver.record("BRKB", **ROUTE)
+    assert 0 < fake_redis.ttl("symbol_route:BRKB") <= ROUTE_TTL
+
+    fake_redis.data.clear()
+
+    assert resolver.get("BRKB") == ROUTE
+    assert fake_redis.ttl("symbol_route:BRKB") > 0
+
+
+def test_expired_routes_are_dropped(resolver, fake_redis):
+    resolver.record("BRKB", **ROUTE)
+    resolver.pool.execute(
+        "UPDATE symbol_routes SET updated_at = ? WHERE symbol = ?",
+        (time.time() - ROUTE_TTL - 1, "BRKB"),
+        commit=True,
+    )
+    fake_redis.data.clear()
+
+    assert resolver.get("BRKB") is None
+    assert resolver.pool.execute("SELECT 1 FROM symbol_routes WHERE symbol = ?", ("BRKB",), one=True) is None
+
+
+def test_route_is_dropped_after_repeated_failures(resolver, fake_redis):
+    resolver.record("BRKB", **ROUTE)
+
+    for _ in range(MAX_ROUTE_FAILURES - 1):
+        resolver.record_failure("BRKB")
+    assert resolver.get("BRKB") == ROUTE
+
+    resolver.record_failure("BRKB")
+    assert resolver.get("BRKB") is None
+    assert "symbol_route:BRKB" not in fake_redis.data
+
+
+def test_recording_a_route_resets_its_failures(resolver):
+    resolver.record("BRKB", **ROUTE)
+    for _ in range(MAX_ROUTE_FAILURES - 1):
+        resolver.record_failure("BRKB")
+
+    resolver.record("BRKB", **ROUTE)
+    resolver.record_failure("BRKB")
+
+    assert resolver.get("BRKB") == ROUTE
@@ -0,0 +1,19 @@
+import os
+
+from services.symbols_db_builder import install_symbols_db
+
+
+def test_install_removes_old_wal_and_shm(tmp_path):
+    live = tmp_path / "symbols.db"
+    built = tmp_path / "symbols.db.1.building"
+    live.write_bytes(b"old")
+    built.write_bytes(b"new")
+    for suffix in ("-wal", "-shm"):
+        (tmp_path / f"symbols.db{suffix}").write_bytes(b"stale")
+
+    install_symbols_db(str(built), str(live))
+
+    assert live.read_bytes() == b"new"
+    assert not built.exists()
+    assert not os.path.exists(f"{live}-wal")
+    assert not os.path.exists(f"{live}-shm")
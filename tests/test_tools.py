@@ -0,0 +1,32 @@
+from services.tools import format_stock_data
+
+STOCK = {
+    "symbol": "AAPL",
+    "name": "Apple Inc.",
+    "price": 190.5,
+    "change": 0.0123,
+    "dayLow": 188.0,
+    "dayHigh": 191.2,
+    "volume": 1234567,
+    "technical_analysis": {
+        "moving_averages": {"RECOMMENDATION": "BUY"},
+        "oscillators": {"RECOMMENDATION": "NEUTRAL"},
+        "summary": {"RECOMMENDATION": "BUY", "BUY": 10, "NEUTRAL": 5, "SELL": 2},
+    },
+    "indicators": {
+        "rsi": 55.123,
+        "macd": None,
+        "stoch_k": None,
+        "stoch_d": 40.0,
+        "bb_upper": 195.0,
+        "bb_lower": None,
+    },
+}
+
+
+def test_missing_indicators_format_as_na():
+    text = format_stock_data(STOCK)
+    assert "RSI (14): 55.12" in text
+    assert "MACD: N/A" in text
+    assert "Stochastic K/D: N/A/40.00" in text
+    assert "Upper $195.00, Lower N/A" in text
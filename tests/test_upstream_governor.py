@@ -0,0 +1,99 @@
+import time
+
+import pytest
+
+from services.upstream_governor import TOKEN_BUCKET_SCRIPT, UpstreamGovernor, UpstreamUnavailable
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Lets a test move time.time forward."""
+    now = [time.time()]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def governor(fake_redis, clock):
+    """A governor allowing 1 request per second with a burst of 3.
+
+    FakeRedis cannot run Lua, so the token bucket script is replayed in Python.
+    """
+
+    def register_script(script):
+        assert script == TOKEN_BUCKET_SCRIPT
+
+        def run(keys, args):
+            rate, burst, now = float(args[0]), float(args[1]), float(args[2])
+            tokens, ts = fake_redis.hmget(keys[0], ["tokens", "ts"])
+            tokens = burst if tokens is None else float(tokens)
+            ts = now if ts is None else float(ts)
+            tokens = min(burst, tokens + max(0.0, now - ts) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            fake_redis.hset(keys[0], mapping={"tokens": tokens, "ts": now})
+            return int(allowed)
+
+        return run
+
+    fake_redis.register_script = register_script
+    return UpstreamGovernor("scanner.example.com", rate=1.0, burst=3, failure_threshold=3, open_seconds=60)
+
+
+def _fail():
+    raise ConnectionError("scanner timed out")
+
+
+def _raise_not_found():
+    raise ValueError("Exchange or symbol not found.")
+
+
+def test_bucket_refuses_once_the_burst_is_used(governor, clock):
+    assert [governor.call(lambda: "ok", wait=0) for _ in range(3)] == ["ok"] * 3
+
+    with pytest.raises(UpstreamUnavailable):
+        governor.call(lambda: "ok", wait=0)
+    assert governor.stats()["rejected_rate"] == 1
+
+    clock[0] += 1
+    assert governor.call(lambda: "ok", wait=0) == "ok"
+
+
+def test_breaker_opens_after_repeated_failures(governor, clock):
+    for _ in range(3):
+        clock[0] += 1
+        with pytest.raises(ConnectionError):
+            governor.call(_fail, wait=0)
+
+    called = []
+    with pytest.raises(UpstreamUnavailable):
+        governor.call(called.append, "AAPL", wait=0)
+    assert called == []
+    assert governor.stats() == {"open": True, "breaker_opened": 1, "rejected_open": 1}
+
+
+def test_breaker_goes_half_open_after_the_cool_down(governor, clock):
+    for _ in range(3):
+        governor.record_failure()
+
+    clock[0] += 61
+    assert not governor.is_open()
+
+    with pytest.raises(ConnectionError):
+        governor.call(_fail, wait=0)
+    assert governor.is_open()
+
+    clock[0] += 61
+    assert governor.call(lambda: "ok", wait=0) == "ok"
+    governor.record_failure()
+    assert not governor.is_open()
+
+
+def test_failures_that_are_not_upstream_faults_keep_the_breaker_closed(governor, clock):
+    for _ in range(3):
+        clock[0] += 1
+        with pytest.raises(ValueError):
+            governor.call(_raise_not_found, wait=0, is_failure=lambda e: "not found" not in str(e))
+
+    assert not governor.is_open()
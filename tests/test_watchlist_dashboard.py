@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+import cache
+import routes
+
+REDIS_ROUND_TRIP = 0.0005
+
+
+@pytest.fixture
+def slow_redis(fake_redis, monkeypatch):
+    """Adds a network round trip to every FakeRedis read."""
+    get, mget = fake_redis.get, fake_redis.mget
+
+    def slow_get(key):
+        time.sleep(REDIS_ROUND_TRIP)
+        return get(key)
+
+    def slow_mget(keys):
+        time.sleep(REDIS_ROUND_TRIP)
+        return mget(keys)
+
+    monkeypatch.setattr(fake_redis, "get", slow_get)
+    monkeypatch.setattr(fake_redis, "mget", slow_mget)
+    return fake_redis
+
+
+def _per_row(symbols):
+    return {symbol: routes.get_stock_analysis(symbol) for symbol in symbols}
+
+
+def _round_trips(client):
+    return sum(command in ("get", "mget") for command, _ in client.commands)
+
+
+def test_misses_are_fetched_in_one_batch(stub_scanner, fake_redis):
+    symbols = ["AAPL", "MSFT", "NVDA"]
+    routes.get_stock_analyses(["AAPL"])
+    stub_scanner["requests"] = 0
+
+    analyses = routes.get_watchlist_analyses(symbols)
+
+    assert set(analyses) == set(symbols)
+    assert stub_scanner["requests"] == 1
+
+
+@pytest.mark.parametrize("count", [10, 30, 100])
+def test_dashboard_vs_per_row_benchmark(stub_scanner, slow_redis, count):
+    """Micro-benchmark: one dashboard request against one /api/stock request per row."""
+    symbols = [f"WATCH{i}" for i in range(count)]
+    timings = {}
+
+    for name, load in (("per-row", _per_row), ("dashboard", routes.get_watchlist_analyses)):
+        for state in ("cold", "warm"):
+            if state == "cold":
+                slow_redis.data.clear()
+            cache.local_cache.clear()
+            slow_redis.commands.clear()
+            stub_scanner["requests"] = 0
+
+            started = time.perf_counter()
+            analyses = load(symbols)
+            timings[name, state] = (
+                time.perf_counter() - started,
+                _round_trips(slow_redis),
+                stub_scanner["requests"],
+            )
+            assert all(analyses[symbol] for symbol in symbols)
+
+    for (name, state), (elapsed, round_trips, upstream) in timings.items():
+        requests = count if name == "per-row" else 1
+        print(
+            f"{count} symbols, {name} {state}: {requests} HTTP requests, {round_trips} Redis reads, "
+            f"{upstream} scanner requests, {elapsed * 1000:.1f} ms"
+        )
+
+    assert timings["dashboard", "warm"][1] == 1
+    assert timings["dashboard", "cold"][2] == 1
+    assert timings["per-row", "cold"][2] == count
+    assert timings["dashboard", "warm"][0] < timings["per-row", "warm"][0]
+    assert timings["dashboard", "cold"][0] < timings["per-row", "cold"][0]
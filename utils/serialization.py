@@ -0,0 +1,308 @@
+import argparse
+import json
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+FORMAT_FLAG         : int = 0x80
+COMPRESS_THRESHOLD  : int = 1024
+ZSTD_LEVEL          : int = 3
+LEGACY_PREFIX       : bytes = b"COMPRESSED:"
+
+SERIALIZER_IDS: Dict[str, int] = {"json": 0, "orjson": 1, "msgpack": 2}
+COMPRESSOR_IDS: Dict[str, int] = {"none": 0, "zlib": 1, "lz4": 2, "zstd": 3, "zstd_dict": 4}
+
+Transform = Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parses JSON, with orjson when it is installed.
+
+    stdlib json writes NaN and Infinity, which orjson rejects, so those
+    documents are parsed by stdlib json.
+
+    Args:
+        data (bytes): The JSON.
+
+    Returns:
+        Any: The decoded value.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def _serializers() -> Dict[int, Transform]:
+    """Returns the installed serializers by ID.
+
+    JSON output of both JSON serializers decodes with either one. Both turn
+    non-string dictionary keys into strings, as stdlib json always has, while
+    msgpack keeps them as they are.
+
+    Returns:
+        Dict[int, Transform]: (dumps, loads) pairs.
+    """
+    serializers = {SERIALIZER_IDS["json"]: (lambda value: json.dumps(value).encode(), _json_loads)}
+    if orjson is not None:
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        serializers[SERIALIZER_IDS["orjson"]] = (lambda value: orjson.dumps(value, option=options), orjson.loads)
+    if msgpack is not None:
+        serializers[SERIALIZER_IDS["msgpack"]] = (
+            lambda value: msgpack.packb(value, use_bin_type=True),
+            lambda data: msgpack.unpackb(data, raw=False, strict_map_key=False),
+        )
+    return serializers
+
+
+def _compressors(dictionary: Optional[bytes] = None) -> Dict[int, Transform]:
+    """Returns the installed compressors by ID.
+
+    Args:
+        dictionary (Optional[bytes]): A trained zstd dictionary, enabling zstd_dict.
+
+    Returns:
+        Dict[int, Transform]: (compress, decompress) pairs.
+    """
+    compressors = {
+        COMPRESSOR_IDS["none"]: (lambda data: data, lambda data: data),
+        COMPRESSOR_IDS["zlib"]: (zlib.compress, zlib.decompress),
+    }
+    if lz4_frame is not None:
+        compressors[COMPRESSOR_IDS["lz4"]] = (lz4_frame.compress, lz4_frame.decompress)
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        compressors[COMPRESSOR_IDS["zstd"]] = (compressor.compress, zstandard.ZstdDecompressor().decompress)
+        if dictionary is not None:
+            trained = zstandard.ZstdCompressionDict(dictionary)
+            compressors[COMPRESSOR_IDS["zstd_dict"]] = (
+                zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=trained).compress,
+                zstandard.ZstdDecompressor(dict_data=trained).decompress,
+            )
+    return compressors
+
+
+class CacheCodec:
+    """Encodes cache values with a pluggable serializer and compressor.
+
+    Every encoded value starts with a header byte: the high bit marks this
+    format, bits 3 to 6 hold the serializer ID and bits 0 to 2 the compressor
+    ID, so values written with any installed codec can be read back whatever
+    codec is configured now. Values below COMPRESS_THRESHOLD bytes are stored
+    uncompressed. Entries written before the header existed, plain JSON or
+    zlib-compressed JSON behind "COMPRESSED:", never start with a byte that
+    has the high bit set and are still decoded.
+    """
+
+    def __init__(self, serializer: str = "orjson", compressor: str = "zstd", dictionary_path: Optional[str] = None):
+        """Initializes the codec, falling back to what is installed.
+
+        Args:
+            serializer (str): "orjson", "msgpack" or "json".
+            compressor (str): "zstd", "lz4", "zlib" or "none".
+            dictionary_path (Optional[str]): A zstd dictionary trained with
+                `python -m utils.serialization train`, used instead of plain zstd.
+        """
+        dictionary = None
+        if dictionary_path:
+            with open(dictionary_path, "rb") as f:
+                dictionary = f.read()
+
+        self.serializers = _serializers()
+        self.compressors = _compressors(dictionary)
+
+        self.serializer_id = next(
+            SERIALIZER_IDS[name]
+            for name in (serializer, "orjson", "json")
+            if SERIALIZER_IDS.get(name) in self.serializers
+        )
+        if compressor == "zstd" and COMPRESSOR_IDS["zstd_dict"] in self.compressors:
+            compressor = "zstd_dict"
+        self.compressor_id = next(
+            COMPRESSOR_IDS[name]
+            for name in (compressor, "zstd", "lz4", "zlib")
+            if COMPRESSOR_IDS.get(name) in self.compressors
+        )
+
+    @property
+    def name(self) -> str:
+        """Names the configured serializer and compressor, e.g. "orjson+zstd"."""
+        serializer = next(name for name, id_ in SERIALIZER_IDS.items() if id_ == self.serializer_id)
+        compressor = next(name for name, id_ in COMPRESSOR_IDS.items() if id_ == self.compressor_id)
+        return f"{serializer}+{compressor}"
+
+    def encode(self, value: Any) -> bytes:
+        """Serializes and, if it is large enough, compresses a value.
+
+        Args:
+            value (Any): The value.
+
+        Returns:
+            bytes: The header byte followed by the payload.
+        """
+        payload = self.serializers[self.serializer_id][0](value)
+        compressor_id = self.compressor_id if len(payload) > COMPRESS_THRESHOLD else COMPRESSOR_IDS["none"]
+        if compressor_id:
+            payload = self.compressors[compressor_id][0](payload)
+        return bytes((FORMAT_FLAG | self.serializer_id << 3 | compressor_id,)) + payload
+
+    def decode(self, data: bytes) -> Tuple[Any, int]:
+        """Decodes a value written by any codec or by the legacy format.
+
+        Args:
+            data (bytes): The stored value.
+
+        Returns:
+            Tuple[Any, int]: The value and the size of its serialized form in bytes.
+
+        Raises:
+            KeyError: If the value was written with a serializer or compressor
+                that is not installed.
+        """
+        if not data or not data[0] & FORMAT_FLAG:
+            payload = zlib.decompress(data[len(LEGACY_PREFIX):]) if data.startswith(LEGACY_PREFIX) else data
+            return _json_loads(payload), len(payload)
+
+        header = data[0]
+        payload = self.compressors[header & 0x07][1](data[1:])
+        return self.serializers[header >> 3 & 0x0F][1](payload), len(payload)
+
+
+def _read_samples(paths: List[str]) -> List[Any]:
+    """Reads captured payloads from JSON files.
+
+    A file holding a JSON array contributes each element, any other file
+    contributes its whole value.
+
+    Args:
+        paths (List[str]): The files.
+
+    Returns:
+        List[Any]: The payloads.
+    """
+    samples = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            value = json.load(f)
+        samples.extend(value if isinstance(value, list) else [value])
+    return samples
+
+
+def train_dictionary(samples: List[Any], size: int = 16384, serializer: str = "orjson") -> bytes:
+    """Trains a zstd dictionary on serialized sample payloads.
+
+    Args:
+        samples (List[Any]): Representative values, e.g. stock analyses.
+        size (int): The dictionary size in bytes.
+        serializer (str): The serializer the cache is configured with.
+
+    Returns:
+        bytes: The dictionary.
+    """
+    dumps = _serializers()[SERIALIZER_IDS[serializer]][0]
+    return zstandard.train_dictionary(size, [dumps(sample) for sample in samples]).as_bytes()
+
+
+def benchmark(samples: List[Any], codecs: List[CacheCodec], rounds: int = 100) -> List[Dict[str, Any]]:
+    """Measures encoded size and encode/decode time of codecs on sample payloads.
+
+    Args:
+        samples (List[Any]): The payloads.
+        codecs (List[CacheCodec]): The codecs to compare.
+        rounds (int): How often every sample is encoded and decoded.
+
+    Returns:
+        List[Dict[str, Any]]: Per codec, total encoded bytes and microseconds per
+        encode and decode.
+    """
+    results = []
+    for codec in codecs:
+        encoded = [codec.encode(sample) for sample in samples]
+
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for sample in samples:
+                codec.encode(sample)
+        encode_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for data in encoded:
+                codec.decode(data)
+        decode_time = time.perf_counter() - started
+
+        operations = rounds * len(samples)
+        results.append(
+            {
+                "codec": codec.name,
+                "bytes": sum(len(data) for data in encoded),
+                "encode_us": round(encode_time / operations * 1e6, 2),
+                "decode_us": round(decode_time / operations * 1e6, 2),
+            }
+        )
+    return results
+
+
+def main() -> None:
+    """Trains a zstd dictionary or benchmarks codecs on captured payloads."""
+    parser = argparse.ArgumentParser(description="Train cache compression dictionaries and benchmark cache codecs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    train = commands.add_parser("train", help="Train a zstd dictionary")
+    train.add_argument("output", help="Dictionary file to write, for CACHE_ZSTD_DICT")
+    train.add_argument("samples", nargs="+", help="JSON files with captured payloads, e.g. /api/stock/<symbol> responses")
+    train.add_argument("--size", type=int, default=16384, help="Dictionary size in bytes")
+    train.add_argument("--serializer", default="orjson", help="Serializer the cache is configured with")
+
+    bench = commands.add_parser("bench", help="Compare codecs on captured payloads")
+    bench.add_argument("samples", nargs="+", help="JSON files with captured payloads")
+    bench.add_argument("--dict", help="zstd dictionary to include in the comparison")
+    bench.add_argument("--rounds", type=int, default=100, help="Encode and decode rounds per sample")
+
+    args = parser.parse_args()
+    samples = _read_samples(args.samples)
+
+    if args.command == "train":
+        dictionary = train_dictionary(samples, args.size, args.serializer)
+        with open(args.output, "wb") as f:
+            f.write(dictionary)
+        print(f"Trained a {len(dictionary)} byte dictionary on {len(samples)} payloads into {args.output}")
+        return
+
+    codecs = [
+        CacheCodec(serializer, compressor)
+        for serializer in ("json", "orjson", "msgpack")
+        for compressor in ("zlib", "lz4", "zstd")
+    ]
+    if args.dict:
+        codecs.extend(CacheCodec(serializer, "zstd", args.dict) for serializer in ("orjson", "msgpack"))
+    codecs = list({codec.name: codec for codec in codecs}.values())
+
+    for result in benchmark(samples, codecs, args.rounds):
+        print(f"{result['codec']:<20} {result['bytes']:>10} bytes {result['encode_us']:>10} us/encode {result['decode_us']:>10} us/decode")
+
+
+if __name__ == "__main__":
+    main()
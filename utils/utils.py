@@ -1,26 +1,113 @@
+import os
 import sqlite3
 import queue
 import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import quote
+
+import eventlet
+from eventlet import tpool
+
+SWAP_CHECK_INTERVAL: float = 1.0
+
 
 class SQLiteConnectionPool:
-    """Manages a pool of SQLite database connections."""
+    """Manages a pool of SQLite database connections.
+
+    The pool watches its database file. When the file is replaced, e.g. by the
+    symbols database build pipeline, idle connections are closed, connections
+    still in use are closed when they are returned, and new connections open
+    the new file. Files marked immutable (no write permission) are opened
+    read-only with `immutable=1`, which skips locking and change detection.
+
+    Queries should go through `run` or `execute`, which run them on eventlet's
+    native thread pool so a slow query does not block every other greenlet of
+    the worker. The thread pool is sized to the connections of all pools.
+    """
+
+    _total_connections: int = 0
 
-    def __init__(self, db_path: str, max_connections: int = 10):
+    def __init__(self, db_path: str, max_connections: int = 10, read_only: Optional[bool] = None):
         """Initializes the SQLiteConnectionPool.
 
         Args:
             db_path (str): Path to the SQLite database file.
             max_connections (int): Maximum number of connections in the pool.
+            read_only (Optional[bool]): Whether to open connections read-only and
+                immutable. Defaults to whether the file is marked immutable.
         """
         self.db_path = db_path
         self.max_connections = max_connections
         self.connections = queue.Queue(maxsize=max_connections)
         self.connection_count = 0
         self.lock = threading.Lock()
+        self.read_only = self._is_immutable() if read_only is None else read_only
+        self.generation = 0
+        self._generations: Dict[int, int] = {}
+        self._next_check = time.monotonic() + SWAP_CHECK_INTERVAL
+        self._swap_listeners: list[Callable[[], None]] = []
+        self._stats = {
+            "queries": 0,
+            "wait_ms": 0.0,
+            "queue_ms": 0.0,
+            "exec_ms": 0.0,
+            "max_wait_ms": 0.0,
+            "max_queue_ms": 0.0,
+            "max_exec_ms": 0.0,
+        }
+
+        SQLiteConnectionPool._total_connections += max_connections
+        tpool.set_num_threads(SQLiteConnectionPool._total_connections)
 
         for _ in range(min(3, max_connections)):
             self._create_connection()
 
+        self._file_id = self._stat()
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        """Identifies the database file currently at db_path.
+
+        Returns:
+            Optional[Tuple[int, int]]: Inode and modification time, or None if missing.
+        """
+        try:
+            stat = os.stat(self.db_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _is_immutable(self) -> bool:
+        """Checks whether the database file has been marked immutable.
+
+        Returns:
+            bool: True if the file exists and nobody may write to it.
+        """
+        try:
+            return not os.stat(self.db_path).st_mode & 0o222
+        except FileNotFoundError:
+            return False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Opens a connection to the current database file.
+
+        Returns:
+            sqlite3.Connection: A SQLite connection object.
+        """
+        if self.read_only:
+            uri = f"file:{quote(os.path.abspath(self.db_path))}?mode=ro&immutable=1"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA cache_size = 10000")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA mmap_size = 30000000")
+
+        self._generations[id(conn)] = self.generation
+        return conn
+
     def _create_connection(self) -> bool:
         """Creates a new SQLite connection and adds it to the pool.
 
@@ -30,12 +117,7 @@ class SQLiteConnectionPool:
         if self.connection_count >= self.max_connections:
             return False
 
-        conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        conn.execute("PRAGMA journal_mode = WAL")
-        conn.execute("PRAGMA synchronous = NORMAL")
-        conn.execute("PRAGMA cache_size = 10000")
-        conn.execute("PRAGMA temp_store = MEMORY")
-        conn.execute("PRAGMA mmap_size = 30000000")
+        conn = self._connect()
 
         with self.lock:
             self.connection_count += 1
@@ -43,8 +125,82 @@ class SQLiteConnectionPool:
         self.connections.put(conn)
         return True
 
+    def _close(self, conn: sqlite3.Connection) -> None:
+        """Closes a connection that is leaving the pool.
+
+        Args:
+            conn (sqlite3.Connection): The SQLite connection object to close.
+        """
+        self._generations.pop(id(conn), None)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self.lock:
+            self.connection_count -= 1
+
+    def add_swap_listener(self, listener: Callable[[], None]) -> None:
+        """Registers a callback to run in its own greenlet after the database file was swapped.
+
+        Args:
+            listener (Callable[[], None]): The callback.
+        """
+        self._swap_listeners.append(listener)
+
+    def swap(self, read_only: Optional[bool] = None) -> None:
+        """Switches the pool over to the file now at db_path.
+
+        Idle connections are closed right away. Connections in use keep
+        reading the old file until they are returned, then they are closed.
+        Swap listeners are spawned, so slow ones such as index rebuilds do not
+        hold up the query that noticed the swap.
+
+        Args:
+            read_only (Optional[bool]): Whether to open the new file read-only and
+                immutable. Defaults to whether the file is marked immutable.
+        """
+        with self.lock:
+            self.generation += 1
+            self.read_only = self._is_immutable() if read_only is None else read_only
+
+        while True:
+            try:
+                self._close(self.connections.get_nowait())
+            except queue.Empty:
+                break
+
+        for _ in range(min(3, self.max_connections)):
+            self._create_connection()
+
+        self._file_id = self._stat()
+
+        for listener in self._swap_listeners:
+            eventlet.spawn_n(self._run_swap_listener, listener)
+
+    def _run_swap_listener(self, listener: Callable[[], None]) -> None:
+        """Runs a swap listener, reporting its errors.
+
+        Args:
+            listener (Callable[[], None]): The callback.
+        """
+        try:
+            listener()
+        except Exception as e:
+            print(f"SQLite swap listener error for {self.db_path}: {str(e)}")
+
+    def _check_swap(self) -> None:
+        """Swaps to a new database file if the one at db_path was replaced."""
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + SWAP_CHECK_INTERVAL
+
+        file_id = self._stat()
+        if file_id is not None and file_id != self._file_id:
+            self.swap()
+
     def get_connection(self, timeout: int = 5) -> sqlite3.Connection:
-        """Retrieves a connection from the pool.
+        """Retrieves a connection from the pool, opening one if none is idle and the pool is not full.
 
         Args:
             timeout (int): Timeout in seconds to wait for a connection.
@@ -52,19 +208,14 @@ class SQLiteConnectionPool:
         Returns:
             sqlite3.Connection: A SQLite connection object.
         """
+        self._check_swap()
+
         try:
-            return self.connections.get(timeout=timeout)
+            return self.connections.get_nowait()
         except queue.Empty:
             with self.lock:
                 if self.connection_count < self.max_connections:
-                    conn = sqlite3.connect(
-                        self.db_path, check_same_thread=False
-                    )
-                    conn.execute("PRAGMA journal_mode = WAL")
-                    conn.execute("PRAGMA synchronous = NORMAL")
-                    conn.execute("PRAGMA cache_size = 10000")
-                    conn.execute("PRAGMA temp_store = MEMORY")
-                    conn.execute("PRAGMA mmap_size = 30000000")
+                    conn = self._connect()
                     self.connection_count += 1
                     return conn
 
@@ -73,20 +224,112 @@ class SQLiteConnectionPool:
     def return_connection(self, conn: sqlite3.Connection) -> None:
         """Returns a connection to the pool.
 
+        Connections opened before the last swap are closed instead.
+
         Args:
             conn (sqlite3.Connection): The SQLite connection object to return.
         """
         if conn:
-            self.connections.put(conn)
+            if self._generations.get(id(conn)) != self.generation:
+                self._close(conn)
+            else:
+                self.connections.put(conn)
+
+    def run(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Runs a function with a pooled connection on a native thread.
+
+        The calling greenlet waits for the result while the hub keeps serving
+        others. Time spent waiting for a connection, waiting for a free native
+        thread and running the function is recorded for `stats`.
+
+        Args:
+            fn (Callable[[sqlite3.Connection], Any]): Receives the connection and
+                returns the result. It must not keep references to the connection.
+
+        Returns:
+            Any: The result of fn.
+        """
+        timings = {}
+
+        def timed(conn: sqlite3.Connection) -> Any:
+            """Runs fn on the worker thread, recording when it started and finished."""
+            timings["started"] = time.perf_counter()
+            try:
+                return fn(conn)
+            finally:
+                timings["finished"] = time.perf_counter()
+
+        started = time.perf_counter()
+        conn = self.get_connection()
+        acquired = time.perf_counter()
+        try:
+            return tpool.execute(timed, conn)
+        finally:
+            self.return_connection(conn)
+
+            thread_started = timings.get("started", acquired)
+            wait_ms = (acquired - started) * 1000
+            queue_ms = (thread_started - acquired) * 1000
+            exec_ms = (timings.get("finished", thread_started) - thread_started) * 1000
+            self._stats["queries"] += 1
+            self._stats["wait_ms"] += wait_ms
+            self._stats["queue_ms"] += queue_ms
+            self._stats["exec_ms"] += exec_ms
+            self._stats["max_wait_ms"] = max(self._stats["max_wait_ms"], wait_ms)
+            self._stats["max_queue_ms"] = max(self._stats["max_queue_ms"], queue_ms)
+            self._stats["max_exec_ms"] = max(self._stats["max_exec_ms"], exec_ms)
+
+    def execute(self, sql: str, params: tuple = (), one: bool = False, commit: bool = False) -> Any:
+        """Runs a single statement on a native thread and returns its rows.
+
+        Args:
+            sql (str): The SQL statement.
+            params (tuple): The statement parameters.
+            one (bool): Whether to return only the first row.
+            commit (bool): Whether to commit after the statement.
+
+        Returns:
+            Any: The list of rows, or the first row (None if there is none) when one is set.
+        """
+        def query(conn: sqlite3.Connection) -> Any:
+            """Runs the statement on the worker thread."""
+            cursor = conn.execute(sql, params)
+            rows = cursor.fetchone() if one else cursor.fetchall()
+            if commit:
+                conn.commit()
+            return rows
+
+        return self.run(query)
+
+    def stats(self) -> Dict[str, Any]:
+        """Reports query counts and timings since the worker started.
+
+        Returns:
+            Dict[str, Any]: Query count, average and maximum connection wait,
+            thread pool queue wait and execution time in milliseconds, and the
+            number of open connections.
+        """
+        queries = self._stats["queries"]
+        return {
+            "queries": queries,
+            "avg_wait_ms": round(self._stats["wait_ms"] / queries, 3) if queries else 0.0,
+            "avg_queue_ms": round(self._stats["queue_ms"] / queries, 3) if queries else 0.0,
+            "avg_exec_ms": round(self._stats["exec_ms"] / queries, 3) if queries else 0.0,
+            "max_wait_ms": round(self._stats["max_wait_ms"], 3),
+            "max_queue_ms": round(self._stats["max_queue_ms"], 3),
+            "max_exec_ms": round(self._stats["max_exec_ms"], 3),
+            "connections": self.connection_count,
+        }
 
     def close_all(self) -> None:
         """Closes all connections in the pool."""
         while not self.connections.empty():
             try:
                 conn = self.connections.get_nowait()
+                self._generations.pop(id(conn), None)
                 conn.close()
             except queue.Empty:
                 break
 
         with self.lock:
-            self.connection_count = 0
\ No newline at end of file
+            self.connection_count = 0